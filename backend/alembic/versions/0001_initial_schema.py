@@ -0,0 +1,89 @@
+"""initial schema
+
+Baseline matching the tables that ``init_db`` has always created with
+``SQLModel.metadata.create_all``. Tables that already exist are left alone,
+so databases bootstrapped before migrations existed can simply be upgraded.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "user" not in existing:
+        op.create_table(
+            "user",
+            sa.Column("email", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column("is_active", sa.Boolean(), nullable=False),
+            sa.Column("reminder_frequency", sa.Integer(), nullable=False),
+            sa.Column("active_hours_start", sa.Integer(), nullable=False),
+            sa.Column("active_hours_end", sa.Integer(), nullable=False),
+            sa.Column("id", sa.Uuid(), nullable=False),
+            sa.Column("hashed_password", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_user_email", "user", ["email"], unique=True)
+
+    if "waterlog" not in existing:
+        op.create_table(
+            "waterlog",
+            sa.Column("timestamp", sa.DateTime(), nullable=False),
+            sa.Column("amount", sa.Integer(), nullable=False),
+            sa.Column("notes", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+            sa.Column("id", sa.Uuid(), nullable=False),
+            sa.Column("user_id", sa.Uuid(), nullable=False),
+            sa.ForeignKeyConstraint(["user_id"], ["user.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+
+    if "goal" not in existing:
+        op.create_table(
+            "goal",
+            sa.Column("goal_amount", sa.Integer(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+            sa.Column("id", sa.Uuid(), nullable=False),
+            sa.Column("user_id", sa.Uuid(), nullable=False),
+            sa.ForeignKeyConstraint(["user_id"], ["user.id"]),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("user_id"),
+        )
+
+    if "streak" not in existing:
+        op.create_table(
+            "streak",
+            sa.Column("current_streak", sa.Integer(), nullable=False),
+            sa.Column("longest_streak", sa.Integer(), nullable=False),
+            sa.Column("last_logged_date", sa.Date(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+            sa.Column("id", sa.Uuid(), nullable=False),
+            sa.Column("user_id", sa.Uuid(), nullable=False),
+            sa.ForeignKeyConstraint(["user_id"], ["user.id"]),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("user_id"),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("streak")
+    op.drop_table("goal")
+    op.drop_table("waterlog")
+    op.drop_index("ix_user_email", table_name="user")
+    op.drop_table("user")
@@ -0,0 +1,31 @@
+"""composite (user_id, timestamp) index on waterlog
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # init_db's create_all may already have built it on fresh databases
+    op.create_index(
+        "ix_waterlog_user_id_timestamp",
+        "waterlog",
+        ["user_id", "timestamp"],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_waterlog_user_id_timestamp", table_name="waterlog")
@@ -0,0 +1,48 @@
+"""dailytotal rollup table
+
+Creates the per-user, per-day intake rollup and backfills it from the
+existing water logs.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if "dailytotal" in sa.inspect(bind).get_table_names():
+        return
+
+    op.create_table(
+        "dailytotal",
+        sa.Column("total_amount", sa.Integer(), nullable=False),
+        sa.Column("log_count", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Uuid(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("user_id", "day"),
+    )
+
+    day = "date(timestamp)" if bind.dialect.name == "sqlite" else "CAST(timestamp AS DATE)"
+    op.execute(
+        "INSERT INTO dailytotal (user_id, day, total_amount, log_count) "
+        f"SELECT user_id, {day}, SUM(amount), COUNT(*) FROM waterlog "
+        f"GROUP BY user_id, {day}"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("dailytotal")
@@ -0,0 +1,47 @@
+"""refreshtoken table
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if "refreshtoken" in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table(
+        "refreshtoken",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("user_id", sa.Uuid(), nullable=False),
+        sa.Column("token_hash", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("family_id", sa.Uuid(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("revoked_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_refreshtoken_user_id", "refreshtoken", ["user_id"])
+    op.create_index("ix_refreshtoken_family_id", "refreshtoken", ["family_id"])
+    op.create_index("ix_refreshtoken_expires_at", "refreshtoken", ["expires_at"])
+    op.create_index(
+        "ix_refreshtoken_token_hash", "refreshtoken", ["token_hash"], unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("refreshtoken")
@@ -0,0 +1,90 @@
+"""user next_reminder_at and reminder lease
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from datetime import datetime, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Users scheduled per UPDATE round trip in the backfill
+BACKFILL_BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    columns = {column["name"] for column in inspector.get_columns("user")}
+
+    if "next_reminder_at" not in columns:
+        op.add_column("user", sa.Column("next_reminder_at", sa.DateTime(), nullable=True))
+        backfill_next_reminder()
+    if "reminder_lease_until" not in columns:
+        op.add_column("user", sa.Column("reminder_lease_until", sa.DateTime(), nullable=True))
+
+    indexes = {index["name"] for index in inspector.get_indexes("user")}
+    if "ix_user_next_reminder_at" not in indexes:
+        op.create_index("ix_user_next_reminder_at", "user", ["next_reminder_at"])
+
+
+def backfill_next_reminder() -> None:
+    """
+    Schedule existing users with reminders on across one reminder interval.
+
+    Each user is due at now plus a fixed share of their reminder_frequency
+    taken from their id, so the first dispatch after the upgrade is spread
+    out instead of every user falling due at once. The dispatcher moves
+    reminders outside active hours to the next active period.
+    """
+    bind = op.get_bind()
+    user = sa.table(
+        "user",
+        sa.column("id", sa.Uuid()),
+        sa.column("next_reminder_at", sa.DateTime()),
+        sa.column("is_active", sa.Boolean()),
+        sa.column("reminder_frequency", sa.Integer()),
+    )
+    select_batch = (
+        sa.select(user.c.id, user.c.reminder_frequency)
+        .where(user.c.is_active, user.c.reminder_frequency > 0)
+        .order_by(user.c.id)
+        .limit(BACKFILL_BATCH_SIZE)
+    )
+    schedule = (
+        user.update()
+        .where(user.c.id == sa.bindparam("user_id"))
+        .values(next_reminder_at=sa.bindparam("next_at"))
+    )
+
+    now = datetime.utcnow()
+    last_id = None
+    while True:
+        query = select_batch if last_id is None else select_batch.where(user.c.id > last_id)
+        rows = bind.execute(query).all()
+        if not rows:
+            return
+        bind.execute(schedule, [
+            {
+                "user_id": user_id,
+                "next_at": now + timedelta(seconds=user_id.int % (frequency * 60)),
+            }
+            for user_id, frequency in rows
+        ])
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_next_reminder_at", table_name="user")
+    with op.batch_alter_table("user") as batch_op:
+        batch_op.drop_column("reminder_lease_until")
+        batch_op.drop_column("next_reminder_at")
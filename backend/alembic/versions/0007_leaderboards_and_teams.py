@@ -0,0 +1,68 @@
+"""leaderboardentry, team and teammembership tables
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    tables = sa.inspect(op.get_bind()).get_table_names()
+
+    if "leaderboardentry" not in tables:
+        op.create_table(
+            "leaderboardentry",
+            sa.Column("user_id", sa.Uuid(), nullable=False),
+            sa.Column("display_name", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column("current_streak", sa.Integer(), nullable=False),
+            sa.Column("longest_streak", sa.Integer(), nullable=False),
+            sa.Column("last_logged_date", sa.Date(), nullable=True),
+            sa.Column("week_start", sa.Date(), nullable=False),
+            sa.Column("week_amount", sa.Integer(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(["user_id"], ["user.id"]),
+            sa.PrimaryKeyConstraint("user_id"),
+        )
+
+    if "team" not in tables:
+        op.create_table(
+            "team",
+            sa.Column("id", sa.Uuid(), nullable=False),
+            sa.Column("name", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column("created_by", sa.Uuid(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(["created_by"], ["user.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+
+    if "teammembership" not in tables:
+        op.create_table(
+            "teammembership",
+            sa.Column("team_id", sa.Uuid(), nullable=False),
+            sa.Column("user_id", sa.Uuid(), nullable=False),
+            sa.Column("joined_at", sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(["team_id"], ["team.id"]),
+            sa.ForeignKeyConstraint(["user_id"], ["user.id"]),
+            sa.PrimaryKeyConstraint("team_id", "user_id"),
+        )
+        op.create_index("ix_teammembership_user_id", "teammembership", ["user_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_teammembership_user_id", table_name="teammembership")
+    op.drop_table("teammembership")
+    op.drop_table("team")
+    op.drop_table("leaderboardentry")
@@ -1,7 +1,9 @@
 from fastapi import APIRouter
 
-from app.api import auth, water
+from app.api import auth, leaderboard, teams, water
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
-api_router.include_router(water.router, prefix="/water", tags=["water"])
\ No newline at end of file
+api_router.include_router(water.router, prefix="/water", tags=["water"])
+api_router.include_router(leaderboard.router, prefix="/leaderboard", tags=["leaderboard"])
+api_router.include_router(teams.router, prefix="/teams", tags=["teams"])
\ No newline at end of file
@@ -1,24 +1,24 @@
 from datetime import timedelta
-from typing import Any
+from typing import Any, Dict
+from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlmodel import Session
 
 from app.api.deps import get_db
 from app.core.config import settings
 from app.core.security import create_access_token
-from app.schemas.token import Token
+from app.schemas.token import RefreshTokenRequest, Token
 from app.schemas.user import User, UserCreate
-from app.services.user import UserService
+from app.services.aio import AnySession, AsyncTokenService, AsyncUserService
 
 router = APIRouter()
 
 
 @router.post("/register", response_model=User)
-def register(
+async def register(
     user_in: UserCreate,
-    db: Session = Depends(get_db),
+    db: AnySession = Depends(get_db),
 ) -> Any:
     """
     Register a new user in the system.
@@ -32,20 +32,20 @@ def register(
     Raises:
     - 400 Bad Request: If email is already registered
     """
-    user = UserService.get_by_email(db, user_in.email)
+    user = await AsyncUserService.get_by_email(db, user_in.email)
     if user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered",
         )
 
-    user = UserService.create(db, user_in)
+    user = await AsyncUserService.create(db, user_in)
     return user
 
 
 @router.post("/login", response_model=Token)
-def login(
-    db: Session = Depends(get_db),
+async def login(
+    db: AnySession = Depends(get_db),
     form_data: OAuth2PasswordRequestForm = Depends(),
 ) -> Any:
     """
@@ -56,13 +56,14 @@ def login(
     - **password**: User's password
 
     Returns:
-    - JWT access token for authenticating future requests
+    - Short-lived JWT access token for authenticating future requests
+    - Refresh token for obtaining new access tokens via /auth/refresh
 
     Raises:
     - 401 Unauthorized: If credentials are invalid
     - 400 Bad Request: If user account is inactive
     """
-    user = UserService.authenticate(
+    user = await AsyncUserService.authenticate(
         db, form_data.username, form_data.password
     )
     if not user:
@@ -70,18 +71,75 @@ def login(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
         )
-    if not UserService.is_active(user):
+    if not AsyncUserService.is_active(user):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Inactive user",
         )
 
+    refresh_token = await AsyncTokenService.issue(db, user.id)
+    return _token_response(user.id, refresh_token)
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh(
+    token_in: RefreshTokenRequest,
+    db: AnySession = Depends(get_db),
+) -> Any:
+    """
+    Exchange a refresh token for a new access token.
+
+    The refresh token is single-use: a new one is returned with every call.
+    Re-using a refresh token that was already exchanged revokes every token
+    descended from the same login.
+
+    Parameters:
+    - **refresh_token**: Refresh token from login or a previous refresh
+
+    Returns:
+    - New JWT access token and rotated refresh token
+
+    Raises:
+    - 401 Unauthorized: If the refresh token is invalid, expired or revoked
+    """
+    rotated = await AsyncTokenService.rotate(db, token_in.refresh_token)
+    if rotated is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+        )
+
+    user_id, refresh_token = rotated
+    return _token_response(user_id, refresh_token)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    token_in: RefreshTokenRequest,
+    db: AnySession = Depends(get_db),
+) -> None:
+    """
+    Revoke a refresh token.
+
+    Parameters:
+    - **refresh_token**: Refresh token to revoke
+
+    Returns:
+    - 204 No Content, whether or not the token was still active
+    """
+    await AsyncTokenService.revoke(db, token_in.refresh_token)
+
+
+def _token_response(user_id: UUID, refresh_token: str) -> Dict[str, Any]:
+    """Build the token response for a user."""
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        subject=str(user.id), expires_delta=access_token_expires
+        subject=str(user_id), expires_delta=access_token_expires
     )
 
     return {
         "access_token": access_token,
         "token_type": "bearer",
+        "refresh_token": refresh_token,
+        "expires_in": int(access_token_expires.total_seconds()),
     }
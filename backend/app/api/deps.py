@@ -1,61 +1,80 @@
-from typing import Generator, Optional
+from contextlib import contextmanager
+from typing import AsyncGenerator, Optional
 from uuid import UUID
 
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import contextmanager_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt
-from pydantic import ValidationError
 from sqlmodel import Session, select
 
 from app.core.config import settings
-from app.core.security import ALGORITHM
-from app.db.session import get_session
+from app.core.principal import Principal, principal_cache
+from app.core.security import decode_token
+from app.db.session import get_async_session, get_session
 from app.models.user import User
-from app.schemas.token import TokenPayload
+from app.services.aio import AnySession, run_sync
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login"
 )
 
 
-def get_db() -> Generator[Session, None, None]:
+async def get_db() -> AsyncGenerator[AnySession, None]:
     """
     Dependency for getting a database session.
+
+    Yields an AsyncSession when ASYNC_DATABASE is enabled, otherwise a
+    regular Session whose setup and teardown run in the threadpool.
     """
-    yield from get_session()
+    if settings.ASYNC_DATABASE:
+        async for session in get_async_session():
+            yield session
+    else:
+        async with contextmanager_in_threadpool(contextmanager(get_session)()) as session:
+            yield session
 
 
-def get_current_user(
-    db: Session = Depends(get_db),
+def _load_user(db: Session, subject: str) -> Optional[User]:
+    """Look up the user a token subject refers to."""
+    try:
+        # Try to convert the token subject to UUID
+        user_id = UUID(subject)
+        return db.exec(select(User).where(User.id == user_id)).first()
+    except ValueError:
+        # If conversion fails, try using the string directly
+        return db.exec(select(User).where(User.id == subject)).first()
+
+
+async def get_current_user(
+    db: AnySession = Depends(get_db),
     token: str = Depends(reusable_oauth2),
-) -> User:
+) -> Principal:
     """
     Dependency for getting the current user.
+
+    Resolved principals are cached per token for a short time, so most
+    authenticated requests need no user lookup at all.
     """
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[ALGORITHM]
-        )
-        token_data = TokenPayload(**payload)
-    except (jwt.JWTError, ValidationError):
+        token_data = decode_token(token)
+    except ValueError:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
 
-    try:
-        # Try to convert the token subject to UUID
-        user_id = UUID(token_data.sub)
-        user = db.exec(select(User).where(User.id == user_id)).first()
-    except ValueError:
-        # If conversion fails, try using the string directly
-        user = db.exec(select(User).where(User.id == token_data.sub)).first()
+    user = principal_cache.get(token_data.sub, token)
+    if user is None:
+        user = await run_sync(db, _load_user, token_data.sub)
 
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found",
-        )
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found",
+            )
+
+        user = Principal(id=user.id, is_active=user.is_active)
+        principal_cache.set(token_data.sub, token, user)
 
     if not user.is_active:
         raise HTTPException(
@@ -66,9 +85,9 @@ def get_current_user(
     return user
 
 
-def get_current_active_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
+async def get_current_active_user(
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     """
     Dependency for getting the current active user.
     """
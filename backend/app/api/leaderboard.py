@@ -0,0 +1,117 @@
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app.api.deps import get_current_active_user, get_db
+from app.core.config import settings
+from app.core.principal import Principal
+from app.schemas.leaderboard import Leaderboard, LeaderboardEntry, LeaderboardJoin
+from app.services.aio import AnySession, AsyncLeaderboardService
+from app.services.leaderboard import METRICS
+
+router = APIRouter()
+
+
+def check_metric(metric: str) -> None:
+    """Reject unknown leaderboard metrics."""
+    if metric not in METRICS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid metric. Must be one of: {', '.join(METRICS)}",
+        )
+
+
+def page_size(limit: Optional[int]) -> int:
+    """Apply the default and maximum leaderboard page size."""
+    return min(limit or settings.LEADERBOARD_PAGE_SIZE, settings.LEADERBOARD_MAX_PAGE_SIZE)
+
+
+@router.get("", response_model=Leaderboard)
+async def get_leaderboard(
+    metric: str = Query("current_streak", description="current_streak, longest_streak or week_amount"),
+    limit: Optional[int] = Query(None, ge=1, description="Positions to return"),
+    db: AnySession = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
+) -> Any:
+    """
+    Retrieve the top of the global leaderboard for a metric.
+
+    Read from an in-memory rank index, so neither the top positions nor the
+    caller's own rank require sorting the users.
+
+    Parameters:
+    - **metric**: What users are ranked by (default: 'current_streak')
+      - 'current_streak': Consecutive days logged, up to today or yesterday
+      - 'longest_streak': Longest streak ever
+      - 'week_amount': Intake this week (Monday to Sunday)
+    - **limit**: Positions to return (default LEADERBOARD_PAGE_SIZE, capped
+      at LEADERBOARD_MAX_PAGE_SIZE)
+
+    Returns:
+    - Leaderboard containing:
+      - total: Users on the leaderboard
+      - entries: Top positions with rank, display name and score; equal
+        scores share a rank
+      - me: The caller's own position, or null if they have not opted in
+
+    Raises:
+    - 400 Bad Request: If the metric is invalid
+    """
+    check_metric(metric)
+    return await AsyncLeaderboardService.get_leaderboard(
+        db, metric, page_size(limit), current_user.id
+    )
+
+
+@router.get("/me", response_model=LeaderboardEntry)
+async def get_my_entry(
+    db: AnySession = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
+) -> Any:
+    """
+    Retrieve the caller's leaderboard entry.
+
+    Raises:
+    - 404 Not Found: If the caller has not opted in
+    """
+    entry = await AsyncLeaderboardService.get_entry(db, current_user.id)
+    if not entry:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not on the leaderboard",
+        )
+
+    return entry
+
+
+@router.put("/me", response_model=LeaderboardEntry)
+async def join_leaderboard(
+    join_in: LeaderboardJoin,
+    db: AnySession = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
+) -> Any:
+    """
+    Opt in to the leaderboards, or change the display name shown on them.
+
+    Parameters:
+    - **join_in**: Entry data containing:
+      - display_name: Name shown to other users instead of the email
+
+    Returns:
+    - The caller's entry with their current streak and this week's intake
+    """
+    return await AsyncLeaderboardService.join(db, current_user.id, join_in.display_name)
+
+
+@router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
+async def leave_leaderboard(
+    db: AnySession = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
+) -> None:
+    """
+    Opt out of the leaderboards; this also leaves every team.
+
+    Returns:
+    - 204 No Content, whether or not the caller had opted in
+    """
+    await AsyncLeaderboardService.leave(db, current_user.id)
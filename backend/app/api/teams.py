@@ -0,0 +1,140 @@
+from typing import Any, List, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app.api.deps import get_current_active_user, get_db
+from app.api.leaderboard import check_metric, page_size
+from app.core.principal import Principal
+from app.schemas.leaderboard import Leaderboard, Team, TeamCreate
+from app.services.aio import AnySession, AsyncLeaderboardService
+
+router = APIRouter()
+
+
+@router.get("", response_model=List[Team])
+async def get_teams(
+    db: AnySession = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
+) -> Any:
+    """
+    Retrieve the teams the caller belongs to.
+    """
+    return await AsyncLeaderboardService.get_teams(db, current_user.id)
+
+
+@router.post("", response_model=Team)
+async def create_team(
+    team_in: TeamCreate,
+    db: AnySession = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
+) -> Any:
+    """
+    Create a team with the caller as its first member.
+
+    Others join with the team's ID, which the caller shares with them.
+
+    Parameters:
+    - **team_in**: Team data containing:
+      - name: Team name
+
+    Returns:
+    - The created team
+
+    Raises:
+    - 400 Bad Request: If the caller has not opted in to the leaderboards
+    """
+    try:
+        return await AsyncLeaderboardService.create_team(db, current_user.id, team_in.name)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+
+@router.post("/{team_id}/members", response_model=Team)
+async def join_team(
+    team_id: UUID,
+    db: AnySession = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
+) -> Any:
+    """
+    Join a team.
+
+    Returns:
+    - The team; joining a team again changes nothing
+
+    Raises:
+    - 400 Bad Request: If the caller has not opted in to the leaderboards
+      or the team has TEAM_MAX_MEMBERS members
+    - 404 Not Found: If the team doesn't exist
+    """
+    try:
+        team = await AsyncLeaderboardService.join_team(db, current_user.id, team_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    if not team:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Team not found",
+        )
+
+    return team
+
+
+@router.delete("/{team_id}/members/me", status_code=status.HTTP_204_NO_CONTENT)
+async def leave_team(
+    team_id: UUID,
+    db: AnySession = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
+) -> None:
+    """
+    Leave a team.
+
+    Raises:
+    - 404 Not Found: If the caller is not a member of the team
+    """
+    if not await AsyncLeaderboardService.leave_team(db, current_user.id, team_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Team not found",
+        )
+
+
+@router.get("/{team_id}/leaderboard", response_model=Leaderboard)
+async def get_team_leaderboard(
+    team_id: UUID,
+    metric: str = Query("current_streak", description="current_streak, longest_streak or week_amount"),
+    limit: Optional[int] = Query(None, ge=1, description="Positions to return"),
+    db: AnySession = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
+) -> Any:
+    """
+    Retrieve a team's leaderboard for a metric.
+
+    Parameters:
+    - **metric**: What members are ranked by, as for GET /leaderboard
+    - **limit**: Positions to return
+
+    Returns:
+    - Leaderboard of the team's members, with the caller's own position
+
+    Raises:
+    - 400 Bad Request: If the metric is invalid
+    - 404 Not Found: If the caller is not a member of the team
+    """
+    check_metric(metric)
+    leaderboard = await AsyncLeaderboardService.get_team_leaderboard(
+        db, team_id, metric, page_size(limit), current_user.id
+    )
+    if not leaderboard:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Team not found",
+        )
+
+    return leaderboard
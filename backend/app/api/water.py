@@ -1,26 +1,106 @@
+import asyncio
+import io
 from datetime import date, timedelta
-from typing import Any, List
+from typing import Any, List, Optional, Tuple
+from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import (
+    APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
+)
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlmodel import Session
 
 from app.api.deps import get_current_active_user, get_db
-from app.models.user import User
+from app.core.config import settings
+from app.core.principal import Principal
+from app.core.pubsub import Subscription, broker
+from app.core.response_cache import response_cache
+from app.db.session import engine
 from app.schemas.goal import Goal, GoalCreate
 from app.schemas.streak import Streak
 from app.schemas.water import (
-    DailyWaterLog, DateRange, WaterLog, WaterLogCreate, WaterStats
+    DailyWaterLog, DateRange, WaterLog, WaterLogBatchCreate, WaterLogBatchResult,
+    WaterLogCreate, WaterLogImportResult, WaterLogPage, WaterProgress, WaterStats
+)
+from app.services.aio import (
+    AnySession, AsyncImportService, AsyncStatsService, AsyncWaterService, close_session
 )
+from app.services.export import EXPORT_FORMATS, ExportService
+from app.services.stats import GRANULARITIES, StatsService, period_range
 from app.services.water import WaterService
 
 router = APIRouter()
 
 
+def _strip_weak(tag: str) -> str:
+    """Drop the weak validator prefix from an entity tag."""
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+async def check_not_modified(
+    request: Request, response: Response, db: AnySession, user_id: UUID
+) -> Tuple[int, Optional[Response]]:
+    """
+    Tag a read response with the user's data version.
+
+    Sets a weak ETag on ``response`` and returns a 304 response instead when
+    the client's If-None-Match already holds it, so callers can skip reading
+    any water data. Today's date is part of the tag because "today", streaks
+    and period stats roll over at midnight without a write.
+
+    Returns:
+        The data version, for keying cached responses, and the 304 response
+        or None
+    """
+    version = await AsyncWaterService.get_data_version(db, user_id)
+    etag = f'W/"{version}-{date.today():%Y%m%d}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = {_strip_weak(tag) for tag in if_none_match.split(",")}
+        if "*" in tags or _strip_weak(etag) in tags:
+            return version, Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return version, None
+
+
+def format_event(progress: WaterProgress) -> str:
+    """Encode a progress snapshot as a server-sent event."""
+    return f"event: progress\ndata: {progress.model_dump_json()}\n\n"
+
+
+async def live_events(subscription: Subscription, progress: WaterProgress):
+    """
+    Yield the progress snapshot, then a new one after every update.
+
+    Updates that arrive while the client is still reading are folded into a
+    single event. Idle streams get a comment every LIVE_KEEPALIVE_SECONDS.
+    """
+    try:
+        yield format_event(progress)
+        while True:
+            try:
+                messages = await asyncio.wait_for(
+                    subscription.get(), settings.LIVE_KEEPALIVE_SECONDS
+                )
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            for message in messages:
+                progress = WaterService.apply_live_update(progress, message)
+            yield format_event(progress)
+    finally:
+        subscription.close()
+
+
 @router.post("/log", response_model=WaterLog)
-def log_water(
+async def log_water(
     log_in: WaterLogCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    db: AnySession = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
 ) -> Any:
     """
     Log a water intake event for the authenticated user.
@@ -34,25 +114,122 @@ def log_water(
     Returns:
     - Created water log entry with ID and timestamp
     """
-    return WaterService.create_log(db, current_user.id, log_in)
+    return await AsyncWaterService.create_log(db, current_user.id, log_in)
+
+
+@router.post("/log/batch", response_model=WaterLogBatchResult)
+async def log_water_batch(
+    batch_in: WaterLogBatchCreate,
+    db: AnySession = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
+) -> Any:
+    """
+    Log many water intake events at once, e.g. taps queued while offline.
+
+    All valid items are stored in a single transaction and the streak is
+    updated once for the whole batch, as activity on the day the batch is
+    received: backdated items count towards their own days' totals but not
+    towards the streak.
+
+    Parameters:
+    - **batch_in**: Batch containing:
+      - items: List of water log entries, each with amount, notes and
+        an optional timestamp (the original tap time); invalid items, such
+        as negative amounts, are rejected individually
+
+    Returns:
+    - Batch result with created/rejected counts and one result per item,
+      in submission order, carrying the created log or the rejection reason
+
+    Raises:
+    - 400 Bad Request: If the batch is empty or too large
+    """
+    if not batch_in.items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Batch must contain at least one item",
+        )
+    if len(batch_in.items) > settings.WATER_LOG_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch cannot exceed {settings.WATER_LOG_BATCH_MAX_ITEMS} items",
+        )
+
+    results = await AsyncWaterService.create_logs_batch(
+        db, current_user.id, batch_in.items
+    )
+    created = sum(1 for result in results if result.status == "created")
+
+    return {
+        "created": created,
+        "rejected": len(results) - created,
+        "results": results,
+    }
+
+
+@router.post("/import", response_model=WaterLogImportResult)
+async def import_logs(
+    file: UploadFile = File(..., description="CSV with timestamp, amount and notes columns"),
+    db: AnySession = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
+) -> Any:
+    """
+    Bulk-import historical water logs from a CSV file.
+
+    Meant for migrating from other trackers: rows are parsed as the upload is
+    read and inserted in large batches, then the daily totals and streak are
+    rebuilt once, all in one transaction.
+
+    Parameters:
+    - **file**: CSV with a header row. Columns:
+      - timestamp: ISO 8601 date-time (required)
+      - amount: Units of water (optional, defaults to 1)
+      - notes: Free text (optional)
+
+    Returns:
+    - Import result containing:
+      - imported: Number of logs created
+      - rejected: Number of invalid rows skipped
+      - errors: Details of the first rejected rows
+
+    Raises:
+    - 400 Bad Request: If the file is not UTF-8 CSV with a timestamp column
+    """
+    lines = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        return await AsyncImportService.import_csv(db, current_user.id, lines)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
 
 
 @router.get("/today", response_model=DailyWaterLog)
-def get_today_logs(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+async def get_today_logs(
+    request: Request,
+    response: Response,
+    db: AnySession = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
 ) -> Any:
     """
     Retrieve all water logs for the current day.
 
+    Supports conditional requests: send the returned ETag back in
+    If-None-Match to get 304 Not Modified while nothing has changed.
+
     Returns:
     - Daily water log summary containing:
       - date: Current date
       - total_amount: Sum of all water intake for today
       - logs: List of individual water log entries
     """
+    _, not_modified = await check_not_modified(request, response, db, current_user.id)
+    if not_modified is not None:
+        return not_modified
+
     today = date.today()
-    logs = WaterService.get_logs_for_day(db, current_user.id)
+    logs = await AsyncWaterService.get_logs_for_day(db, current_user.id)
     total_amount = sum(log.amount for log in logs)
 
     return {
@@ -62,10 +239,45 @@ def get_today_logs(
     }
 
 
+@router.get("/live")
+async def live_progress(
+    db: AnySession = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
+) -> Any:
+    """
+    Stream today's progress as server-sent events, instead of polling /today.
+
+    The first event carries the current snapshot; another follows whenever
+    a log or goal change for the user is committed, from any device. The
+    stream holds no database connection while open.
+
+    Returns:
+    - text/event-stream of "progress" events, each with:
+      - date: Day the total is for
+      - total_amount: Today's intake
+      - goal_amount / goal_achieved: Goal progress
+      - current_streak / longest_streak: Streak information
+    """
+    # Subscribe first so no update committed during the read is missed
+    subscription = broker.subscribe(WaterService.live_channel(current_user.id))
+    try:
+        progress = await AsyncWaterService.get_progress(db, current_user.id)
+        await close_session(db)
+    except BaseException:
+        subscription.close()
+        raise
+
+    return StreamingResponse(
+        live_events(subscription, progress),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/streak", response_model=Streak)
-def get_streak(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+async def get_streak(
+    db: AnySession = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
 ) -> Any:
     """
     Retrieve the user's current streak information.
@@ -76,7 +288,7 @@ def get_streak(
     Raises:
     - 404 Not Found: If streak data doesn't exist for the user
     """
-    streak = WaterService.get_streak(db, current_user.id)
+    streak = await AsyncWaterService.get_streak(db, current_user.id)
     if not streak:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -87,9 +299,9 @@ def get_streak(
 
 
 @router.get("/goal", response_model=Goal)
-def get_goal(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+async def get_goal(
+    db: AnySession = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
 ) -> Any:
     """
     Retrieve the user's current daily water intake goal.
@@ -100,7 +312,7 @@ def get_goal(
     Raises:
     - 404 Not Found: If goal data doesn't exist for the user
     """
-    goal = WaterService.get_goal(db, current_user.id)
+    goal = await AsyncWaterService.get_goal(db, current_user.id)
     if not goal:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -111,10 +323,10 @@ def get_goal(
 
 
 @router.post("/goal", response_model=Goal)
-def update_goal(
+async def update_goal(
     goal_in: GoalCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    db: AnySession = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
 ) -> Any:
     """
     Set or update the user's daily water intake goal.
@@ -126,19 +338,23 @@ def update_goal(
     Returns:
     - Updated goal object with the new target amount
     """
-    return WaterService.update_goal(db, current_user.id, goal_in.goal_amount)
+    return await AsyncWaterService.update_goal(db, current_user.id, goal_in.goal_amount)
 
 
 @router.get("/history", response_model=List[DailyWaterLog])
-def get_history(
+async def get_history(
+    request: Request,
+    response: Response,
     start_date: date = Query(..., description="Start date for history"),
     end_date: date = Query(..., description="End date for history"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    db: AnySession = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
 ) -> Any:
     """
     Retrieve water logs over a specified date range.
 
+    Supports conditional requests with ETag / If-None-Match.
+
     Parameters:
     - **start_date**: Beginning date for the history query (inclusive)
     - **end_date**: Ending date for the history query (inclusive)
@@ -147,17 +363,48 @@ def get_history(
     - List of daily water log summaries for each day in the range
       - Includes days with no logs (zero total_amount)
       - Sorted chronologically by date
+
+    Raises:
+    - 400 Bad Request: If the range is inverted or longer than HISTORY_MAX_DAYS;
+      use /history/logs to page through longer histories
     """
+    if end_date < start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_date must not be before start_date",
+        )
+    if (end_date - start_date).days + 1 > settings.HISTORY_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                f"Range cannot exceed {settings.HISTORY_MAX_DAYS} days; "
+                "use /history/logs for longer histories"
+            ),
+        )
+
+    version, not_modified = await check_not_modified(request, response, db, current_user.id)
+    if not_modified is not None:
+        return not_modified
+
+    # Keyed by data version, so a write that another worker handled, or one
+    # that committed while this response was computed, is never served stale
+    cache_key = ("history", version, start_date, end_date)
+    cached = response_cache.get(current_user.id, cache_key)
+    if cached is not None:
+        return cached
+
     date_range = DateRange(start_date=start_date, end_date=end_date)
-    logs_by_date = WaterService.get_logs_for_range(db, current_user.id, date_range)
+    logs_by_date = await AsyncWaterService.get_logs_for_range(
+        db, current_user.id, date_range
+    )
+    totals = await AsyncWaterService.get_daily_totals(db, current_user.id, date_range)
 
     result = []
     # Process days with logs
     for day, logs in logs_by_date.items():
-        total_amount = sum(log.amount for log in logs)
         result.append({
             "date": day,
-            "total_amount": total_amount,
+            "total_amount": totals.get(day, 0),
             "logs": logs,
         })
 
@@ -175,35 +422,210 @@ def get_history(
     # Sort by date
     result.sort(key=lambda x: x["date"])
 
+    # Cache validated models rather than session-bound ORM rows
+    result = [DailyWaterLog.model_validate(day, from_attributes=True) for day in result]
+    response_cache.set(current_user.id, cache_key, result, final=end_date < date.today())
+
     return result
 
 
+@router.get("/history/logs", response_model=WaterLogPage)
+async def get_history_logs(
+    start_date: Optional[date] = Query(None, description="Only logs on or after this date"),
+    end_date: Optional[date] = Query(None, description="Only logs on or before this date"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size"),
+    db: AnySession = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
+) -> Any:
+    """
+    Page through individual water logs, oldest first.
+
+    Uses keyset pagination on (timestamp, id), so every page is equally
+    cheap however far into the history it is.
+
+    Parameters:
+    - **start_date** / **end_date**: Optional inclusive date bounds
+    - **cursor**: Opaque cursor from the previous page's next_cursor
+    - **limit**: Page size (default HISTORY_PAGE_SIZE, capped at
+      HISTORY_MAX_PAGE_SIZE)
+
+    Returns:
+    - Page containing:
+      - items: Logs with id, timestamp, amount and notes
+      - next_cursor: Cursor for the next page, or null on the last page
+      - limit: The page size applied
+
+    Raises:
+    - 400 Bad Request: If the cursor is malformed
+    """
+    limit = min(limit or settings.HISTORY_PAGE_SIZE, settings.HISTORY_MAX_PAGE_SIZE)
+
+    after = None
+    if cursor is not None:
+        try:
+            after = WaterService.decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor",
+            )
+
+    date_range = None
+    if start_date is not None or end_date is not None:
+        date_range = DateRange(
+            start_date=start_date or date.min,
+            end_date=end_date or date.max,
+        )
+
+    rows, next_key = await AsyncWaterService.get_log_page(
+        db, current_user.id, limit, after=after, date_range=date_range
+    )
+
+    # Serialize the row tuples directly; returning a Response skips
+    # re-validating every item through the response model.
+    return JSONResponse({
+        "items": [
+            {
+                "id": str(log_id),
+                "timestamp": timestamp.isoformat(),
+                "amount": amount,
+                "notes": notes,
+            }
+            for log_id, timestamp, amount, notes in rows
+        ],
+        "next_cursor": WaterService.encode_cursor(next_key) if next_key else None,
+        "limit": limit,
+    })
+
+
 @router.get("/stats", response_model=WaterStats)
-def get_stats(
-    period: str = Query(..., description="Period for stats (weekly or monthly)"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+async def get_stats(
+    request: Request,
+    response: Response,
+    period: Optional[str] = Query(None, description="Period for stats (weekly or monthly)"),
+    granularity: str = Query("day", description="Bucket size: hour, weekday, day, week, month or year"),
+    start_date: Optional[date] = Query(None, description="Start date for a custom range"),
+    end_date: Optional[date] = Query(None, description="End date for a custom range"),
+    db: AnySession = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
 ) -> Any:
     """
     Retrieve aggregated water intake statistics for visualization.
 
+    Supports conditional requests with ETag / If-None-Match.
+
     Parameters:
-    - **period**: Time period for statistics aggregation
-      - 'weekly': Returns data for the current week (Sunday to Saturday)
+    - **period**: Named time period for statistics aggregation
+      - 'weekly': Returns data for the current week (Monday to Sunday)
       - 'monthly': Returns data for the current month
+    - **granularity**: How to bucket intake (default: 'day')
+      - 'hour': Hour of day (0-23), summed over the range
+      - 'weekday': Day of week (0 = Monday), summed over the range
+      - 'day', 'week' (ISO week), 'month', 'year': Calendar buckets
+    - **start_date** / **end_date**: Custom range (inclusive), used when no
+      period is given
 
     Returns:
     - Water statistics object containing:
-      - period: The requested period ('weekly' or 'monthly')
-      - data: List of daily records with date and amount
+      - period: The requested period ('weekly', 'monthly' or 'custom')
+      - granularity: The bucket size used
+      - data: One record per bucket with its amount, including empty buckets
+
+    Raises:
+    - 400 Bad Request: If the period, granularity or date range is invalid,
+      or the range has more than STATS_MAX_BUCKETS buckets
+    """
+    if period is not None:
+        if period not in ["weekly", "monthly"]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid period. Must be 'weekly' or 'monthly'",
+            )
+        start_date, end_date = period_range(period)
+    elif start_date is None or end_date is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Either period or both start_date and end_date are required",
+        )
+
+    if granularity not in GRANULARITIES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid granularity. Must be one of: {', '.join(GRANULARITIES)}",
+        )
+    if end_date < start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_date must not be before start_date",
+        )
+    if StatsService.bucket_count(granularity, start_date, end_date) > settings.STATS_MAX_BUCKETS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                f"Range cannot exceed {settings.STATS_MAX_BUCKETS} {granularity} buckets; "
+                "use a coarser granularity"
+            ),
+        )
+
+    version, not_modified = await check_not_modified(request, response, db, current_user.id)
+    if not_modified is not None:
+        return not_modified
+
+    period = period or "custom"
+    # Keyed by data version, like /history
+    cache_key = ("stats", version, period, granularity, start_date, end_date)
+    stats = response_cache.get(current_user.id, cache_key)
+    if stats is None:
+        stats = await AsyncStatsService.aggregate(
+            db,
+            current_user.id,
+            granularity,
+            start_date,
+            end_date,
+            period=period,
+        )
+        response_cache.set(current_user.id, cache_key, stats, final=end_date < date.today())
+
+    return stats
+
+
+@router.get("/export")
+async def export_logs(
+    fmt: str = Query("ndjson", alias="format", description="ndjson, csv or arrow"),
+    db: AnySession = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
+) -> Any:
+    """
+    Stream every water log of the authenticated user.
+
+    Rows are read through a server-side cursor and written in chunks, so
+    memory use stays flat however long the history is.
+
+    Parameters:
+    - **format**: ndjson (default), csv or arrow (Arrow IPC stream, requires pyarrow)
+
+    Returns:
+    - Streamed file with id, user_id, timestamp, amount and notes per log
 
     Raises:
-    - 400 Bad Request: If period is not 'weekly' or 'monthly'
+    - 400 Bad Request: If the format is unknown or unavailable
     """
-    if period not in ["weekly", "monthly"]:
+    try:
+        ExportService.check_format(fmt)
+    except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid period. Must be 'weekly' or 'monthly'",
+            detail=str(e),
         )
 
-    return WaterService.get_stats(db, current_user.id, period)
+    # The stream outlives this request's session, so it reads through its
+    # own sync session on the same database.
+    bind = db.get_bind() if isinstance(db, Session) else engine
+    return StreamingResponse(
+        ExportService.stream(bind, fmt, user_id=current_user.id),
+        media_type=EXPORT_FORMATS[fmt],
+        headers={
+            "Content-Disposition": f'attachment; filename="water-logs.{fmt}"',
+        },
+    )
@@ -0,0 +1,23 @@
+import argparse
+import sys
+from typing import List, Optional
+
+from app.cli import export, import_logs
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Parse the command line and run the chosen command."""
+    parser = argparse.ArgumentParser(
+        prog="python -m app.cli",
+        description="Water Reminder maintenance commands.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export.add_parser(subparsers)
+    import_logs.add_parser(subparsers)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
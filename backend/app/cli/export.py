@@ -0,0 +1,80 @@
+import argparse
+import sys
+from typing import Optional
+from uuid import UUID
+
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.db.session import create_db_engine
+from app.services.export import EXPORT_FORMATS, ExportService
+from app.services.user import UserService
+
+
+def add_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Register the ``export`` command."""
+    parser = subparsers.add_parser(
+        "export",
+        help="Stream water logs to a file or stdout",
+        description="Stream water logs of one user or the whole deployment.",
+    )
+    parser.add_argument(
+        "--format", dest="fmt", choices=list(EXPORT_FORMATS), default="ndjson",
+        help="Output format (default: ndjson)",
+    )
+    parser.add_argument(
+        "--user", help="Email or id of the user to export (default: all users)",
+    )
+    parser.add_argument(
+        "-o", "--output", help="Output file (default: stdout)",
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=settings.EXPORT_CHUNK_SIZE,
+        help=f"Rows per database round trip (default: {settings.EXPORT_CHUNK_SIZE})",
+    )
+    parser.add_argument(
+        "--database-url", default=settings.SQLALCHEMY_DATABASE_URI,
+        help="Database to read from (default: the configured database)",
+    )
+    parser.set_defaults(handler=run)
+
+
+def resolve_user_id(db: Session, user: str) -> Optional[UUID]:
+    """Look up a user by id or email."""
+    try:
+        db_user = UserService.get_by_id(db, UUID(user))
+    except ValueError:
+        db_user = UserService.get_by_email(db, user)
+    return db_user.id if db_user else None
+
+
+def run(args: argparse.Namespace) -> int:
+    """Run the export command."""
+    try:
+        ExportService.check_format(args.fmt)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    engine = create_db_engine(args.database_url)
+    try:
+        user_id = None
+        if args.user:
+            with Session(engine) as db:
+                user_id = resolve_user_id(db, args.user)
+            if user_id is None:
+                print(f"User {args.user!r} not found", file=sys.stderr)
+                return 1
+
+        chunks = ExportService.stream(engine, args.fmt, user_id=user_id, chunk_size=args.chunk_size)
+        if args.output:
+            with open(args.output, "wb") as out:
+                for chunk in chunks:
+                    out.write(chunk)
+        else:
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+    finally:
+        engine.dispose()
+    return 0
@@ -0,0 +1,61 @@
+import argparse
+import sys
+
+from sqlmodel import Session
+
+from app.cli.export import resolve_user_id
+from app.core.config import settings
+from app.db.session import create_db_engine
+from app.services.importer import ImportService
+
+
+def add_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Register the ``import`` command."""
+    parser = subparsers.add_parser(
+        "import",
+        help="Bulk-load a CSV of water logs for one user",
+        description=(
+            "Bulk-load a CSV of water logs (timestamp, amount, notes columns) "
+            "for one user, then rebuild their daily totals and streak."
+        ),
+    )
+    parser.add_argument("path", help="CSV file to import, or - for stdin")
+    parser.add_argument(
+        "--user", required=True, help="Email or id of the user to import into",
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=settings.IMPORT_BATCH_SIZE,
+        help=f"Rows per COPY / executemany call (default: {settings.IMPORT_BATCH_SIZE})",
+    )
+    parser.add_argument(
+        "--database-url", default=settings.SQLALCHEMY_DATABASE_URI,
+        help="Database to write to (default: the configured database)",
+    )
+    parser.set_defaults(handler=run)
+
+
+def run(args: argparse.Namespace) -> int:
+    """Run the import command."""
+    engine = create_db_engine(args.database_url)
+    try:
+        with Session(engine) as db:
+            user_id = resolve_user_id(db, args.user)
+            if user_id is None:
+                print(f"User {args.user!r} not found", file=sys.stderr)
+                return 1
+
+            if args.path == "-":
+                result = ImportService.import_csv(db, user_id, sys.stdin, args.batch_size)
+            else:
+                with open(args.path, encoding="utf-8-sig", newline="") as lines:
+                    result = ImportService.import_csv(db, user_id, lines, args.batch_size)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    finally:
+        engine.dispose()
+
+    for error in result.errors:
+        print(error, file=sys.stderr)
+    print(f"Imported {result.imported} logs, rejected {result.rejected}")
+    return 0
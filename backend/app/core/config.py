@@ -6,8 +6,24 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     SECRET_KEY: str = "water-reminder-secret-key-for-development"  # Default value
-    # 60 minutes * 24 hours * 8 days = 8 days
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
+    # Access tokens are short-lived; clients renew them with a refresh token
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    # How often expired refresh tokens are swept (0 disables the sweeper)
+    REFRESH_TOKEN_SWEEP_INTERVAL_SECONDS: int = 60 * 60
+    # bcrypt cost factor; stored hashes with another cost are upgraded on login
+    BCRYPT_ROUNDS: int = 12
+    # Processes dedicated to password hashing (0 hashes in the threadpool)
+    PASSWORD_HASH_WORKERS: int = 2
+    # Authenticated principals are cached per token to skip the user lookup;
+    # set either value to 0 to disable the cache
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    # Computed stats and history responses are cached per user until their
+    # data changes; responses covering today expire after the TTL so they
+    # roll over at midnight. Set the size to 0 to disable the cache
+    RESPONSE_CACHE_SIZE: int = 10000
+    RESPONSE_CACHE_TTL_SECONDS: int = 300
     # BACKEND_CORS_ORIGINS is a JSON-formatted list of origins
     # e.g: '["http://localhost", "http://localhost:4200", "http://localhost:3000", \
     # "http://localhost:8080", "http://local.dockertoolbox.tiangolo.com"]'
@@ -23,6 +39,53 @@ class Settings(BaseSettings):
 
     PROJECT_NAME: str = "Water Reminder Button API"
 
+    # Largest number of logs accepted by POST /water/log/batch
+    WATER_LOG_BATCH_MAX_ITEMS: int = 1000
+    # Largest amount of a single log, however it is written
+    WATER_LOG_MAX_AMOUNT: int = 1000
+    # Paginated history: default and maximum page size
+    HISTORY_PAGE_SIZE: int = 100
+    HISTORY_MAX_PAGE_SIZE: int = 1000
+    # Longest date range GET /water/history returns in one response
+    HISTORY_MAX_DAYS: int = 366
+    # Most calendar buckets GET /water/stats returns in one response
+    STATS_MAX_BUCKETS: int = 1000
+    # Request, pool and domain metrics served at /metrics
+    METRICS_ENABLED: bool = True
+    # Per-request query counts and DB time in a Server-Timing header
+    SQL_INSTRUMENTATION_ENABLED: bool = True
+    # Statements at least this slow are logged to the app.sql logger
+    SLOW_QUERY_MS: int = 200
+    # Warn when one statement runs this many times in a request, 0 disables
+    N_PLUS_ONE_THRESHOLD: int = 10
+    # Reminder dispatch from each user's next_reminder_at: due rows are
+    # claimed every REMINDER_TICK_SECONDS, REMINDER_BATCH_SIZE at a time, and
+    # held for REMINDER_LEASE_SECONDS while being sent, to REMINDER_SINK_FILE
+    # as JSON lines if set
+    REMINDERS_ENABLED: bool = True
+    REMINDER_TICK_SECONDS: float = 1.0
+    REMINDER_BATCH_SIZE: int = 1000
+    REMINDER_LEASE_SECONDS: int = 60
+    REMINDER_SINK_FILE: Optional[str] = None
+    # Idle GET /water/live streams send a comment this often so proxies keep
+    # them open
+    LIVE_KEEPALIVE_SECONDS: float = 15.0
+    # Leaderboards: positions returned by default and at most, and how often
+    # the in-memory rank indexes are rebuilt from the leaderboard table to
+    # pick up other workers' changes (0 only rebuilds them at midnight)
+    LEADERBOARD_PAGE_SIZE: int = 10
+    LEADERBOARD_MAX_PAGE_SIZE: int = 100
+    LEADERBOARD_REFRESH_SECONDS: int = 300
+    # Rebuild stale rank indexes in a background task while readers keep
+    # serving the old ones; off, the first reader after expiry rebuilds inline
+    LEADERBOARD_BACKGROUND_REFRESH: bool = True
+    # Largest team; team leaderboards are ranked on read
+    TEAM_MAX_MEMBERS: int = 50
+    # Rows fetched per server-side cursor round trip when exporting
+    EXPORT_CHUNK_SIZE: int = 5000
+    # Rows written per COPY / executemany call when importing
+    IMPORT_BATCH_SIZE: int = 10000
+
     # Database configuration
     SQLITE_DB: str = "sqlite:///./water_reminder.db"
     POSTGRES_SERVER: Optional[str] = None
@@ -31,11 +94,40 @@ class Settings(BaseSettings):
     POSTGRES_DB: Optional[str] = None
     SQLALCHEMY_DATABASE_URI: Optional[str] = None
 
+    # Connection pool sizing (ignored for in-memory SQLite)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # seconds before a connection is replaced, -1 never
+    DB_POOL_PRE_PING: bool = True
+
+    # SQLite pragmas applied to every new connection
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE: int = -20000  # negative values are KiB, i.e. ~20 MB
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+
+    # Serve requests through an asyncio engine (aiosqlite / asyncpg) instead
+    # of the blocking one. The async URL is derived from the sync one unless
+    # given explicitly.
+    ASYNC_DATABASE: bool = False
+    ASYNC_SQLALCHEMY_DATABASE_URI: Optional[str] = None
+
     @model_validator(mode='after')
     def setup_db_connection(self) -> 'Settings':
-        if self.SQLALCHEMY_DATABASE_URI:
-            return self
+        if not self.SQLALCHEMY_DATABASE_URI:
+            self.SQLALCHEMY_DATABASE_URI = self.build_database_uri()
+
+        if not self.ASYNC_SQLALCHEMY_DATABASE_URI:
+            self.ASYNC_SQLALCHEMY_DATABASE_URI = to_async_uri(
+                str(self.SQLALCHEMY_DATABASE_URI)
+            )
 
+        return self
+
+    def build_database_uri(self) -> str:
+        """Build the sync database URL from the PostgreSQL or SQLite settings."""
         # If PostgreSQL configuration is provided, use it
         if (
             self.POSTGRES_SERVER
@@ -43,20 +135,29 @@ class Settings(BaseSettings):
             and self.POSTGRES_PASSWORD
             and self.POSTGRES_DB
         ):
-            self.SQLALCHEMY_DATABASE_URI = PostgresDsn.build(
+            return str(PostgresDsn.build(
                 scheme="postgresql",
                 username=self.POSTGRES_USER,
                 password=self.POSTGRES_PASSWORD,
                 host=self.POSTGRES_SERVER,
-                path=f"/{self.POSTGRES_DB}",
-            )
-        else:
-            # Otherwise use SQLite
-            self.SQLALCHEMY_DATABASE_URI = self.SQLITE_DB
+                path=f"{self.POSTGRES_DB}",
+            ))
 
-        return self
+        # Otherwise use SQLite
+        return self.SQLITE_DB
 
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=True)
 
 
+def to_async_uri(uri: str) -> str:
+    """Swap the driver of a database URL for its asyncio counterpart."""
+    scheme, sep, rest = uri.partition("://")
+    backend = scheme.split("+", 1)[0]
+    if backend == "sqlite":
+        return f"sqlite+aiosqlite{sep}{rest}"
+    if backend in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    return uri
+
+
 settings = Settings()
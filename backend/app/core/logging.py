@@ -1,8 +1,9 @@
 import logging
 import sys
-from typing import Any, Dict, List, Tuple
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Tuple
 
-from loguru import logger
 from pydantic import BaseModel
 
 
@@ -13,6 +14,8 @@ class InterceptHandler(logging.Handler):
     """
 
     def emit(self, record: logging.LogRecord) -> None:
+        from loguru import logger
+
         # Get corresponding Loguru level if it exists
         try:
             level = logger.level(record.levelname).name
@@ -38,7 +41,12 @@ class LoggingSettings(BaseModel):
 def setup_logging() -> None:
     """
     Configure logging with loguru.
+
+    Called from the application lifespan rather than at import time, so
+    loguru is only loaded by processes that actually serve the app.
     """
+    from loguru import logger
+
     logging_settings = LoggingSettings()
     
     # Remove default handlers
@@ -66,3 +74,16 @@ def setup_logging() -> None:
         logging_logger = logging.getLogger(logger_name)
         logging_logger.handlers = [InterceptHandler()]
         logging_logger.propagate = False
+
+
+@contextmanager
+def log_duration(label: str) -> Iterator[None]:
+    """
+    Log how long the wrapped block took, e.g. for startup phases.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        logging.getLogger("app.timing").info(f"{label} took {elapsed_ms:.1f} ms")
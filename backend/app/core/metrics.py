@@ -0,0 +1,380 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from sub-millisecond cache hits up to slow
+# exports
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """Base class for metrics with an optional fixed set of label names."""
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[LabelValues, Any] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: Any) -> Any:
+        """Get the child metric for one combination of label values."""
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+
+    def collect(self) -> List[str]:
+        """Render the metric's samples in the Prometheus text format."""
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        """Drop every recorded sample."""
+        with self._lock:
+            self._children.clear()
+
+
+class _Value:
+    """A single float guarded by a lock."""
+
+    def __init__(self) -> None:
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    type = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1) -> None:
+        """Increment the unlabelled counter."""
+        self.labels().inc(amount)
+
+    def collect(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+            for key, child in list(self._children.items())
+        ]
+
+
+class Gauge(Counter):
+    """
+    Value that can go up and down.
+
+    With a ``callback`` the gauge is computed at scrape time instead; the
+    callback returns a mapping of label values to readings.
+    """
+
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        callback: Optional[Callable[[], Dict[LabelValues, float]]] = None,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def dec(self, amount: float = 1) -> None:
+        """Decrement the unlabelled gauge."""
+        self.labels().dec(amount)
+
+    def set(self, value: float) -> None:
+        """Set the unlabelled gauge."""
+        self.labels().set(value)
+
+    def collect(self) -> List[str]:
+        if self.callback is None:
+            return super().collect()
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in self.callback().items()
+        ]
+
+
+class _HistogramValue:
+    """Bucket counts, sum and count of one histogram child."""
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self.sum += value
+            self.count += 1
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[index] += 1
+                    break
+
+
+class Histogram(_Metric):
+    """Distribution of observations, e.g. latencies, in cumulative buckets."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        """Record an observation on the unlabelled histogram."""
+        self.labels().observe(value)
+
+    def collect(self) -> List[str]:
+        lines = []
+        for key, child in list(self._children.items()):
+            with child._lock:
+                counts, total, count = list(child.counts), child.sum, child.count
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(
+                    self.labelnames + ("le",), key + (_format_value(bound),)
+                )
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together for a scrape."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        callback: Optional[Callable[[], Dict[LabelValues, float]]] = None,
+    ) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, callback))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {_escape(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        """Reset every metric that records samples."""
+        for metric in self._metrics.values():
+            metric.clear()
+
+
+registry = Registry()
+
+# HTTP
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total", "HTTP requests handled.", ("method", "route", "status"),
+)
+HTTP_REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency.", ("method", "route"),
+)
+HTTP_REQUESTS_IN_PROGRESS = registry.gauge(
+    "http_requests_in_progress", "HTTP requests currently being handled.", ("method",),
+)
+HTTP_STREAMS_OPEN = registry.gauge(
+    "http_streams_open", "Server-sent event streams currently open.", ("route",),
+)
+
+# Database pool
+DB_POOL_CHECKOUTS = registry.counter(
+    "db_pool_checkouts_total", "Connections checked out of the pool.",
+)
+DB_POOL_CHECKOUT_DURATION = registry.histogram(
+    "db_pool_checkout_seconds",
+    "Time to get a connection from the pool, including waiting for a free one.",
+)
+
+# Domain
+WATER_TAPS = registry.counter("water_taps_total", "Water intake events logged.")
+STREAK_UPDATES = registry.counter("streak_updates_total", "Streak updates applied.")
+REMINDERS_SENT = registry.counter("reminders_sent_total", "Due reminders sent to the sink.")
+REMINDER_DISPATCH_LAG = registry.histogram(
+    "reminder_dispatch_lag_seconds",
+    "Time from a reminder coming due to it being sent.",
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 900.0, 3600.0),
+)
+
+
+def register_pool_gauges(status: Callable[[], Dict[str, Any]]) -> None:
+    """
+    Expose connection pool occupancy, read at scrape time.
+
+    Args:
+        status: Callable returning a pool_status() style readout
+    """
+    for field, documentation in (
+        ("size", "Configured pool size."),
+        ("checkedout", "Connections currently checked out."),
+        ("checkedin", "Idle connections in the pool."),
+        ("overflow", "Connections open beyond the pool size."),
+    ):
+        def read(field: str = field) -> Dict[LabelValues, float]:
+            value = status().get(field)
+            return {} if value is None else {(): value}
+
+        registry.gauge(f"db_pool_{field}", documentation, callback=read)
+
+
+def route_template(scope: Dict[str, Any]) -> str:
+    """
+    Path template of the route that handled a request, e.g. ``/api/v1/x/{id}``.
+
+    Routes of included routers only know their own path; FastAPI versions that
+    include routers lazily record the full prefixed path on the request's
+    effective route context, so prefer that when present.
+    """
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    path = getattr(context, "path", None) or getattr(scope.get("route"), "path", None)
+    return path or "unmatched"
+
+
+# Methods labelled as themselves; any other is "other", so clients cannot
+# grow the label set by inventing methods
+HTTP_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+
+
+def is_event_stream(message: Dict[str, Any]) -> bool:
+    """Whether an ``http.response.start`` message opens a server-sent event stream."""
+    return any(
+        name == b"content-type" and value.startswith(b"text/event-stream")
+        for name, value in message.get("headers", ())
+    )
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording per-route request counts and latency.
+
+    Requests are labelled with the matched route template rather than the
+    raw path, so label cardinality stays bounded. A plain ASGI middleware
+    keeps the overhead to a timer and a few dictionary lookups per request.
+
+    Server-sent event streams stay open for as long as the client listens:
+    once their headers are sent they move from the in-progress gauge to
+    ``http_streams_open`` and are left out of the latency histogram.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"] if scope["method"] in HTTP_METHODS else "other"
+        status_code = 500
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        stream = None
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status_code, stream
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if is_event_stream(message):
+                    in_progress.dec()
+                    stream = HTTP_STREAMS_OPEN.labels(route_template(scope))
+                    stream.inc()
+            await send(message)
+
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            template = route_template(scope)
+            HTTP_REQUESTS.labels(method, template, status_code).inc()
+            if stream is None:
+                in_progress.dec()
+                HTTP_REQUEST_DURATION.labels(method, template).observe(elapsed)
+            else:
+                stream.dec()
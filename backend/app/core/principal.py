@@ -0,0 +1,101 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Set, Tuple
+from uuid import UUID
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    Lightweight identity of an authenticated user.
+
+    Carries only what request handlers need, so it is cheap to cache and
+    never triggers lazy loads of the User relationships.
+    """
+    id: UUID
+    is_active: bool
+
+
+class PrincipalCache:
+    """
+    Bounded LRU cache of principals with a time-to-live.
+
+    Entries are keyed by token subject and the token itself, so a cached
+    principal is only ever returned for the exact token it was resolved
+    from. Entries for a user can be dropped explicitly when the user changes.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Principal]]" = OrderedDict()
+        self._keys_by_subject: Dict[str, Set[Tuple[str, str]]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl > 0
+
+    def get(self, subject: str, token: str) -> Optional[Principal]:
+        """Return the cached principal for a token, if present and fresh."""
+        if not self.enabled:
+            return None
+
+        key = (subject, token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, principal = entry
+            if expires_at <= time.monotonic():
+                self._discard(key)
+                return None
+            self._entries.move_to_end(key)
+            return principal
+
+    def set(self, subject: str, token: str, principal: Principal) -> None:
+        """Cache the principal a token resolved to."""
+        if not self.enabled:
+            return
+
+        key = (subject, token)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, principal)
+            self._entries.move_to_end(key)
+            self._keys_by_subject.setdefault(subject, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+
+    def invalidate(self, user_id: UUID) -> None:
+        """Drop every cached principal for a user."""
+        with self._lock:
+            for key in list(self._keys_by_subject.get(str(user_id), ())):
+                self._discard(key)
+
+    def clear(self) -> None:
+        """Drop every cached principal."""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_subject.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _discard(self, key: Tuple[str, str]) -> None:
+        self._entries.pop(key, None)
+        keys = self._keys_by_subject.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_subject[key[0]]
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,171 @@
+import asyncio
+import json
+import logging
+import threading
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Called with (channel, message) for every message a backend receives
+Deliver = Callable[[str, str], None]
+
+
+class PubSubBackend:
+    """
+    Transport for Broker messages.
+
+    Subclass this to fan messages out between worker processes, e.g. over
+    Redis pub/sub or PostgreSQL LISTEN/NOTIFY: ``publish`` sends a message to
+    every worker and ``start`` hands the backend the callback to feed with
+    messages received from any worker, this one included. Messages are JSON
+    strings so they can cross process boundaries.
+    """
+
+    # Whether messages reach other workers. When they do not, publishing to a
+    # channel nobody in this process listens on is skipped outright
+    shared = True
+
+    def start(self, deliver: Deliver) -> None:
+        """Begin passing every received message to ``deliver``."""
+        raise NotImplementedError
+
+    def publish(self, channel: str, message: str) -> None:
+        """Send a message to every worker; may be called from any thread."""
+        raise NotImplementedError
+
+    def stop(self) -> None:
+        """Stop receiving and release any connections."""
+
+
+class LocalBackend(PubSubBackend):
+    """Delivers messages within this process only; the default."""
+
+    shared = False
+
+    def __init__(self) -> None:
+        self._deliver: Optional[Deliver] = None
+
+    def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+
+    def publish(self, channel: str, message: str) -> None:
+        if self._deliver is not None:
+            self._deliver(channel, message)
+
+
+class Subscription:
+    """
+    One listener on a channel, consumed with ``async for``.
+
+    Holds at most the latest message of each ``type`` not yet consumed, so a
+    slow or idle listener costs a small dict and an asyncio.Event however
+    many messages are published, and catches up with current state instead
+    of replaying stale updates.
+    """
+
+    def __init__(self, broker: "Broker", channel: str) -> None:
+        self.broker = broker
+        self.channel = channel
+        self._loop = asyncio.get_running_loop()
+        self._pending: Dict[Any, Dict[str, Any]] = {}
+        self._ready = asyncio.Event()
+
+    def _put(self, message: Dict[str, Any]) -> None:
+        """Queue a message; runs on the subscriber's event loop."""
+        self._pending[message.get("type")] = message
+        self._ready.set()
+
+    async def get(self) -> List[Dict[str, Any]]:
+        """Wait for messages and return those pending, oldest type first."""
+        await self._ready.wait()
+        self._ready.clear()
+        messages = list(self._pending.values())
+        self._pending.clear()
+        return messages
+
+    def close(self) -> None:
+        """Stop listening."""
+        self.broker.unsubscribe(self)
+
+    def __aiter__(self) -> AsyncIterator[List[Dict[str, Any]]]:
+        return self
+
+    async def __anext__(self) -> List[Dict[str, Any]]:
+        return await self.get()
+
+
+class Broker:
+    """
+    In-process publish/subscribe hub.
+
+    Subscriptions live on the event loop; messages may be published from any
+    thread, such as a sync service running in the threadpool, and are handed
+    to each subscriber's loop without blocking the publisher. The backend
+    decides whether messages also reach subscribers in other workers.
+    """
+
+    def __init__(self, backend: PubSubBackend) -> None:
+        self.backend = backend
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+        backend.start(self._deliver)
+
+    def use(self, backend: PubSubBackend) -> None:
+        """Switch to another backend, e.g. a cross-worker one at startup."""
+        self.backend.stop()
+        self.backend = backend
+        backend.start(self._deliver)
+
+    def subscribe(self, channel: str) -> Subscription:
+        """Listen on a channel; call from the event loop that will consume it."""
+        subscription = Subscription(self, channel)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Stop delivering to a subscription."""
+        with self._lock:
+            subscriptions = self._subscribers.get(subscription.channel)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscribers[subscription.channel]
+
+    def publish(self, channel: str, payload: Dict[str, Any]) -> None:
+        """Publish a JSON-serializable message to a channel's subscribers."""
+        if not self.backend.shared and channel not in self._subscribers:
+            return
+        try:
+            self.backend.publish(channel, json.dumps(payload, default=str))
+        except Exception:
+            # Live updates are best effort; the write they report succeeded
+            logger.exception(f"Publishing to {channel} failed")
+
+    def subscriber_count(self) -> int:
+        """Number of subscriptions in this process."""
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscribers.values())
+
+    def close(self) -> None:
+        """Stop the backend."""
+        self.backend.stop()
+
+    def _deliver(self, channel: str, message: str) -> None:
+        """Hand a received message to the channel's local subscribers."""
+        with self._lock:
+            subscriptions = list(self._subscribers.get(channel, ()))
+        if not subscriptions:
+            return
+        payload = json.loads(message)
+        for subscription in subscriptions:
+            try:
+                subscription._loop.call_soon_threadsafe(subscription._put, payload)
+            except RuntimeError:
+                # The subscriber's loop has closed
+                self.unsubscribe(subscription)
+
+
+# Live updates of users' water data; call broker.use() with a shared backend
+# when running several workers
+broker = Broker(LocalBackend())
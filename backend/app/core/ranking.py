@@ -0,0 +1,297 @@
+import threading
+import time
+from datetime import date
+from typing import Callable, Dict, Hashable, Iterable, List, NamedTuple, Optional, Tuple
+
+from app.core.config import settings
+
+# (key, score, rank) of one leaderboard position
+Ranked = Tuple[Hashable, int, int]
+
+# Scores above this rank as equal to it; far beyond any real streak or
+# weekly intake, and it keeps every index operation to 32 steps
+MAX_SCORE = 2**32 - 1
+
+
+class RankIndex:
+    """
+    Order-statistic index of non-negative integer scores.
+
+    Counts per score are kept in a sparse Fenwick tree over the fixed range
+    0..``max_score``, so the rank of a score and the score at a given
+    position take O(log max_score) steps however many keys are indexed, and
+    memory grows with the number of distinct scores rather than with their
+    size. Scores are clamped to that range. Keys sharing a score are kept in
+    the order they reached it. Ranks are competition ranks: equal scores
+    share a rank and the next score's rank skips past them (1, 2, 2, 4).
+    """
+
+    def __init__(self, max_score: int = MAX_SCORE) -> None:
+        self.max_score = max_score
+        self._capacity = 1 << max_score.bit_length()  # Fenwick positions 1..capacity
+        self._tree: Dict[int, int] = {}
+        self._scores: Dict[Hashable, int] = {}
+        self._buckets: Dict[int, Dict[Hashable, None]] = {}
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._scores
+
+    def set(self, key: Hashable, score: int) -> None:
+        """Index ``key`` with ``score``, replacing its previous score."""
+        score = min(max(0, score), self.max_score)
+        previous = self._scores.get(key)
+        if previous == score:
+            return
+        if previous is not None:
+            self._remove(key, previous)
+        self._scores[key] = score
+        self._buckets.setdefault(score, {})[key] = None
+        self._add(score, 1)
+
+    def discard(self, key: Hashable) -> None:
+        """Remove ``key`` if indexed."""
+        previous = self._scores.get(key)
+        if previous is not None:
+            self._remove(key, previous)
+
+    def score(self, key: Hashable) -> Optional[int]:
+        """Score of ``key``, None if not indexed."""
+        return self._scores.get(key)
+
+    def rank(self, key: Hashable) -> Optional[int]:
+        """Rank of ``key``, 1 for the highest score; None if not indexed."""
+        score = self._scores.get(key)
+        if score is None:
+            return None
+        return len(self._scores) - self._prefix(score) + 1
+
+    def top(self, k: int) -> List[Ranked]:
+        """The ``k`` best (key, score, rank), best first."""
+        results: List[Ranked] = []
+        position = 1
+        while len(results) < k and position <= len(self._scores):
+            score = self._select(len(self._scores) - position + 1)
+            bucket = self._buckets[score]
+            for key in bucket:
+                results.append((key, score, position))
+                if len(results) == k:
+                    break
+            position += len(bucket)
+        return results
+
+    def _remove(self, key: Hashable, score: int) -> None:
+        del self._scores[key]
+        bucket = self._buckets[score]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[score]
+        self._add(score, -1)
+
+    def _add(self, score: int, delta: int) -> None:
+        tree = self._tree
+        i = score + 1
+        while i <= self._capacity:
+            count = tree.get(i, 0) + delta
+            if count:
+                tree[i] = count
+            else:
+                # Drop empty nodes so the tree only holds occupied ranges
+                del tree[i]
+            i += i & -i
+
+    def _prefix(self, score: int) -> int:
+        """Number of keys with a score of at most ``score``."""
+        tree = self._tree
+        i, total = score + 1, 0
+        while i > 0:
+            total += tree.get(i, 0)
+            i -= i & -i
+        return total
+
+    def _select(self, position: int) -> int:
+        """Score of the ``position``-th lowest key, counting from 1."""
+        tree = self._tree
+        i = 0
+        step = self._capacity
+        while step:
+            j = i + step
+            count = tree.get(j, 0)
+            if j <= self._capacity and count < position:
+                i = j
+                position -= count
+            step >>= 1
+        return i
+
+
+class Standings(NamedTuple):
+    """A read of one leaderboard."""
+    top: List[Tuple[Hashable, Optional[str], int, int]]  # (key, name, score, rank)
+    mine: Optional[Tuple[Hashable, Optional[str], int, int]]  # The key's, if on the board
+    total: int  # Keys on the board
+
+
+class Leaderboards:
+    """
+    Process-wide rank indexes of the global leaderboards, one per metric.
+
+    Boards are built from the persisted leaderboard table on first read and
+    then kept current by applying each committed change of an entry's scores.
+    A board goes stale on a new day, since current streaks lapse and weekly
+    totals reset without a write, and once older than ``max_age`` seconds
+    (0 never) so it picks up other workers' changes. In ``background`` mode
+    readers keep serving a stale board and refresh() rebuilds it off the
+    request path; otherwise the first reader to find it stale rebuilds it.
+    Changes applied while a board is being rebuilt are replayed onto the new
+    board, so none are lost to the swap.
+    """
+
+    def __init__(self, max_age: float, background: bool = False) -> None:
+        self.max_age = max_age
+        self.background = background
+        self._boards: Dict[str, Tuple[RankIndex, date, float]] = {}
+        self._names: Dict[Hashable, str] = {}
+        self._replay: Dict[str, List[Tuple[Hashable, Optional[int]]]] = {}
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+
+    def standings(
+        self,
+        metric: str,
+        today: date,
+        load: Callable[[], Iterable[Tuple[Hashable, str, int]]],
+        limit: int,
+        key: Optional[Hashable] = None,
+    ) -> Standings:
+        """
+        Read the top ``limit`` positions of a board and the position of ``key``.
+
+        ``load`` returns every (key, name, score) of the board and is only
+        called when the board has to be built.
+        """
+        with self._lock:
+            if self.background and metric in self._boards:
+                index = self._boards[metric][0]
+            else:
+                index = self._current(metric, today)
+        if index is None:
+            self._build(metric, today, load)
+
+        with self._lock:
+            index = self._boards[metric][0]
+            top = [(k, self._names.get(k), score, rank) for k, score, rank in index.top(limit)]
+            mine = None
+            if key is not None and key in index:
+                mine = (key, self._names.get(key), index.score(key), index.rank(key))
+            return Standings(top, mine, len(index))
+
+    def refresh(
+        self,
+        metrics: Iterable[str],
+        today: date,
+        load: Callable[[str], Iterable[Tuple[Hashable, str, int]]],
+    ) -> int:
+        """
+        Build every board of ``metrics`` that is missing or stale.
+
+        ``load`` returns every (key, name, score) of a metric's board. Meant
+        for a background task; readers are served the old boards meanwhile.
+
+        Returns:
+            Number of boards built
+        """
+        built = 0
+        for metric in metrics:
+            if self._build(metric, today, lambda: load(metric)):
+                built += 1
+        return built
+
+    def apply(
+        self, key: Hashable, scores: Optional[Dict[str, int]], name: Optional[str] = None
+    ) -> None:
+        """
+        Apply the committed scores of ``key``, by metric, to the loaded boards.
+
+        ``scores`` of None takes the key off every board.
+        """
+        with self._lock:
+            if scores is None:
+                self._names.pop(key, None)
+            elif name is not None:
+                self._names[key] = name
+            for metric in set(self._boards) | set(self._replay):
+                score = None if scores is None else scores.get(metric)
+                if metric in self._replay:
+                    self._replay[metric].append((key, score))
+                board = self._boards.get(metric)
+                if board is None:
+                    continue
+                if score is None:
+                    board[0].discard(key)
+                else:
+                    board[0].set(key, score)
+
+    def clear(self) -> None:
+        """Drop every board."""
+        with self._lock:
+            self._boards.clear()
+            self._names.clear()
+            self._replay.clear()
+
+    def _current(self, metric: str, today: date) -> Optional[RankIndex]:
+        """The board for ``metric`` if it is fresh; call with the lock held."""
+        board = self._boards.get(metric)
+        if board is None:
+            return None
+        index, built_on, built_at = board
+        if built_on != today:
+            return None
+        if self.max_age > 0 and time.monotonic() - built_at > self.max_age:
+            return None
+        return index
+
+    def _build(
+        self,
+        metric: str,
+        today: date,
+        load: Callable[[], Iterable[Tuple[Hashable, str, int]]],
+    ) -> bool:
+        """Rebuild a board unless it is fresh, one build at a time; True if built."""
+        with self._rebuild_lock:
+            with self._lock:
+                if self._current(metric, today) is not None:
+                    return False
+                self._replay[metric] = []
+            try:
+                self._rebuild(metric, load(), today)
+            except BaseException:
+                with self._lock:
+                    self._replay.pop(metric, None)
+                raise
+        return True
+
+    def _rebuild(
+        self, metric: str, entries: Iterable[Tuple[Hashable, str, int]], today: date
+    ) -> None:
+        """Build a board from (key, name, score) entries and swap it in."""
+        index = RankIndex()
+        names = {}
+        for key, name, score in entries:
+            index.set(key, score)
+            names[key] = name
+        with self._lock:
+            for key, score in self._replay.pop(metric, []):
+                if score is None:
+                    index.discard(key)
+                else:
+                    index.set(key, score)
+            self._names.update(names)
+            self._boards[metric] = (index, today, time.monotonic())
+
+
+leaderboards = Leaderboards(
+    max_age=settings.LEADERBOARD_REFRESH_SECONDS,
+    background=settings.LEADERBOARD_BACKGROUND_REFRESH,
+)
@@ -0,0 +1,136 @@
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta, timezone
+from typing import List, NamedTuple
+from uuid import UUID
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Reminder:
+    """A reminder that has come due for a user."""
+    user_id: UUID
+    due_at: datetime
+
+
+class ReminderSettings(NamedTuple):
+    """
+    A user's reminder preferences, as stored on User.
+
+    Active hours are hours of the server's local day, the clock that
+    date.today() and so the daily totals use. The functions below take and
+    return server-local wall-clock times; stored reminder times are naive UTC
+    like every other timestamp, converted with local_time() and utc_time().
+    """
+    frequency: int  # minutes, 0 or less disables reminders
+    active_hours_start: int
+    active_hours_end: int
+
+
+def local_time(moment: datetime) -> datetime:
+    """Server-local wall-clock time of a naive UTC moment."""
+    return moment.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+
+
+def utc_time(moment: datetime) -> datetime:
+    """Naive UTC moment of a server-local wall-clock time."""
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def in_active_hours(moment: datetime, reminder_settings: ReminderSettings) -> bool:
+    """
+    Whether a moment falls in the user's active hours.
+
+    Active hours run from the start hour up to the end hour and may wrap past
+    midnight (e.g. 22 to 6); equal start and end hours mean all day.
+    """
+    start, end = reminder_settings.active_hours_start, reminder_settings.active_hours_end
+    if start == end:
+        return True
+    if start < end:
+        return start <= moment.hour < end
+    return moment.hour >= start or moment.hour < end
+
+
+def next_active_time(moment: datetime, reminder_settings: ReminderSettings) -> datetime:
+    """``moment`` if it is in active hours, else the start of the next active period."""
+    if in_active_hours(moment, reminder_settings):
+        return moment
+    start = datetime.combine(moment.date(), time(reminder_settings.active_hours_start))
+    if start <= moment:
+        start += timedelta(days=1)
+    return start
+
+
+def next_reminder_time(after: datetime, reminder_settings: ReminderSettings) -> datetime:
+    """
+    When the next reminder is due after ``after``.
+
+    That is one reminder interval later, moved to the start of the next
+    active period if it would fall outside active hours.
+    """
+    return next_active_time(
+        after + timedelta(minutes=reminder_settings.frequency), reminder_settings
+    )
+
+
+class ReminderSink:
+    """
+    Destination for due reminders.
+
+    Subclass this to deliver reminders, e.g. as push notifications or onto a
+    message queue; batches are delivered from the dispatcher's background
+    task, never from a request. Delivery is at least once: a batch whose
+    send raises is sent again once its lease expires.
+    """
+
+    def send(self, reminders: List[Reminder]) -> None:
+        """Deliver a batch of due reminders."""
+        raise NotImplementedError
+
+
+class LogSink(ReminderSink):
+    """Logs reminder batches; the default until a real sink is configured."""
+
+    def send(self, reminders: List[Reminder]) -> None:
+        logger.info(f"{len(reminders)} reminders due")
+
+
+class MemorySink(ReminderSink):
+    """Keeps every reminder in a list, for tests."""
+
+    def __init__(self) -> None:
+        self.reminders: List[Reminder] = []
+        self.batches = 0
+
+    def send(self, reminders: List[Reminder]) -> None:
+        self.reminders.extend(reminders)
+        self.batches += 1
+
+
+class FileSink(ReminderSink):
+    """Appends reminders to a file as JSON lines."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send(self, reminders: List[Reminder]) -> None:
+        lines = "".join(
+            json.dumps({"user_id": str(reminder.user_id), "due_at": reminder.due_at.isoformat()})
+            + "\n"
+            for reminder in reminders
+        )
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+
+# Where dispatched reminders go; assign a ReminderSink to deliver them
+reminder_sink: ReminderSink = (
+    FileSink(settings.REMINDER_SINK_FILE) if settings.REMINDER_SINK_FILE else LogSink()
+)
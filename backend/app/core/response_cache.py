@@ -0,0 +1,160 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+from uuid import UUID
+
+from app.core.config import settings
+
+# (user id, endpoint, data version and parameters)
+CacheKey = Tuple[str, Hashable]
+
+
+class CacheBackend:
+    """
+    Storage interface for ResponseCache.
+
+    Entries are scoped to a user so a whole user's entries can be dropped at
+    once. Subclass this to put responses in a store shared between worker
+    processes; the in-process MemoryCacheBackend is the default.
+    """
+
+    def get(self, user_id: str, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if absent or expired."""
+        raise NotImplementedError
+
+    def set(self, user_id: str, key: Hashable, value: Any, ttl: Optional[float]) -> None:
+        """Store a value; ``ttl`` of None means it never expires."""
+        raise NotImplementedError
+
+    def invalidate(self, user_id: str) -> None:
+        """Drop every entry of a user."""
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Bounded in-process LRU backend with optional per-entry expiry."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[CacheKey, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._keys_by_user: Dict[str, Set[CacheKey]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str, key: Hashable) -> Optional[Any]:
+        entry_key = (user_id, key)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._discard(entry_key)
+                return None
+            self._entries.move_to_end(entry_key)
+            return value
+
+    def set(self, user_id: str, key: Hashable, value: Any, ttl: Optional[float]) -> None:
+        if self.maxsize <= 0:
+            return
+
+        entry_key = (user_id, key)
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._entries[entry_key] = (expires_at, value)
+            self._entries.move_to_end(entry_key)
+            self._keys_by_user.setdefault(user_id, set()).add(entry_key)
+            while len(self._entries) > self.maxsize:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+
+    def invalidate(self, user_id: str) -> None:
+        with self._lock:
+            for entry_key in list(self._keys_by_user.get(user_id, ())):
+                self._discard(entry_key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _discard(self, entry_key: CacheKey) -> None:
+        self._entries.pop(entry_key, None)
+        keys = self._keys_by_user.get(entry_key[0])
+        if keys is not None:
+            keys.discard(entry_key)
+            if not keys:
+                del self._keys_by_user[entry_key[0]]
+
+
+class ResponseCache:
+    """
+    Per-user cache of computed read responses.
+
+    Keys combine the user with the endpoint, its parameters and the user's
+    data version, so a write committed anywhere makes older entries
+    unreachable even in workers that did not handle it. Services also drop a
+    user's entries after committing a write, to free the space early, and
+    current periods expire after ``ttl`` so they roll over with the clock.
+    Counts hits and misses for the health endpoint.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: UUID, key: Hashable) -> Optional[Any]:
+        """Return a cached response, counting the hit or miss."""
+        value = self.backend.get(str(user_id), key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, user_id: UUID, key: Hashable, value: Any, final: bool = False) -> None:
+        """
+        Cache a response.
+
+        ``final`` marks responses about periods that are over, which only
+        change with the data version in their key and are therefore cached
+        without expiry.
+        """
+        self.backend.set(str(user_id), key, value, None if final else self.ttl)
+
+    def invalidate(self, user_id: UUID) -> None:
+        """Drop every cached response of a user."""
+        self.backend.invalidate(str(user_id))
+
+    def clear(self) -> None:
+        """Drop every cached response and reset the counters."""
+        self.backend.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Readout of the cache for monitoring."""
+        return {
+            "backend": type(self.backend).__name__,
+            "size": len(self.backend),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+response_cache = ResponseCache(
+    MemoryCacheBackend(maxsize=settings.RESPONSE_CACHE_SIZE),
+    ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+)
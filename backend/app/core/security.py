@@ -1,18 +1,47 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Optional, Union
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Optional, Tuple, TypeVar, Union
 
-from jose import jwt
-from passlib.context import CryptContext
-from pydantic import ValidationError
+from fastapi.concurrency import run_in_threadpool
 
 from app.core.config import settings
 from app.schemas.token import TokenPayload
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# passlib/bcrypt and python-jose are imported on first use rather than here,
+# so importing the app does not pay for crypto backends it may not need yet.
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+T = TypeVar("T")
+
+_hash_pool: Optional[ProcessPoolExecutor] = None
+_hash_pool_lock = threading.Lock()
 
 ALGORITHM = "HS256"
 
 
+@lru_cache()
+def get_pwd_context() -> "CryptContext":
+    """
+    Get the password hashing context, building it on first use.
+    """
+    from passlib.context import CryptContext
+
+    # Pinning min/max to the configured cost makes passlib report hashes made
+    # with any other cost as needing an update, which drives rehash-on-login.
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+        bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+        bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+    )
+
+
 def create_access_token(
     subject: Union[str, Any], expires_delta: Optional[timedelta] = None
 ) -> str:
@@ -25,6 +54,8 @@ def create_access_token(
         expire = datetime.utcnow() + timedelta(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
+    from jose import jwt
+
     to_encode = {"exp": expire, "sub": str(subject)}
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
@@ -34,29 +65,114 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify a password against a hash.
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """
     Hash a password.
     """
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 
-def verify_token(token: str) -> Optional[TokenPayload]:
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
     """
-    Verify a JWT token and return its payload.
+    Verify a password and rehash it if its hash is outdated.
+
+    Returns:
+        Tuple of (valid, new_hash). new_hash is set when the password is
+        valid but was hashed with a different cost than BCRYPT_ROUNDS.
     """
+    return get_pwd_context().verify_and_update(plain_password, hashed_password)
+
+
+def get_hash_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    Get the process pool used for password hashing, creating it on first use.
+
+    Returns None when PASSWORD_HASH_WORKERS is 0, in which case hashing runs
+    in the threadpool instead.
+    """
+    global _hash_pool
+    if settings.PASSWORD_HASH_WORKERS <= 0:
+        return None
+
+    with _hash_pool_lock:
+        if _hash_pool is None:
+            # Spawn rather than fork: forking a process that is already
+            # running server threads can deadlock the children.
+            _hash_pool = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _hash_pool
+
+
+def shutdown_hash_pool() -> None:
+    """Stop the password hashing processes, if they were started."""
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is not None:
+            _hash_pool.shutdown(wait=True, cancel_futures=True)
+            _hash_pool = None
+
+
+async def _run_hasher(fn: Callable[..., T], *args: Any) -> T:
+    """Run a CPU-bound hashing function off the event loop."""
+    pool = get_hash_pool()
+    if pool is None:
+        return await run_in_threadpool(fn, *args)
+    return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Hash a password in the hashing pool.
+    """
+    return await _run_hasher(get_password_hash, password)
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verify (and possibly rehash) a password in the hashing pool.
+    """
+    return await _run_hasher(verify_and_update_password, plain_password, hashed_password)
+
+
+def decode_token(token: str) -> TokenPayload:
+    """
+    Decode a JWT token and validate its payload.
+
+    Raises:
+        ValueError: If the token is malformed, badly signed or expired, or
+            its payload is invalid
+    """
+    from jose import jwt
+
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[ALGORITHM]
         )
-        token_data = TokenPayload(**payload)
+    except jwt.JWTError as e:
+        raise ValueError(str(e)) from e
+    # pydantic's ValidationError is a ValueError too
+    return TokenPayload(**payload)
+
+
+def verify_token(token: str) -> Optional[TokenPayload]:
+    """
+    Verify a JWT token and return its payload.
+    """
+    try:
+        token_data = decode_token(token)
         
         if datetime.fromtimestamp(token_data.exp) < datetime.utcnow():
             return None
         
         return token_data
-    except (jwt.JWTError, ValidationError):
+    except ValueError:
         return None
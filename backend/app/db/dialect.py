@@ -0,0 +1,91 @@
+from typing import Any, Type
+
+from sqlalchemy import Date, DateTime, Integer, String, bindparam, cast, extract, func
+from sqlalchemy.sql import ColumnElement
+from sqlmodel import Session
+
+
+def dialect_name(db: Session) -> str:
+    """Return the SQL dialect name ("sqlite", "postgresql", ...) of a session."""
+    return db.get_bind().dialect.name
+
+
+def insert(db: Session, model: Type[Any]):
+    """
+    Build a dialect-specific INSERT for a model.
+
+    The SQLite and PostgreSQL constructs both support
+    ``on_conflict_do_update``, which the generic ``sqlalchemy.insert`` does not.
+    """
+    name = dialect_name(db)
+    if name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+        return pg_insert(model)
+    if name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        return sqlite_insert(model)
+    raise NotImplementedError(f"Upserts are not supported on {name}")
+
+
+def add_minutes(db: Session, moment: Any, minutes: ColumnElement) -> ColumnElement:
+    """
+    Add a number of minutes, e.g. from an integer column, to a timestamp.
+
+    ``moment`` is a datetime value or a timestamp column. Uses
+    ``make_interval`` on PostgreSQL and ``strftime`` modifiers on SQLite,
+    keeping millisecond precision in SQLite's text timestamps.
+    """
+    if not isinstance(moment, ColumnElement):
+        moment = bindparam(None, moment, type_=DateTime)
+    if dialect_name(db) == "sqlite":
+        return func.strftime(
+            "%Y-%m-%d %H:%M:%f", moment, "+" + cast(minutes, String) + " minutes",
+            type_=DateTime,
+        )
+    return moment + func.make_interval(0, 0, 0, 0, 0, minutes, type_=DateTime)
+
+
+def day_of(db: Session, column: ColumnElement) -> ColumnElement:
+    """Truncate a timestamp column to its calendar date."""
+    if dialect_name(db) == "sqlite":
+        # CAST(... AS DATE) has numeric affinity on SQLite
+        return func.date(column)
+    return cast(column, Date)
+
+
+def truncate_date(db: Session, column: ColumnElement, unit: str) -> ColumnElement:
+    """
+    Truncate a date/timestamp column to the start of a calendar bucket.
+
+    ``unit`` is one of "day", "week" (ISO week, starting Monday), "month" or
+    "year". Uses ``date_trunc`` on PostgreSQL and ``date``/``strftime`` on
+    SQLite; SQLite returns the bucket as an ISO date string.
+    """
+    if dialect_name(db) == "sqlite":
+        if unit == "day":
+            return func.date(column)
+        if unit == "week":
+            # Jump forward to Sunday (or stay on it), then back to Monday
+            return func.date(column, "weekday 0", "-6 days")
+        if unit == "month":
+            return func.strftime("%Y-%m-01", column)
+        if unit == "year":
+            return func.strftime("%Y-01-01", column)
+    elif unit in ("day", "week", "month", "year"):
+        return cast(func.date_trunc(unit, column), Date)
+    raise ValueError(f"Unsupported date unit: {unit}")
+
+
+def extract_field(db: Session, column: ColumnElement, field: str) -> ColumnElement:
+    """
+    Extract a cyclic field from a date/timestamp column as an integer.
+
+    ``field`` is "hour" (0-23) or "dow" (day of week, 0 = Sunday).
+    """
+    if dialect_name(db) == "sqlite":
+        formats = {"hour": "%H", "dow": "%w"}
+        if field in formats:
+            return cast(func.strftime(formats[field], column), Integer)
+    elif field in ("hour", "dow"):
+        return cast(extract(field, column), Integer)
+    raise ValueError(f"Unsupported date field: {field}")
@@ -1,36 +1,91 @@
 import logging
+from pathlib import Path
+from typing import Optional
 from uuid import uuid4
 
-from sqlmodel import Session, select
+from sqlalchemy import exists, inspect, text
+from sqlalchemy.engine import Connection
+from sqlmodel import Session, SQLModel, select
 
+from app.core.logging import log_duration
 from app.core.security import get_password_hash
 from app.db.session import engine
 from app.models import User, Goal, Streak
+from app.services.reminders import ReminderService
 
 logger = logging.getLogger(__name__)
 
+# Alembic head revision the models correspond to; a database stamped with it
+# needs no DDL at startup. Bump together with every new migration.
+SCHEMA_REVISION = "0007"
+
+ALEMBIC_DIR = Path(__file__).resolve().parents[2] / "alembic"
+
+
+def get_schema_revision(connection: Connection) -> Optional[str]:
+    """
+    Read the Alembic revision a database is stamped with, if any.
+
+    Queried directly rather than through Alembic, whose import alone costs
+    more than the rest of a current-schema startup.
+    """
+    if not inspect(connection).has_table("alembic_version"):
+        return None
+    return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+
+def migrate_schema() -> None:
+    """
+    Bring the database schema up to SCHEMA_REVISION.
+
+    The alembic_version table is the schema marker: when it already holds
+    SCHEMA_REVISION this is a single-row read and no DDL or introspection
+    runs. An empty database gets every table from the models and is stamped
+    at head; anything else (an older revision, or tables created before
+    migrations existed) is upgraded through Alembic, whose revisions are
+    idempotent.
+    """
+    with engine.connect() as connection:
+        revision = get_schema_revision(connection)
+        if revision == SCHEMA_REVISION:
+            logger.info(f"Database schema is current at revision {revision}")
+            return
+        empty = not inspect(connection).get_table_names()
+
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config()
+    config.set_main_option("script_location", str(ALEMBIC_DIR))
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        if empty:
+            logger.info("Creating database schema")
+            SQLModel.metadata.create_all(connection)
+            command.stamp(config, "head")
+        else:
+            logger.info(f"Upgrading database schema from revision {revision}")
+            command.upgrade(config, "head")
+
 
 def init_db() -> None:
     """
     Initialize the database schema and create initial data if needed.
 
     This function:
-    1. Creates all database tables based on SQLModel definitions
+    1. Brings the schema up to date, skipping DDL when it already is
     2. Creates an initial admin user if no users exist
     3. Sets up default goals and streak tracking for the admin
     """
-    from app.db.session import create_db_and_tables
-
-    # Create tables
-    create_db_and_tables()
+    with log_duration("Schema check"):
+        migrate_schema()
 
     # Add initial data if needed
-    with Session(engine) as session:
+    with log_duration("Initial data check"), Session(engine) as session:
         # Check if we need to create an initial admin user
-        result = session.exec(select(User))
-        user_count = len(result.all())
+        has_users = session.exec(select(exists().select_from(User))).one()
 
-        if user_count == 0:
+        if not has_users:
             logger.info("Creating initial admin user")
 
             # Create admin user with default credentials
@@ -41,6 +96,7 @@ def init_db() -> None:
                 hashed_password=get_password_hash("password123"),
                 is_active=True,
             )
+            admin.next_reminder_at = ReminderService.next_for(admin)
             session.add(admin)
 
             # Create initial goal for admin (8 units)
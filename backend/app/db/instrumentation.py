@@ -0,0 +1,144 @@
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.sql")
+
+
+@dataclass
+class QueryStats:
+    """Statements run and time spent in the database during one unit of work."""
+    count: int = 0
+    duration: float = 0.0  # seconds
+    statements: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.duration += elapsed
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> Dict[str, int]:
+        """Statements run at least ``threshold`` times, the usual sign of N+1."""
+        return {
+            statement: count
+            for statement, count in self.statements.items()
+            if count >= threshold
+        }
+
+
+# Stats of the request being handled in the current context, if any
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+    if elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        logger.warning(f"Slow query ({elapsed * 1000:.1f} ms): {statement}")
+
+
+def instrument_engine(db_engine: Engine) -> None:
+    """
+    Time every statement an engine runs.
+
+    Durations are added to the current request's QueryStats and statements
+    slower than SLOW_QUERY_MS are logged. For an AsyncEngine, pass its
+    ``sync_engine``.
+    """
+    if event.contains(db_engine, "after_cursor_execute", _after_cursor_execute):
+        return
+    event.listen(db_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(db_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Collect the statements run in the current context while the block runs."""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@contextmanager
+def count_queries(db_engine: Engine) -> Iterator[QueryStats]:
+    """
+    Collect every statement run on an engine while the block runs.
+
+    Unlike track_queries this does not depend on the calling context, so it
+    also sees statements issued from other threads, e.g. by a test client.
+    """
+    stats = QueryStats()
+    starts: Dict[int, float] = {}
+
+    def before(conn, cursor, statement, parameters, context, executemany) -> None:
+        starts[id(cursor)] = time.perf_counter()
+
+    def after(conn, cursor, statement, parameters, context, executemany) -> None:
+        stats.record(statement, time.perf_counter() - starts.pop(id(cursor), time.perf_counter()))
+
+    event.listen(db_engine, "before_cursor_execute", before)
+    event.listen(db_engine, "after_cursor_execute", after)
+    try:
+        yield stats
+    finally:
+        event.remove(db_engine, "before_cursor_execute", before)
+        event.remove(db_engine, "after_cursor_execute", after)
+
+
+class QueryStatsMiddleware:
+    """
+    ASGI middleware reporting each request's database usage.
+
+    Adds a ``Server-Timing: db;dur=<ms>;desc="<n> queries"`` header and logs
+    a warning when one statement repeats N_PLUS_ONE_THRESHOLD times or more
+    within a request. Statements run after the response has started (e.g.
+    while streaming) are not in the header.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+            async def send_wrapper(message: Dict[str, Any]) -> None:
+                if message["type"] == "http.response.start":
+                    timing = f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries"'
+                    message.setdefault("headers", [])
+                    message["headers"] = list(message["headers"]) + [
+                        (b"server-timing", timing.encode("latin-1"))
+                    ]
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+        threshold = settings.N_PLUS_ONE_THRESHOLD
+        if threshold > 0:
+            for statement, count in stats.repeated(threshold).items():
+                logger.warning(
+                    f"Possible N+1 on {scope['method']} {scope['path']}: "
+                    f"statement ran {count} times: {statement}"
+                )
@@ -1,14 +1,140 @@
-from typing import Generator
+import time
+from functools import lru_cache
+from typing import Any, AsyncGenerator, Dict, Generator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.config import settings
+from app.core.metrics import DB_POOL_CHECKOUT_DURATION, DB_POOL_CHECKOUTS
+from app.db.instrumentation import instrument_engine
+
+
+def is_memory_sqlite(uri: str) -> bool:
+    """Whether a URL points at an in-memory SQLite database."""
+    url = make_url(uri)
+    return url.get_backend_name() == "sqlite" and (
+        url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+    )
+
+
+def engine_options(uri: str) -> Dict[str, Any]:
+    """
+    Build create_engine keyword arguments for a database URL.
+
+    Pool sizing applies to every queue-pooled database; in-memory SQLite uses
+    a single shared connection, so only pre-ping applies there.
+    """
+    options: Dict[str, Any] = {
+        "echo": False,  # Set to True for debugging
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if make_url(uri).get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+        if is_memory_sqlite(uri):
+            return options
+
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    return options
+
+
+def apply_sqlite_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+    """
+    Tune each new SQLite connection for concurrent use.
+
+    WAL lets readers proceed while a write is in progress, synchronous=NORMAL
+    drops the fsync on every commit (still safe under WAL), and busy_timeout
+    makes writers wait for the lock instead of failing with
+    "database is locked".
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.close()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout takes."""
+
+    def _do_get(self) -> Any:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_DURATION.observe(time.perf_counter() - start)
+
+
+def count_checkout(dbapi_connection: Any, connection_record: Any, connection_proxy: Any) -> None:
+    """Count connections handed out by the pool."""
+    DB_POOL_CHECKOUTS.inc()
+
+
+def create_db_engine(uri: str) -> Engine:
+    """
+    Create a configured engine, applying SQLite pragmas where relevant.
+
+    Queue-pooled engines report checkout counts and timings to the metrics
+    registry, and every engine times its statements for per-request query
+    stats and the slow-query log.
+    """
+    options = engine_options(uri)
+    if not is_memory_sqlite(uri):
+        options["poolclass"] = TimedQueuePool
+    db_engine = create_engine(uri, **options)
+    if db_engine.dialect.name == "sqlite":
+        event.listen(db_engine, "connect", apply_sqlite_pragmas)
+    event.listen(db_engine, "checkout", count_checkout)
+    instrument_engine(db_engine)
+    return db_engine
+
+
+def pool_status(db_engine: Engine = None) -> Dict[str, Any]:
+    """
+    Report the state of an engine's connection pool.
+
+    Returns:
+        Pool class plus, for queue pools, size, connections checked in and
+        out, and current overflow
+    """
+    pool = (db_engine or engine).pool
+    status: Dict[str, Any] = {"pool": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if callable(method):
+            status[name] = method()
+    return status
+
 
 # Create SQLAlchemy engine
-engine = create_engine(
-    settings.SQLALCHEMY_DATABASE_URI,
-    echo=False,  # Set to True for debugging
-    connect_args={"check_same_thread": False} if settings.SQLALCHEMY_DATABASE_URI.startswith("sqlite") else {},
-)
+engine = create_db_engine(settings.SQLALCHEMY_DATABASE_URI)
+
+
+@lru_cache
+def get_async_engine() -> AsyncEngine:
+    """
+    Get the asyncio engine, creating it on first use.
+
+    Created lazily so the async driver (aiosqlite / asyncpg) is only needed
+    when ASYNC_DATABASE is enabled.
+    """
+    uri = settings.ASYNC_SQLALCHEMY_DATABASE_URI
+    async_engine = create_async_engine(uri, **engine_options(uri))
+    if async_engine.dialect.name == "sqlite":
+        event.listen(async_engine.sync_engine, "connect", apply_sqlite_pragmas)
+    instrument_engine(async_engine.sync_engine)
+    return async_engine
 
 
 def create_db_and_tables() -> None:
@@ -20,3 +146,11 @@ def get_session() -> Generator[Session, None, None]:
     """Get a database session."""
     with Session(engine) as session:
         yield session
+
+
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    """Get an asyncio database session."""
+    # Keep attributes loaded after commit: expired attributes would trigger
+    # implicit IO while responses are serialized outside the session.
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+        yield session
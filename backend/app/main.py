@@ -1,18 +1,32 @@
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from sqlmodel import Session
 
 from app.api import api_router
 from app.core.config import settings
-from app.core.logging import setup_logging
+from app.core.logging import log_duration, setup_logging
+from app.core.metrics import MetricsMiddleware, register_pool_gauges, registry
+from app.core.pubsub import broker
+from app.core import reminders
+from app.core.response_cache import response_cache
+from app.core.security import shutdown_hash_pool
 from app.db.init_db import init_db
+from app.db.instrumentation import QueryStatsMiddleware
+from app.db.session import engine, pool_status
+from app.services.leaderboard import LeaderboardService
+from app.services.reminders import ReminderService
+from app.services.token import TokenService
 
-# Set up logging
-setup_logging()
 logger = logging.getLogger(__name__)
 
+register_pool_gauges(pool_status)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -20,15 +34,118 @@ async def lifespan(app: FastAPI):
     Lifespan context manager for the FastAPI application.
     Handles startup and shutdown events.
     """
-    # Startup: Initialize database
-    logger.info("Initializing database")
-    init_db()
-    logger.info("Database initialized")
+    # Set up logging
+    setup_logging()
+
+    with log_duration("Startup"):
+        # Startup: Initialize database
+        logger.info("Initializing database")
+        with log_duration("Database initialization"):
+            init_db()
+        logger.info(f"Database initialized, pool: {pool_status()}")
+
+        sweeper = None
+        if settings.REFRESH_TOKEN_SWEEP_INTERVAL_SECONDS > 0:
+            sweeper = asyncio.create_task(
+                sweep_refresh_tokens(settings.REFRESH_TOKEN_SWEEP_INTERVAL_SECONDS)
+            )
+
+        dispatcher = None
+        if settings.REMINDERS_ENABLED:
+            dispatcher = asyncio.create_task(
+                dispatch_reminders(settings.REMINDER_TICK_SECONDS)
+            )
+
+        refresher = None
+        if settings.LEADERBOARD_BACKGROUND_REFRESH:
+            refresher = asyncio.create_task(
+                refresh_leaderboards(min(settings.LEADERBOARD_REFRESH_SECONDS or 60, 60))
+            )
 
     yield
 
     # Shutdown: Clean up resources if needed
     logger.info("Shutting down application")
+    with log_duration("Shutdown"):
+        if sweeper is not None:
+            sweeper.cancel()
+        if dispatcher is not None:
+            dispatcher.cancel()
+        if refresher is not None:
+            refresher.cancel()
+        broker.close()
+        shutdown_hash_pool()
+
+
+def purge_expired_refresh_tokens() -> int:
+    """Delete expired refresh tokens in a fresh session."""
+    with Session(engine) as session:
+        return TokenService.purge_expired(session)
+
+
+async def sweep_refresh_tokens(interval: int) -> None:
+    """
+    Periodically delete expired refresh tokens.
+
+    Args:
+        interval: Seconds between sweeps
+    """
+    while True:
+        try:
+            deleted = await run_in_threadpool(purge_expired_refresh_tokens)
+            if deleted:
+                logger.info(f"Purged {deleted} expired refresh tokens")
+        except Exception:
+            logger.exception("Refresh token sweep failed")
+        await asyncio.sleep(interval)
+
+
+def dispatch_due_reminders() -> int:
+    """Send every due reminder in a fresh session."""
+    with Session(engine) as session:
+        return ReminderService.dispatch(session, reminders.reminder_sink)
+
+
+async def dispatch_reminders(interval: float) -> None:
+    """
+    Periodically send due reminders.
+
+    Every worker runs this; claims keep them from sending the same reminder.
+
+    Args:
+        interval: Seconds between checks for due reminders
+    """
+    while True:
+        try:
+            await run_in_threadpool(dispatch_due_reminders)
+        except Exception:
+            logger.exception("Reminder dispatch failed")
+        await asyncio.sleep(interval)
+
+
+def refresh_stale_leaderboards() -> int:
+    """Rebuild missing and stale leaderboards in a fresh session."""
+    with Session(engine) as session:
+        return LeaderboardService.refresh_leaderboards(session)
+
+
+async def refresh_leaderboards(interval: float) -> None:
+    """
+    Periodically rebuild the in-memory leaderboards that went stale.
+
+    Checking is in memory; a board is only reloaded once it is older than
+    LEADERBOARD_REFRESH_SECONDS or from an earlier day. The first pass
+    builds every board, so readers never wait for one.
+
+    Args:
+        interval: Seconds between checks for stale boards
+    """
+    while True:
+        try:
+            await run_in_threadpool(refresh_stale_leaderboards)
+        except Exception:
+            logger.exception("Leaderboard refresh failed")
+        await asyncio.sleep(interval)
 
 
 def create_application() -> FastAPI:
@@ -57,6 +174,14 @@ def create_application() -> FastAPI:
             allow_headers=["*"],
         )
 
+    # Record per-route request metrics
+    if settings.METRICS_ENABLED:
+        application.add_middleware(MetricsMiddleware)
+
+    # Report per-request query counts and DB time
+    if settings.SQL_INSTRUMENTATION_ENABLED:
+        application.add_middleware(QueryStatsMiddleware)
+
     # Include API router
     application.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -75,3 +200,36 @@ async def root():
         Simple welcome message with API name
     """
     return {"message": "Welcome to the Water Reminder Button API"}
+
+
+@app.get("/health")
+async def health():
+    """
+    Health endpoint reporting database connection pool and cache usage.
+
+    Returns:
+        Service status, connection pool readout, response cache counters and
+        open live streams in this worker
+    """
+    return {
+        "status": "ok",
+        "database": pool_status(),
+        "response_cache": response_cache.stats(),
+        "live_subscribers": broker.subscriber_count(),
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Metrics endpoint in the Prometheus text exposition format.
+
+    Returns:
+        Request counts and latency histograms per route, in-flight requests,
+        connection pool checkouts and occupancy, taps logged and streak updates
+    """
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -2,6 +2,10 @@ from app.models.user import User, UserBase, UserCreate, UserRead
 from app.models.water_log import WaterLog, WaterLogBase, WaterLogCreate, WaterLogRead
 from app.models.goal import Goal, GoalBase, GoalCreate, GoalRead
 from app.models.streak import Streak, StreakBase, StreakRead
+from app.models.daily_total import DailyTotal, DailyTotalBase, DailyTotalRead
+from app.models.refresh_token import RefreshToken
+from app.models.data_version import DataVersion
+from app.models.leaderboard import LeaderboardEntry, Team, TeamMembership
 
 # Import these models to ensure SQLModel sees them when creating tables
 __all__ = [
@@ -9,4 +13,8 @@ __all__ = [
     "WaterLog", "WaterLogBase", "WaterLogCreate", "WaterLogRead",
     "Goal", "GoalBase", "GoalCreate", "GoalRead",
     "Streak", "StreakBase", "StreakRead",
-]
\ No newline at end of file
+    "DailyTotal", "DailyTotalBase", "DailyTotalRead",
+    "RefreshToken",
+    "DataVersion",
+    "LeaderboardEntry", "Team", "TeamMembership",
+]
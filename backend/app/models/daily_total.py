@@ -0,0 +1,27 @@
+from datetime import date
+from sqlmodel import Field, SQLModel
+from uuid import UUID
+
+
+class DailyTotalBase(SQLModel):
+    """Base DailyTotal model with common attributes."""
+    total_amount: int = Field(default=0)
+    log_count: int = Field(default=0)
+
+
+class DailyTotal(DailyTotalBase, table=True):
+    """
+    Per-user, per-day rollup of water intake.
+
+    Maintained incrementally by WaterService whenever a log is written, so
+    aggregate reads touch one small row per day instead of every WaterLog.
+    The composite primary key doubles as the (user_id, day) range index.
+    """
+    user_id: UUID = Field(foreign_key="user.id", primary_key=True)
+    day: date = Field(primary_key=True)
+
+
+class DailyTotalRead(DailyTotalBase):
+    """Schema for reading daily total data."""
+    user_id: UUID
+    day: date
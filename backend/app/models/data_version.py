@@ -0,0 +1,14 @@
+from sqlmodel import Field, SQLModel
+from uuid import UUID
+
+
+class DataVersion(SQLModel, table=True):
+    """
+    Per-user counter of changes to water data.
+
+    Bumped in the same transaction as every write to a user's logs or goal,
+    so read endpoints can derive ETags from it and answer conditional
+    requests without reading the data itself.
+    """
+    user_id: UUID = Field(foreign_key="user.id", primary_key=True)
+    version: int = Field(default=0)
@@ -0,0 +1,38 @@
+from datetime import date, datetime
+from typing import Optional
+from sqlmodel import Field, SQLModel
+from uuid import UUID, uuid4
+
+
+class LeaderboardEntry(SQLModel, table=True):
+    """
+    A user's standing on the leaderboards; having a row means they opted in.
+
+    Copies the streak and this week's intake so leaderboards are built from
+    this one table. Kept current in the same transaction as each log, and
+    the backing store of the in-memory rank indexes.
+    """
+    user_id: UUID = Field(foreign_key="user.id", primary_key=True)
+    display_name: str
+    current_streak: int = Field(default=0)
+    longest_streak: int = Field(default=0)
+    last_logged_date: Optional[date] = Field(default=None)
+    # Monday of the week week_amount was counted in
+    week_start: date
+    week_amount: int = Field(default=0)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class Team(SQLModel, table=True):
+    """A group of users with their own leaderboard."""
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    name: str
+    created_by: UUID = Field(foreign_key="user.id")
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class TeamMembership(SQLModel, table=True):
+    """A user's membership of a team."""
+    team_id: UUID = Field(foreign_key="team.id", primary_key=True)
+    user_id: UUID = Field(foreign_key="user.id", primary_key=True, index=True)
+    joined_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,21 @@
+from datetime import datetime
+from typing import Optional
+from sqlmodel import Field, SQLModel
+from uuid import UUID, uuid4
+
+
+class RefreshToken(SQLModel, table=True):
+    """
+    Opaque refresh token for database storage.
+
+    Only a SHA-256 digest of the token is stored. Tokens issued by rotating
+    one another share a family_id, so replaying an already rotated token can
+    revoke the whole chain.
+    """
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    user_id: UUID = Field(foreign_key="user.id", index=True)
+    token_hash: str = Field(unique=True, index=True)
+    family_id: UUID = Field(index=True)
+    expires_at: datetime = Field(index=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    revoked_at: Optional[datetime] = None
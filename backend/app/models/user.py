@@ -19,6 +19,10 @@ class User(UserBase, table=True):
     hashed_password: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    # When the next reminder is due, None when reminders are off; a reminder
+    # dispatcher that has claimed the row holds it until reminder_lease_until
+    next_reminder_at: Optional[datetime] = Field(default=None, index=True)
+    reminder_lease_until: Optional[datetime] = Field(default=None)
     
     # Relationships
     water_logs: List["WaterLog"] = Relationship(back_populates="user")
@@ -1,5 +1,6 @@
 from datetime import datetime
 from typing import Optional
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel
 from uuid import UUID, uuid4
 
@@ -13,6 +14,12 @@ class WaterLogBase(SQLModel):
 
 class WaterLog(WaterLogBase, table=True):
     """WaterLog model for database storage."""
+    # Every read path filters on the owner and a time window, so a composite
+    # index lets those queries seek straight to the user's range.
+    __table_args__ = (
+        Index("ix_waterlog_user_id_timestamp", "user_id", "timestamp"),
+    )
+
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     user_id: UUID = Field(foreign_key="user.id")
     
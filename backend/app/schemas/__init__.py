@@ -1,17 +1,26 @@
-from app.schemas.token import Token, TokenData, TokenPayload
+from app.schemas.token import RefreshTokenRequest, Token, TokenData, TokenPayload
 from app.schemas.user import User, UserCreate, UserInDB, UserUpdate
 from app.schemas.water import (
     WaterLog, WaterLogCreate, WaterLogInDB, WaterLogUpdate,
-    DailyWaterLog, DateRange, WaterStats
+    WaterLogBatchCreate, WaterLogBatchItemResult, WaterLogBatchResult,
+    WaterLogImportResult, WaterLogEntry, WaterLogPage,
+    DailyWaterLog, DateRange, WaterProgress, WaterStats
 )
 from app.schemas.goal import Goal, GoalCreate, GoalInDB, GoalUpdate
 from app.schemas.streak import Streak, StreakInDB
+from app.schemas.leaderboard import (
+    Leaderboard, LeaderboardEntry, LeaderboardJoin, LeaderboardPosition, Team, TeamCreate
+)
 
 __all__ = [
-    "Token", "TokenData", "TokenPayload",
+    "RefreshTokenRequest", "Token", "TokenData", "TokenPayload",
     "User", "UserCreate", "UserInDB", "UserUpdate",
     "WaterLog", "WaterLogCreate", "WaterLogInDB", "WaterLogUpdate",
-    "DailyWaterLog", "DateRange", "WaterStats",
+    "WaterLogBatchCreate", "WaterLogBatchItemResult", "WaterLogBatchResult",
+    "WaterLogImportResult", "WaterLogEntry", "WaterLogPage",
+    "DailyWaterLog", "DateRange", "WaterProgress", "WaterStats",
     "Goal", "GoalCreate", "GoalInDB", "GoalUpdate",
     "Streak", "StreakInDB",
+    "Leaderboard", "LeaderboardEntry", "LeaderboardJoin", "LeaderboardPosition",
+    "Team", "TeamCreate",
 ]
\ No newline at end of file
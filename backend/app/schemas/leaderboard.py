@@ -0,0 +1,53 @@
+from datetime import date, datetime
+from typing import List, Optional
+from pydantic import BaseModel, Field
+from uuid import UUID
+
+
+class LeaderboardJoin(BaseModel):
+    """Leaderboard opt-in schema."""
+    display_name: str = Field(min_length=1, max_length=50)
+
+
+class LeaderboardEntry(BaseModel):
+    """A user's own leaderboard entry."""
+    display_name: str
+    current_streak: int
+    longest_streak: int
+    last_logged_date: Optional[date] = None
+    week_start: date
+    week_amount: int
+
+    class Config:
+        orm_mode = True
+
+
+class LeaderboardPosition(BaseModel):
+    """One position on a leaderboard."""
+    rank: int  # Equal scores share a rank
+    display_name: str
+    score: int
+
+
+class Leaderboard(BaseModel):
+    """Top positions of a leaderboard, with the caller's own."""
+    metric: str
+    total: int  # Users on the board
+    entries: List[LeaderboardPosition]
+    me: Optional[LeaderboardPosition] = None  # None if not on the board
+
+
+class TeamCreate(BaseModel):
+    """Team creation schema."""
+    name: str = Field(min_length=1, max_length=100)
+
+
+class Team(BaseModel):
+    """Team schema."""
+    id: UUID
+    name: str
+    created_by: UUID
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
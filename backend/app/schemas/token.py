@@ -6,6 +6,13 @@ class Token(BaseModel):
     """Token schema."""
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+    expires_in: Optional[int] = None  # Access token lifetime in seconds
+
+
+class RefreshTokenRequest(BaseModel):
+    """Refresh token request schema."""
+    refresh_token: str
 
 
 class TokenPayload(BaseModel):
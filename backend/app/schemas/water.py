@@ -1,12 +1,14 @@
 from datetime import date, datetime
-from typing import List, Optional
-from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field
 from uuid import UUID
 
+from app.core.config import settings
+
 
 class WaterLogBase(BaseModel):
     """Base water log schema."""
-    amount: Optional[int] = 1
+    amount: Optional[int] = Field(1, ge=0, le=settings.WATER_LOG_MAX_AMOUNT)
     notes: Optional[str] = None
 
 
@@ -40,6 +42,45 @@ class WaterLogInDB(WaterLogInDBBase):
     pass
 
 
+class WaterLogBatchCreate(BaseModel):
+    """Batch water log creation schema, e.g. for replaying offline taps."""
+    # WaterLogCreate objects, validated one by one so that an invalid item is
+    # rejected on its own instead of failing the whole batch
+    items: List[Dict[str, Any]]
+
+
+class WaterLogBatchItemResult(BaseModel):
+    """Outcome of a single item in a batch."""
+    index: int  # Position of the item in the submitted batch
+    status: str  # "created" or "rejected"
+    log: Optional[WaterLog] = None
+    error: Optional[str] = None
+
+
+class WaterLogBatchResult(BaseModel):
+    """Batch water log creation result schema."""
+    created: int
+    rejected: int
+    results: List[WaterLogBatchItemResult]
+
+
+class WaterLogImportResult(BaseModel):
+    """Bulk CSV import result schema."""
+    imported: int
+    rejected: int
+    errors: List[str]  # Details of the first rejected rows
+
+
+class WaterProgress(BaseModel):
+    """Today's intake against the goal, as pushed by the live stream."""
+    date: date
+    total_amount: int
+    goal_amount: int
+    goal_achieved: bool
+    current_streak: int
+    longest_streak: int
+
+
 class DailyWaterLog(BaseModel):
     """Daily water log schema."""
     date: date
@@ -47,6 +88,21 @@ class DailyWaterLog(BaseModel):
     logs: List[WaterLog]
 
 
+class WaterLogEntry(BaseModel):
+    """Lightweight water log row schema for paginated history."""
+    id: UUID
+    timestamp: datetime
+    amount: int
+    notes: Optional[str] = None
+
+
+class WaterLogPage(BaseModel):
+    """One page of water logs with the cursor for the next page."""
+    items: List[WaterLogEntry]
+    next_cursor: Optional[str] = None  # None on the last page
+    limit: int
+
+
 class DateRange(BaseModel):
     """Date range schema."""
     start_date: date
@@ -55,5 +111,10 @@ class DateRange(BaseModel):
 
 class WaterStats(BaseModel):
     """Water stats schema."""
-    period: str  # "weekly" or "monthly"
-    data: List[dict]  # List of {date: str, amount: int}
+    period: str  # "weekly", "monthly" or "custom"
+    granularity: str = "day"  # hour, weekday, day, week, month or year
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    # List of {date: str, amount: int} for calendar granularities,
+    # {hour: int, amount: int} or {weekday: int, amount: int} otherwise
+    data: List[dict]
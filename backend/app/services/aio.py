@@ -0,0 +1,203 @@
+from datetime import date
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, List, Optional, TypeVar, Union
+from uuid import UUID
+
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.security import (
+    get_password_hash_async, verify_and_update_password_async
+)
+from app.models.user import User
+from app.schemas.user import UserCreate
+from app.schemas.water import (
+    WaterLogBatchItemResult, WaterLogCreate, WaterLogImportResult, WaterStats
+)
+from app.services.importer import ImportService
+from app.services.leaderboard import LeaderboardService
+from app.services.stats import StatsService
+from app.services.token import TokenService
+from app.services.user import UserService
+from app.services.water import WaterService
+
+T = TypeVar("T")
+
+AnySession = Union[Session, AsyncSession]
+
+
+async def run_sync(db: AnySession, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a synchronous service function against either kind of session.
+
+    With an AsyncSession the function runs through ``AsyncSession.run_sync``,
+    so its database IO is awaited on the event loop instead of blocking a
+    worker thread. With a plain Session it is offloaded to the threadpool.
+
+    The whole function runs on the event loop in the async case, so it must
+    not do much besides database calls; services with CPU-heavy parts get
+    async counterparts that run those parts in the threadpool instead.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+
+async def close_session(db: AnySession) -> None:
+    """
+    Close either kind of session, returning its connection to the pool.
+
+    For handlers whose response outlives the work they need the database for,
+    since request sessions are otherwise only closed once the response is done.
+    """
+    if isinstance(db, AsyncSession):
+        await db.close()
+    else:
+        await run_in_threadpool(db.close)
+
+
+def _async(fn: Callable[..., T]) -> Callable[..., Any]:
+    """Expose a sync ``fn(db, ...)`` service method as an awaitable one."""
+    @wraps(fn)
+    async def method(db: AnySession, *args: Any, **kwargs: Any) -> T:
+        return await run_sync(db, fn, *args, **kwargs)
+    return staticmethod(method)
+
+
+class AsyncWaterService:
+    """Awaitable counterpart of WaterService for async route handlers."""
+
+    create_log = _async(WaterService.create_log)
+    get_logs_for_day = _async(WaterService.get_logs_for_day)
+    get_logs_for_range = _async(WaterService.get_logs_for_range)
+    get_log_page = _async(WaterService.get_log_page)
+    get_daily_totals = _async(WaterService.get_daily_totals)
+    get_daily_total = _async(WaterService.get_daily_total)
+    get_data_version = _async(WaterService.get_data_version)
+    get_stats = _async(WaterService.get_stats)
+    get_progress = _async(WaterService.get_progress)
+    get_goal = _async(WaterService.get_goal)
+    update_goal = _async(WaterService.update_goal)
+    get_streak = _async(WaterService.get_streak)
+    update_streak = _async(WaterService.update_streak)
+    check_goal_achieved = _async(WaterService.check_goal_achieved)
+
+    @staticmethod
+    async def create_logs_batch(
+        db: AnySession, user_id: UUID, items: List[Union[WaterLogCreate, Dict[str, Any]]]
+    ) -> List[WaterLogBatchItemResult]:
+        """Create many water logs, validating the items off the event loop."""
+        if not isinstance(db, AsyncSession):
+            return await run_sync(db, WaterService.create_logs_batch, user_id, items)
+        batch = await run_in_threadpool(WaterService.prepare_logs_batch, user_id, items)
+        await run_sync(db, WaterService.write_logs_batch, user_id, batch)
+        return batch.results
+
+
+class AsyncImportService:
+    """Awaitable counterpart of ImportService for async route handlers."""
+
+    @staticmethod
+    async def import_csv(
+        db: AnySession, user_id: UUID, lines: Iterable[str], batch_size: Optional[int] = None
+    ) -> WaterLogImportResult:
+        """
+        Import a CSV of water logs, parsing it off the event loop.
+
+        With an AsyncSession each batch is read and parsed in the threadpool
+        and only its insert runs in the session.
+        """
+        if not isinstance(db, AsyncSession):
+            return await run_sync(db, ImportService.import_csv, user_id, lines, batch_size)
+        result = WaterLogImportResult(imported=0, rejected=0, errors=[])
+        batches = await run_in_threadpool(
+            ImportService.read_batches, lines, user_id, result, batch_size
+        )
+        while batch := await run_in_threadpool(next, batches, None):
+            await run_sync(db, ImportService.insert_batch, batch)
+            result.imported += len(batch)
+        return await run_sync(db, ImportService.finish_import, user_id, result)
+
+
+class AsyncLeaderboardService:
+    """Awaitable counterpart of LeaderboardService for async route handlers."""
+
+    get_entry = _async(LeaderboardService.get_entry)
+    join = _async(LeaderboardService.join)
+    leave = _async(LeaderboardService.leave)
+    get_leaderboard = _async(LeaderboardService.get_leaderboard)
+    create_team = _async(LeaderboardService.create_team)
+    get_teams = _async(LeaderboardService.get_teams)
+    join_team = _async(LeaderboardService.join_team)
+    leave_team = _async(LeaderboardService.leave_team)
+    get_team_leaderboard = _async(LeaderboardService.get_team_leaderboard)
+
+
+class AsyncStatsService:
+    """Awaitable counterpart of StatsService for async route handlers."""
+
+    @staticmethod
+    async def aggregate(
+        db: AnySession,
+        user_id: UUID,
+        granularity: str,
+        start_date: date,
+        end_date: date,
+        period: str = "custom",
+    ) -> WaterStats:
+        """Aggregate a user's intake, filling the buckets off the event loop."""
+        if not isinstance(db, AsyncSession):
+            return await run_sync(
+                db, StatsService.aggregate, user_id, granularity, start_date, end_date, period
+            )
+        StatsService.check_range(granularity, start_date, end_date)
+        totals = await run_sync(
+            db, StatsService.bucket_totals, user_id, granularity, start_date, end_date
+        )
+        return await run_in_threadpool(
+            StatsService.fill_buckets, granularity, start_date, end_date, totals, period
+        )
+
+
+class AsyncTokenService:
+    """Awaitable counterpart of TokenService for async route handlers."""
+
+    issue = _async(TokenService.issue)
+    rotate = _async(TokenService.rotate)
+    revoke = _async(TokenService.revoke)
+    purge_expired = _async(TokenService.purge_expired)
+
+
+class AsyncUserService:
+    """
+    Awaitable counterpart of UserService for async route handlers.
+
+    Password hashing is CPU-bound, so it always runs in the hashing pool
+    rather than inside the session, where it would stall the event loop.
+    """
+
+    get_by_email = _async(UserService.get_by_email)
+    get_by_id = _async(UserService.get_by_id)
+    is_active = staticmethod(UserService.is_active)
+
+    @staticmethod
+    async def create(db: AnySession, user_in: UserCreate) -> Optional[User]:
+        """Create a new user with default goal and streak."""
+        hashed_password = await get_password_hash_async(user_in.password)
+        return await run_sync(db, UserService.create, user_in, hashed_password=hashed_password)
+
+    @staticmethod
+    async def authenticate(db: AnySession, email: str, password: str) -> Optional[User]:
+        """Authenticate a user with email and password."""
+        user = await run_sync(db, UserService.get_by_email, email)
+        if not user:
+            return None
+        valid, new_hash = await verify_and_update_password_async(
+            password, user.hashed_password
+        )
+        if not valid:
+            return None
+        if new_hash:
+            user = await run_sync(db, UserService.update_password_hash, user, new_hash)
+        return user
@@ -0,0 +1,168 @@
+import csv
+import io
+import json
+from typing import Any, Dict, Iterator, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import Row
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.models.water_log import WaterLog
+
+EXPORT_COLUMNS = ("id", "user_id", "timestamp", "amount", "notes")
+
+# Supported export formats and their media types
+EXPORT_FORMATS: Dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+
+def _require_pyarrow() -> Any:
+    """Import pyarrow, which is only needed for Arrow exports."""
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        raise ValueError("Arrow export requires the pyarrow package")
+    return pyarrow
+
+
+class ExportService:
+    """Service for streaming water log exports."""
+
+    @staticmethod
+    def check_format(fmt: str) -> None:
+        """
+        Check that an export format is known and usable.
+
+        Raises:
+            ValueError: If the format is unknown, or is Arrow without pyarrow
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(
+                f"Unknown export format {fmt!r}; expected one of {', '.join(EXPORT_FORMATS)}"
+            )
+        if fmt == "arrow":
+            _require_pyarrow()
+
+    @staticmethod
+    def iter_chunks(
+        db: Session, user_id: Optional[UUID] = None, chunk_size: Optional[int] = None
+    ) -> Iterator[Sequence[Row]]:
+        """
+        Read water logs in chunks through a server-side cursor.
+
+        Rows are plain tuples of EXPORT_COLUMNS ordered by user and timestamp,
+        which follows ix_waterlog_user_id_timestamp so no sort is needed.
+        With ``yield_per`` only one chunk is held in memory at a time.
+
+        Args:
+            db: Database session
+            user_id: Only export this user's logs; all users when None
+            chunk_size: Rows per chunk (default EXPORT_CHUNK_SIZE)
+        """
+        query = select(
+            WaterLog.id, WaterLog.user_id, WaterLog.timestamp, WaterLog.amount, WaterLog.notes
+        )
+        if user_id is not None:
+            query = query.where(WaterLog.user_id == user_id)
+        query = query.order_by(WaterLog.user_id, WaterLog.timestamp).execution_options(
+            yield_per=chunk_size or settings.EXPORT_CHUNK_SIZE
+        )
+
+        yield from db.exec(query).partitions()
+
+    @staticmethod
+    def encode_ndjson(chunks: Iterator[Sequence[Row]]) -> Iterator[bytes]:
+        """Encode row chunks as newline-delimited JSON, one object per log."""
+        for rows in chunks:
+            yield "".join(
+                json.dumps({
+                    "id": str(log_id),
+                    "user_id": str(user_id),
+                    "timestamp": timestamp.isoformat(),
+                    "amount": amount,
+                    "notes": notes,
+                }) + "\n"
+                for log_id, user_id, timestamp, amount, notes in rows
+            ).encode()
+
+    @staticmethod
+    def encode_csv(chunks: Iterator[Sequence[Row]]) -> Iterator[bytes]:
+        """Encode row chunks as CSV with a header row."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        for rows in chunks:
+            writer.writerows(
+                (log_id, user_id, timestamp.isoformat(), amount, notes)
+                for log_id, user_id, timestamp, amount, notes in rows
+            )
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        # Header only when there were no rows
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+
+    @staticmethod
+    def encode_arrow(chunks: Iterator[Sequence[Row]]) -> Iterator[bytes]:
+        """Encode row chunks as an Arrow IPC stream, one record batch per chunk."""
+        pa = _require_pyarrow()
+        schema = pa.schema([
+            ("id", pa.string()),
+            ("user_id", pa.string()),
+            ("timestamp", pa.timestamp("us")),
+            ("amount", pa.int64()),
+            ("notes", pa.string()),
+        ])
+
+        sink = io.BytesIO()
+        with pa.ipc.new_stream(sink, schema) as writer:
+            for rows in chunks:
+                log_ids, user_ids, timestamps, amounts, notes = zip(*rows)
+                writer.write_batch(pa.record_batch([
+                    pa.array([str(log_id) for log_id in log_ids], pa.string()),
+                    pa.array([str(user_id) for user_id in user_ids], pa.string()),
+                    pa.array(timestamps, pa.timestamp("us")),
+                    pa.array(amounts, pa.int64()),
+                    pa.array(notes, pa.string()),
+                ], schema=schema))
+                yield sink.getvalue()
+                sink.seek(0)
+                sink.truncate()
+        # Schema message when empty, plus the end-of-stream marker
+        yield sink.getvalue()
+
+    @staticmethod
+    def stream(
+        bind: Engine,
+        fmt: str,
+        user_id: Optional[UUID] = None,
+        chunk_size: Optional[int] = None,
+    ) -> Iterator[bytes]:
+        """
+        Stream an export of water logs as encoded byte chunks.
+
+        The export reads through its own session on ``bind`` so it can outlive
+        the request's session while a StreamingResponse drains it.
+
+        Args:
+            bind: Engine to read from
+            fmt: One of EXPORT_FORMATS
+            user_id: Only export this user's logs; all users when None
+            chunk_size: Rows per chunk (default EXPORT_CHUNK_SIZE)
+        """
+        ExportService.check_format(fmt)
+        encode = {
+            "ndjson": ExportService.encode_ndjson,
+            "csv": ExportService.encode_csv,
+            "arrow": ExportService.encode_arrow,
+        }[fmt]
+
+        with Session(bind) as db:
+            yield from encode(ExportService.iter_chunks(db, user_id, chunk_size))
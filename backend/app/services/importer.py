@@ -0,0 +1,187 @@
+import csv
+import io
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from uuid import UUID, uuid4
+
+from sqlmodel import Session, insert
+
+from app.core.config import settings
+from app.core.metrics import STREAK_UPDATES
+from app.core.response_cache import response_cache
+from app.db import dialect
+from app.models.water_log import WaterLog
+from app.schemas.water import WaterLogImportResult
+from app.services.leaderboard import LeaderboardService
+from app.services.water import WaterService
+
+IMPORT_COLUMNS = ("id", "user_id", "timestamp", "amount", "notes")
+
+# Rejected rows reported back in detail; the rest are only counted
+MAX_REPORTED_ERRORS = 20
+
+
+def parse_row(record: Dict[str, Optional[str]]) -> Tuple[datetime, int, Optional[str]]:
+    """
+    Parse one CSV record into (timestamp, amount, notes).
+
+    ``timestamp`` is an ISO 8601 date-time; aware values are converted to
+    naive UTC like the rest of the logs. ``amount`` defaults to 1, must be
+    between 0 and WATER_LOG_MAX_AMOUNT, and ``notes`` is optional.
+
+    Raises:
+        ValueError: If the record is not a valid log
+    """
+    raw_timestamp = (record.get("timestamp") or "").strip()
+    if not raw_timestamp:
+        raise ValueError("Missing timestamp")
+    if raw_timestamp.endswith(("Z", "z")):
+        raw_timestamp = raw_timestamp[:-1] + "+00:00"
+    timestamp = datetime.fromisoformat(raw_timestamp)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+
+    raw_amount = (record.get("amount") or "").strip()
+    amount = int(raw_amount) if raw_amount else 1
+    if amount < 0:
+        raise ValueError("Amount must not be negative")
+    if amount > settings.WATER_LOG_MAX_AMOUNT:
+        raise ValueError(f"Amount must not exceed {settings.WATER_LOG_MAX_AMOUNT}")
+
+    return timestamp, amount, record.get("notes") or None
+
+
+class ImportService:
+    """Service for bulk-loading historical water logs."""
+
+    @staticmethod
+    def import_csv(
+        db: Session,
+        user_id: UUID,
+        lines: Iterable[str],
+        batch_size: Optional[int] = None,
+    ) -> WaterLogImportResult:
+        """
+        Import a CSV of water logs for one user in a single transaction.
+
+        The CSV needs a header with a ``timestamp`` column and may have
+        ``amount`` and ``notes`` columns; other columns (such as those of an
+        export) are ignored. Rows are parsed as they are read and written
+        ``batch_size`` at a time, with COPY on PostgreSQL and executemany
+        elsewhere. The daily rollup and streak are rebuilt once at the end
+        instead of per row. Invalid rows are counted and skipped.
+
+        Raises:
+            ValueError: If the header has no timestamp column or the file is
+                not valid CSV
+        """
+        result = WaterLogImportResult(imported=0, rejected=0, errors=[])
+        for batch in ImportService.read_batches(lines, user_id, result, batch_size):
+            ImportService.insert_batch(db, batch)
+            result.imported += len(batch)
+        return ImportService.finish_import(db, user_id, result)
+
+    @staticmethod
+    def read_batches(
+        lines: Iterable[str],
+        user_id: UUID,
+        result: WaterLogImportResult,
+        batch_size: Optional[int] = None,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Parse a CSV into batches of log rows, counting rejects in ``result``.
+
+        The header is checked before this returns; the rows are parsed lazily,
+        one batch per ``next()``. Needs no database, so async handlers can
+        parse in the threadpool and only insert on the event loop.
+
+        Raises:
+            ValueError: If the header has no timestamp column or the file is
+                not valid CSV
+        """
+        reader = csv.DictReader(lines)
+        try:
+            fieldnames = reader.fieldnames
+        except csv.Error as e:
+            raise ValueError(f"Malformed CSV header: {e}") from e
+        if not fieldnames or "timestamp" not in fieldnames:
+            raise ValueError("CSV header must include a timestamp column")
+
+        def records() -> Iterator[Dict[str, Optional[str]]]:
+            # A broken quote or oversized field leaves the reader out of step
+            # with the file, so stop rather than skip the row. line_num only
+            # counts lines parsed so far, so the bad one is the next.
+            try:
+                yield from reader
+            except csv.Error as e:
+                raise ValueError(f"Line {reader.line_num + 1}: malformed CSV: {e}") from e
+
+        def valid_rows() -> Iterator[Dict[str, Any]]:
+            for record in records():
+                try:
+                    timestamp, amount, notes = parse_row(record)
+                except ValueError as e:
+                    result.rejected += 1
+                    if len(result.errors) < MAX_REPORTED_ERRORS:
+                        result.errors.append(f"Line {reader.line_num}: {e}")
+                    continue
+                yield {
+                    "id": uuid4(),
+                    "user_id": user_id,
+                    "timestamp": timestamp,
+                    "amount": amount,
+                    "notes": notes,
+                }
+
+        rows = valid_rows()
+        batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+        return iter(lambda: list(islice(rows, batch_size)), [])
+
+    @staticmethod
+    def finish_import(
+        db: Session, user_id: UUID, result: WaterLogImportResult
+    ) -> WaterLogImportResult:
+        """Rebuild the rollup, streak and leaderboard entry once, then commit."""
+        entry = None
+        if result.imported:
+            WaterService.replace_daily_totals(db, user_id)
+            WaterService.rebuild_streak(db, user_id)
+            WaterService.bump_data_version(db, user_id)
+            entry = LeaderboardService.sync_entry(db, user_id)
+        db.commit()
+        response_cache.invalidate(user_id)
+        LeaderboardService.apply(user_id, entry)
+        if result.imported:
+            STREAK_UPDATES.inc()
+
+        return result
+
+    @staticmethod
+    def insert_batch(db: Session, rows: List[Dict[str, Any]]) -> None:
+        """Insert a batch of log rows, with COPY where the driver supports it."""
+        if dialect.dialect_name(db) == "postgresql" and db.get_bind().dialect.driver == "psycopg2":
+            ImportService.copy_batch(db, rows)
+        else:
+            db.exec(insert(WaterLog), params=rows)
+
+    @staticmethod
+    def copy_batch(db: Session, rows: List[Dict[str, Any]]) -> None:
+        """Stream a batch into PostgreSQL with COPY ... FROM STDIN."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([
+                row["id"], row["user_id"], row["timestamp"].isoformat(),
+                row["amount"], row["notes"],
+            ])
+        buffer.seek(0)
+
+        # Runs on the session's connection, inside its transaction
+        connection = db.connection().connection.dbapi_connection
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {WaterLog.__tablename__} ({', '.join(IMPORT_COLUMNS)}) "
+                "FROM STDIN WITH (FORMAT csv)",
+                buffer,
+            )
@@ -0,0 +1,373 @@
+from datetime import date, datetime
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import case, literal, update
+from sqlmodel import Session, delete, func, insert, select
+
+from app.core.config import settings
+from app.core.ranking import RankIndex, Standings, leaderboards
+from app.db import dialect
+from app.models.daily_total import DailyTotal
+from app.models.leaderboard import LeaderboardEntry, Team, TeamMembership
+from app.models.streak import Streak
+from app.schemas.leaderboard import Leaderboard
+from app.services.stats import period_range
+
+# Leaderboard rankings: current streak, longest streak and this week's intake
+METRICS = ("current_streak", "longest_streak", "week_amount")
+
+
+def scores(entry: Mapping[str, Any], today: date) -> Dict[str, int]:
+    """
+    An entry's score on each leaderboard as of ``today``.
+
+    A current streak whose last log was before yesterday has lapsed, and a
+    weekly amount counted in an earlier week is stale; both score 0.
+    """
+    last_logged_date = entry["last_logged_date"]
+    current_streak = entry["current_streak"]
+    if last_logged_date is None or (today - last_logged_date).days > 1:
+        current_streak = 0
+    week_start, _ = period_range("weekly", today)
+    return {
+        "current_streak": current_streak,
+        "longest_streak": entry["longest_streak"],
+        "week_amount": entry["week_amount"] if entry["week_start"] == week_start else 0,
+    }
+
+
+class LeaderboardService:
+    """
+    Service for the opt-in leaderboards and teams.
+
+    The global leaderboards are served from in-memory rank indexes
+    (app.core.ranking.leaderboards), backed by the LeaderboardEntry table.
+    Each log updates the user's entry in its own transaction and, once
+    committed, their position on the loaded indexes, so reading the top of
+    a board or a user's rank never sorts the users. Team leaderboards are
+    small enough to be ranked on read from the members' entries.
+    """
+
+    @staticmethod
+    def get_entry(db: Session, user_id: UUID) -> Optional[LeaderboardEntry]:
+        """Get a user's entry, None if they have not opted in."""
+        return db.get(LeaderboardEntry, user_id)
+
+    @staticmethod
+    def join(db: Session, user_id: UUID, display_name: str) -> LeaderboardEntry:
+        """
+        Opt a user in to the leaderboards, or change their display name.
+
+        A single upsert, so concurrent first-time joins of one user cannot
+        both insert: the new entry copies the user's progress, and an
+        existing one only takes the new display name.
+        """
+        entry = LeaderboardEntry(
+            user_id=user_id,
+            display_name=display_name,
+            week_start=period_range("weekly")[0],
+        )
+        LeaderboardService.fill_entry(db, entry)
+        stmt = dialect.insert(db, LeaderboardEntry).values(**entry.model_dump())
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[LeaderboardEntry.user_id],
+            set_={
+                "display_name": stmt.excluded.display_name,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+
+        columns = LeaderboardEntry.__table__.columns
+        if db.get_bind().dialect.insert_returning:
+            row = db.exec(stmt.returning(*columns)).one()
+        else:
+            db.exec(stmt)
+            row = db.exec(select(*columns).where(LeaderboardEntry.user_id == user_id)).one()
+        db.commit()
+
+        values = dict(row._mapping)
+        LeaderboardService.apply(user_id, values)
+        return LeaderboardEntry(**values)
+
+    @staticmethod
+    def leave(db: Session, user_id: UUID) -> None:
+        """Opt a user out of the leaderboards and every team."""
+        db.exec(delete(TeamMembership).where(TeamMembership.user_id == user_id))
+        db.exec(delete(LeaderboardEntry).where(LeaderboardEntry.user_id == user_id))
+        db.commit()
+        leaderboards.apply(user_id, None)
+
+    @staticmethod
+    def fill_entry(db: Session, entry: LeaderboardEntry) -> None:
+        """Copy the user's streak and this week's intake onto an entry."""
+        streak = db.exec(select(Streak).where(Streak.user_id == entry.user_id)).first()
+        if streak is not None:
+            entry.current_streak = streak.current_streak
+            entry.longest_streak = streak.longest_streak
+            entry.last_logged_date = streak.last_logged_date
+        week_start, week_end = period_range("weekly")
+        entry.week_start = week_start
+        entry.week_amount = db.exec(
+            select(func.coalesce(func.sum(DailyTotal.total_amount), 0))
+            .where(DailyTotal.user_id == entry.user_id)
+            .where(DailyTotal.day >= week_start)
+            .where(DailyTotal.day <= week_end)
+        ).one()
+        entry.updated_at = datetime.utcnow()
+
+    @staticmethod
+    def sync_entry(db: Session, user_id: UUID) -> Optional[Dict[str, Any]]:
+        """
+        Recompute an opted-in user's entry from their data, without committing.
+
+        For writes that rebuild the streak and rollup, such as imports.
+
+        Returns:
+            The entry's values to pass to apply() after committing, None if
+            the user has not opted in
+        """
+        entry = db.get(LeaderboardEntry, user_id)
+        if entry is None:
+            return None
+        LeaderboardService.fill_entry(db, entry)
+        db.add(entry)
+        return entry.model_dump()
+
+    @staticmethod
+    def record_log(
+        db: Session, user_id: UUID, streak: Streak, amounts: Mapping[date, int]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Update an opted-in user's entry after logs were written, without committing.
+
+        A single UPDATE copies the streak and adds the intake that falls in
+        the current week, restarting the weekly count if the entry's is from
+        an earlier week. Users who have not opted in match no row.
+
+        Args:
+            streak: The streak as stored by the same transaction
+            amounts: Intake logged per day
+
+        Returns:
+            The entry's values to pass to apply() after committing, None if
+            the user has not opted in
+        """
+        week_start, week_end = period_range("weekly")
+        week_amount = sum(
+            amount for day, amount in amounts.items() if week_start <= day <= week_end
+        )
+        stmt = (
+            update(LeaderboardEntry)
+            .where(LeaderboardEntry.user_id == user_id)
+            .values(
+                current_streak=streak.current_streak,
+                longest_streak=streak.longest_streak,
+                last_logged_date=streak.last_logged_date,
+                week_amount=case(
+                    (
+                        LeaderboardEntry.week_start == week_start,
+                        LeaderboardEntry.week_amount + week_amount,
+                    ),
+                    else_=week_amount,
+                ),
+                week_start=week_start,
+                updated_at=datetime.utcnow(),
+            )
+        )
+
+        columns = LeaderboardEntry.__table__.columns
+        if db.get_bind().dialect.update_returning:
+            row = db.exec(stmt.returning(*columns)).first()
+        else:
+            db.exec(stmt)
+            row = db.exec(select(*columns).where(LeaderboardEntry.user_id == user_id)).first()
+
+        return dict(row._mapping) if row is not None else None
+
+    @staticmethod
+    def apply(user_id: UUID, entry: Optional[Mapping[str, Any]]) -> None:
+        """Move a user on the loaded rank indexes after their entry was committed."""
+        if entry is not None:
+            leaderboards.apply(user_id, scores(entry, date.today()), entry["display_name"])
+
+    @staticmethod
+    def get_leaderboard(
+        db: Session, metric: str, limit: int, user_id: Optional[UUID] = None
+    ) -> Leaderboard:
+        """
+        Get the top of a global leaderboard and the user's own position.
+
+        Served from the in-memory rank index, which is built from the
+        leaderboard table on first use and refreshed after midnight.
+        """
+        today = date.today()
+        standings = leaderboards.standings(
+            metric,
+            today,
+            lambda: LeaderboardService.board_entries(db, metric, today),
+            limit,
+            user_id,
+        )
+        return LeaderboardService.to_leaderboard(metric, standings)
+
+    @staticmethod
+    def refresh_leaderboards(db: Session) -> int:
+        """
+        Build every global leaderboard that is missing or stale.
+
+        Run periodically by a background task, so no reader has to wait for
+        a rebuild.
+
+        Returns:
+            Number of boards built
+        """
+        today = date.today()
+        return leaderboards.refresh(
+            METRICS, today, lambda metric: LeaderboardService.board_entries(db, metric, today)
+        )
+
+    @staticmethod
+    def board_entries(db: Session, metric: str, today: date) -> List[Tuple[UUID, str, int]]:
+        """Every opted-in user's (user_id, display_name, score) on one board."""
+        rows = db.exec(select(*LeaderboardEntry.__table__.columns)).all()
+        return [
+            (row.user_id, row.display_name, scores(row._mapping, today)[metric])
+            for row in rows
+        ]
+
+    @staticmethod
+    def to_leaderboard(metric: str, standings: Standings) -> Leaderboard:
+        """Shape standings for the API."""
+        def position(ranked):
+            _, name, score, rank = ranked
+            return {"rank": rank, "display_name": name or "", "score": score}
+
+        return Leaderboard(
+            metric=metric,
+            total=standings.total,
+            entries=[position(ranked) for ranked in standings.top],
+            me=position(standings.mine) if standings.mine is not None else None,
+        )
+
+    @staticmethod
+    def create_team(db: Session, user_id: UUID, name: str) -> Team:
+        """
+        Create a team with the user as its first member.
+
+        Raises:
+            ValueError: If the user has not opted in to the leaderboards
+        """
+        if db.get(LeaderboardEntry, user_id) is None:
+            raise ValueError("Join the leaderboard before joining a team")
+
+        team = Team(name=name, created_by=user_id)
+        db.add(team)
+        db.add(TeamMembership(team_id=team.id, user_id=user_id))
+        db.commit()
+        db.refresh(team)
+        return team
+
+    @staticmethod
+    def get_teams(db: Session, user_id: UUID) -> List[Team]:
+        """Get the teams a user belongs to."""
+        return db.exec(
+            select(Team)
+            .join(TeamMembership, TeamMembership.team_id == Team.id)
+            .where(TeamMembership.user_id == user_id)
+            .order_by(Team.created_at)
+        ).all()
+
+    @staticmethod
+    def join_team(db: Session, user_id: UUID, team_id: UUID) -> Optional[Team]:
+        """
+        Add a user to a team; joining a team twice is a no-op.
+
+        The team row is locked (FOR UPDATE, where supported) and the
+        membership is inserted only while the team has room, counted in the
+        same INSERT ... SELECT, so concurrent joins cannot overfill a team.
+
+        Returns:
+            The team, None if it does not exist
+
+        Raises:
+            ValueError: If the user has not opted in to the leaderboards or
+                the team is full
+        """
+        team = db.exec(select(Team).where(Team.id == team_id).with_for_update()).first()
+        if team is None:
+            return None
+        if db.get(LeaderboardEntry, user_id) is None:
+            raise ValueError("Join the leaderboard before joining a team")
+        if db.get(TeamMembership, (team_id, user_id)) is not None:
+            return team
+
+        columns = TeamMembership.__table__.c
+        members = (
+            select(func.count())
+            .select_from(TeamMembership)
+            .where(TeamMembership.team_id == team_id)
+            .scalar_subquery()
+        )
+        joined = db.exec(
+            insert(TeamMembership).from_select(
+                ["team_id", "user_id", "joined_at"],
+                select(
+                    literal(team_id, columns.team_id.type),
+                    literal(user_id, columns.user_id.type),
+                    literal(datetime.utcnow(), columns.joined_at.type),
+                ).where(members < settings.TEAM_MAX_MEMBERS),
+            )
+        ).rowcount
+        db.commit()
+        if not joined:
+            raise ValueError(f"Teams cannot exceed {settings.TEAM_MAX_MEMBERS} members")
+        return team
+
+    @staticmethod
+    def leave_team(db: Session, user_id: UUID, team_id: UUID) -> bool:
+        """
+        Remove a user from a team.
+
+        Returns:
+            Whether the user was a member
+        """
+        result = db.exec(
+            delete(TeamMembership)
+            .where(TeamMembership.team_id == team_id)
+            .where(TeamMembership.user_id == user_id)
+        )
+        db.commit()
+        return result.rowcount > 0
+
+    @staticmethod
+    def get_team_leaderboard(
+        db: Session, team_id: UUID, metric: str, limit: int, user_id: UUID
+    ) -> Optional[Leaderboard]:
+        """
+        Get a team's leaderboard, ranked on read from its members' entries.
+
+        Returns:
+            The leaderboard, None if the user is not a member of the team
+        """
+        if db.get(TeamMembership, (team_id, user_id)) is None:
+            return None
+
+        today = date.today()
+        rows = db.exec(
+            select(*LeaderboardEntry.__table__.columns)
+            .join(TeamMembership, TeamMembership.user_id == LeaderboardEntry.user_id)
+            .where(TeamMembership.team_id == team_id)
+            .order_by(TeamMembership.joined_at)
+        ).all()
+
+        index = RankIndex()
+        names = {}
+        for row in rows:
+            index.set(row.user_id, scores(row._mapping, today)[metric])
+            names[row.user_id] = row.display_name
+        mine = None
+        if user_id in index:
+            mine = (user_id, names[user_id], index.score(user_id), index.rank(user_id))
+        top = [(key, names[key], score, rank) for key, score, rank in index.top(limit)]
+        return LeaderboardService.to_leaderboard(metric, Standings(top, mine, len(index)))
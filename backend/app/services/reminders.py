@@ -0,0 +1,183 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+from uuid import UUID
+
+from sqlalchemy import Row, bindparam, or_, update
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.metrics import REMINDER_DISPATCH_LAG, REMINDERS_SENT
+from app.core.reminders import (
+    Reminder, ReminderSettings, ReminderSink, in_active_hours, local_time, next_active_time,
+    next_reminder_time, utc_time,
+)
+from app.db import dialect
+from app.models.user import User
+
+
+class ReminderService:
+    """
+    Service for persisted reminder scheduling and dispatch.
+
+    Each user's next due reminder is stored in the indexed
+    User.next_reminder_at, so the schedule survives restarts and finding due
+    reminders is an index range read rather than a scan of the users. Any
+    number of dispatchers can run against the same database: each claims a
+    batch of due rows by setting a lease on them, and rows under a live lease
+    are skipped by the others.
+
+    Stored times are naive UTC; active hours are checked against the
+    server's local clock, the one that decides which day a log counts for.
+    """
+
+    @staticmethod
+    def next_for(user: User, after: Optional[datetime] = None) -> Optional[datetime]:
+        """
+        When a user's next reminder is due after ``after`` (default now), in UTC.
+
+        Returns:
+            The due time, or None if the user is inactive or has reminders off
+        """
+        if not user.is_active or user.reminder_frequency <= 0:
+            return None
+        reminder_settings = ReminderSettings(
+            user.reminder_frequency, user.active_hours_start, user.active_hours_end,
+        )
+        local_after = local_time(after or datetime.utcnow())
+        return utc_time(next_reminder_time(local_after, reminder_settings))
+
+    @staticmethod
+    def touch(db: Session, user_id: UUID, now: Optional[datetime] = None) -> None:
+        """
+        Push a user's next reminder back after they logged water, without committing.
+
+        Computed in the database from the user's reminder_frequency, so the
+        write path needs no read of the user; a reminder that lands outside
+        active hours is moved to the next active period at dispatch. Users
+        with reminders off are left alone.
+        """
+        db.exec(
+            update(User)
+            .where(User.id == user_id, User.next_reminder_at.is_not(None))
+            .values(next_reminder_at=dialect.add_minutes(
+                db, now or datetime.utcnow(), User.reminder_frequency
+            ))
+        )
+
+    @staticmethod
+    def claim_due(
+        db: Session,
+        now: datetime,
+        limit: int,
+        lease_until: datetime,
+    ) -> List[Row]:
+        """
+        Claim up to ``limit`` due reminders, earliest first, and commit.
+
+        Due rows not under a live lease are leased until ``lease_until`` in a
+        single UPDATE ... RETURNING. On PostgreSQL the row selection uses FOR
+        UPDATE SKIP LOCKED, so concurrent dispatchers pass over each other's
+        rows instead of queueing behind them; SQLite serializes writers, so
+        the lease alone keeps claims apart.
+
+        Returns:
+            Rows of (id, next_reminder_at, reminder_frequency,
+            active_hours_start, active_hours_end)
+        """
+        due = (
+            select(User.id)
+            .where(User.next_reminder_at <= now)
+            .where(or_(User.reminder_lease_until.is_(None), User.reminder_lease_until < now))
+            .order_by(User.next_reminder_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        rows = db.exec(
+            update(User)
+            .where(User.id.in_(due.scalar_subquery()))
+            .values(reminder_lease_until=lease_until)
+            .returning(
+                User.id,
+                User.next_reminder_at,
+                User.reminder_frequency,
+                User.active_hours_start,
+                User.active_hours_end,
+            )
+        ).all()
+        db.commit()
+        return rows
+
+    @staticmethod
+    def dispatch_batch(
+        db: Session,
+        sink: ReminderSink,
+        now: Optional[datetime] = None,
+        batch_size: Optional[int] = None,
+    ) -> int:
+        """
+        Claim one batch of due reminders, send them and reschedule their users.
+
+        Reminders that came due outside the user's active hours are not sent
+        but moved to the start of the next active period. The reschedule only
+        applies to rows still under this dispatcher's lease, so a dispatcher
+        that stalled past its lease cannot overwrite a newer claim.
+
+        Returns:
+            Number of rows claimed, sent or not
+        """
+        now = now or datetime.utcnow()
+        local_now = local_time(now)
+        batch_size = batch_size or settings.REMINDER_BATCH_SIZE
+        lease_until = now + timedelta(seconds=settings.REMINDER_LEASE_SECONDS)
+        rows = ReminderService.claim_due(db, now, batch_size, lease_until)
+        if not rows:
+            return 0
+
+        reminders = []
+        schedule = []
+        for user_id, due_at, *preferences in rows:
+            reminder_settings = ReminderSettings(*preferences)
+            if in_active_hours(local_now, reminder_settings):
+                reminders.append(Reminder(user_id, due_at))
+                next_at = next_reminder_time(local_now, reminder_settings)
+            else:
+                next_at = next_active_time(local_now, reminder_settings)
+            schedule.append({"user_id": user_id, "next_at": utc_time(next_at)})
+
+        if reminders:
+            sink.send(reminders)
+            sent_at = datetime.utcnow()
+            REMINDERS_SENT.inc(len(reminders))
+            for reminder in reminders:
+                REMINDER_DISPATCH_LAG.observe(max(0.0, (sent_at - reminder.due_at).total_seconds()))
+
+        db.connection().execute(
+            update(User)
+            .where(User.id == bindparam("user_id"))
+            .where(User.reminder_lease_until == lease_until)
+            .values(next_reminder_at=bindparam("next_at"), reminder_lease_until=None),
+            schedule,
+        )
+        db.commit()
+        return len(rows)
+
+    @staticmethod
+    def dispatch(
+        db: Session,
+        sink: ReminderSink,
+        now: Optional[datetime] = None,
+        batch_size: Optional[int] = None,
+    ) -> int:
+        """
+        Dispatch batches until no due reminders are left unclaimed.
+
+        Returns:
+            Number of rows claimed
+        """
+        batch_size = batch_size or settings.REMINDER_BATCH_SIZE
+        claimed = 0
+        while True:
+            count = ReminderService.dispatch_batch(db, sink, now, batch_size)
+            claimed += count
+            if count < batch_size:
+                return claimed
@@ -0,0 +1,240 @@
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Tuple
+from uuid import UUID
+
+from sqlmodel import Session, func, select
+
+from app.core.config import settings
+from app.db import dialect
+from app.models.daily_total import DailyTotal
+from app.models.water_log import WaterLog
+from app.schemas.water import WaterStats
+
+# Calendar buckets are labelled by the date they start on; cyclic buckets by
+# their position in the cycle.
+CALENDAR_GRANULARITIES = ("day", "week", "month", "year")
+CYCLIC_GRANULARITIES = ("hour", "weekday")
+GRANULARITIES = CYCLIC_GRANULARITIES + CALENDAR_GRANULARITIES
+
+
+class StatsService:
+    """
+    Service for aggregated water intake statistics.
+
+    Every request is answered by a single GROUP BY query. Calendar and weekday
+    buckets are summed from the DailyTotal rollup; hour-of-day buckets need
+    the raw log timestamps and are summed from WaterLog. Empty buckets are
+    filled in afterwards without loading any ORM objects.
+    """
+
+    @staticmethod
+    def aggregate(
+        db: Session,
+        user_id: UUID,
+        granularity: str,
+        start_date: date,
+        end_date: date,
+        period: str = "custom",
+    ) -> WaterStats:
+        """
+        Aggregate a user's intake over a date range.
+
+        Args:
+            db: Database session
+            user_id: User's UUID
+            granularity: One of GRANULARITIES
+            start_date: First day of the range (inclusive)
+            end_date: Last day of the range (inclusive)
+            period: Label echoed back in the response
+
+        Returns:
+            WaterStats with one data point per bucket, in order
+
+        Raises:
+            ValueError: If the granularity or date range is invalid, or the
+                range spans more than STATS_MAX_BUCKETS buckets
+        """
+        StatsService.check_range(granularity, start_date, end_date)
+        totals = StatsService.bucket_totals(db, user_id, granularity, start_date, end_date)
+        return StatsService.fill_buckets(granularity, start_date, end_date, totals, period)
+
+    @staticmethod
+    def check_range(granularity: str, start_date: date, end_date: date) -> None:
+        """
+        Validate a granularity and date range.
+
+        Raises:
+            ValueError: If either is invalid or the range spans more than
+                STATS_MAX_BUCKETS buckets
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Invalid granularity: {granularity}")
+        if end_date < start_date:
+            raise ValueError("end_date must not be before start_date")
+        if StatsService.bucket_count(granularity, start_date, end_date) > settings.STATS_MAX_BUCKETS:
+            raise ValueError(f"Range cannot exceed {settings.STATS_MAX_BUCKETS} buckets")
+
+    @staticmethod
+    def bucket_totals(
+        db: Session, user_id: UUID, granularity: str, start_date: date, end_date: date
+    ) -> Dict[Any, int]:
+        """Sum a user's intake per non-empty bucket with one GROUP BY query."""
+        if granularity == "hour":
+            return StatsService._hourly_totals(db, user_id, start_date, end_date)
+        if granularity == "weekday":
+            return StatsService._weekday_totals(db, user_id, start_date, end_date)
+        return StatsService._calendar_totals(db, user_id, granularity, start_date, end_date)
+
+    @staticmethod
+    def fill_buckets(
+        granularity: str,
+        start_date: date,
+        end_date: date,
+        totals: Dict[Any, int],
+        period: str = "custom",
+    ) -> WaterStats:
+        """
+        Build the response from bucket totals, filling in empty buckets.
+
+        Needs no database, so async handlers can run it off the event loop.
+        """
+        if granularity == "hour":
+            data = [{"hour": hour, "amount": totals.get(hour, 0)} for hour in range(24)]
+        elif granularity == "weekday":
+            data = [{"weekday": day, "amount": totals.get(day, 0)} for day in range(7)]
+        else:
+            data = [
+                {"date": bucket.isoformat(), "amount": totals.get(bucket, 0)}
+                for bucket in StatsService.calendar_buckets(granularity, start_date, end_date)
+            ]
+
+        return WaterStats(
+            period=period,
+            granularity=granularity,
+            start_date=start_date,
+            end_date=end_date,
+            data=data,
+        )
+
+    @staticmethod
+    def bucket_count(granularity: str, start_date: date, end_date: date) -> int:
+        """Count the buckets of a range without listing them."""
+        if granularity == "hour":
+            return 24
+        if granularity == "weekday":
+            return 7
+        if granularity == "week":
+            first = StatsService.bucket_start("week", start_date)
+            last = StatsService.bucket_start("week", end_date)
+            return (last - first).days // 7 + 1
+        if granularity == "month":
+            return (end_date.year - start_date.year) * 12 + end_date.month - start_date.month + 1
+        if granularity == "year":
+            return end_date.year - start_date.year + 1
+        return (end_date - start_date).days + 1
+
+    @staticmethod
+    def calendar_buckets(granularity: str, start_date: date, end_date: date) -> List[date]:
+        """List the start date of every calendar bucket overlapping a range."""
+        bucket = StatsService.bucket_start(granularity, start_date)
+        buckets = []
+        while bucket <= end_date:
+            buckets.append(bucket)
+            try:
+                if granularity == "day":
+                    bucket += timedelta(days=1)
+                elif granularity == "week":
+                    bucket += timedelta(weeks=1)
+                elif granularity == "month":
+                    bucket = date(bucket.year + bucket.month // 12, bucket.month % 12 + 1, 1)
+                else:
+                    bucket = date(bucket.year + 1, 1, 1)
+            except (OverflowError, ValueError):
+                # The next bucket would start after date.max
+                break
+        return buckets
+
+    @staticmethod
+    def bucket_start(granularity: str, day: date) -> date:
+        """Return the first day of the calendar bucket containing ``day``."""
+        if granularity == "week":
+            return day - timedelta(days=day.weekday())
+        if granularity == "month":
+            return day.replace(day=1)
+        if granularity == "year":
+            return day.replace(month=1, day=1)
+        return day
+
+    @staticmethod
+    def _calendar_totals(
+        db: Session, user_id: UUID, granularity: str, start_date: date, end_date: date
+    ) -> Dict[date, int]:
+        bucket = dialect.truncate_date(db, DailyTotal.day, granularity)
+        rows = db.exec(
+            select(bucket, func.sum(DailyTotal.total_amount))
+            .where(DailyTotal.user_id == user_id)
+            .where(DailyTotal.day >= start_date)
+            .where(DailyTotal.day <= end_date)
+            .group_by(bucket)
+        ).all()
+
+        # SQLite hands back ISO strings, PostgreSQL real dates
+        return {
+            date.fromisoformat(key) if isinstance(key, str) else key: int(total)
+            for key, total in rows
+        }
+
+    @staticmethod
+    def _weekday_totals(
+        db: Session, user_id: UUID, start_date: date, end_date: date
+    ) -> Dict[int, int]:
+        dow = dialect.extract_field(db, DailyTotal.day, "dow")
+        rows = db.exec(
+            select(dow, func.sum(DailyTotal.total_amount))
+            .where(DailyTotal.user_id == user_id)
+            .where(DailyTotal.day >= start_date)
+            .where(DailyTotal.day <= end_date)
+            .group_by(dow)
+        ).all()
+
+        # SQL counts from Sunday = 0; report Monday = 0 like date.weekday()
+        return {(key + 6) % 7: int(total) for key, total in rows}
+
+    @staticmethod
+    def _hourly_totals(
+        db: Session, user_id: UUID, start_date: date, end_date: date
+    ) -> Dict[int, int]:
+        hour = dialect.extract_field(db, WaterLog.timestamp, "hour")
+        rows = db.exec(
+            select(hour, func.sum(WaterLog.amount))
+            .where(WaterLog.user_id == user_id)
+            .where(WaterLog.timestamp >= datetime.combine(start_date, datetime.min.time()))
+            .where(WaterLog.timestamp <= datetime.combine(end_date, datetime.max.time()))
+            .group_by(hour)
+        ).all()
+
+        return {key: int(total) for key, total in rows}
+
+
+def period_range(period: str, today: date = None) -> Tuple[date, date]:
+    """
+    Resolve a named period to the date range it covers.
+
+    Args:
+        period: "weekly" (Monday to Sunday) or "monthly"
+        today: Reference date, defaults to today
+
+    Returns:
+        Tuple of (start_date, end_date), both inclusive
+    """
+    if today is None:
+        today = date.today()
+
+    if period == "weekly":
+        start_date = today - timedelta(days=today.weekday())
+        return start_date, start_date + timedelta(days=6)
+    if period == "monthly":
+        start_date = date(today.year, today.month, 1)
+        next_month = date(today.year + today.month // 12, today.month % 12 + 1, 1)
+        return start_date, next_month - timedelta(days=1)
+    raise ValueError(f"Invalid period: {period}")
@@ -0,0 +1,145 @@
+import hashlib
+import secrets
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from uuid import UUID, uuid4
+
+from sqlmodel import Session, delete, select, update
+
+from app.core.config import settings
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+
+
+class TokenService:
+    """
+    Service layer for refresh tokens.
+
+    Refresh tokens are random opaque strings; only their SHA-256 digest is
+    stored, so redeeming one costs a single indexed lookup instead of a
+    password hash. Every redemption rotates the token.
+    """
+
+    @staticmethod
+    def hash_token(token: str) -> str:
+        """Digest a raw refresh token for storage and lookup."""
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    @staticmethod
+    def issue(db: Session, user_id: UUID, family_id: Optional[UUID] = None) -> str:
+        """
+        Issue a new refresh token for a user.
+
+        Args:
+            db: Database session
+            user_id: User's UUID
+            family_id: Rotation chain to continue, or None to start a new one
+
+        Returns:
+            The raw refresh token, which is not stored anywhere
+        """
+        token = secrets.token_urlsafe(32)
+        db.add(RefreshToken(
+            user_id=user_id,
+            token_hash=TokenService.hash_token(token),
+            family_id=family_id or uuid4(),
+            expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+        ))
+        db.commit()
+
+        return token
+
+    @staticmethod
+    def rotate(db: Session, token: str) -> Optional[Tuple[UUID, str]]:
+        """
+        Redeem a refresh token, replacing it with a new one.
+
+        Presenting a token that was already rotated or revoked is treated as
+        theft: every token in its family is revoked. The token is claimed with
+        a conditional UPDATE before its successor is issued, so of two
+        concurrent redemptions only one can win; the other sees it revoked.
+
+        Args:
+            db: Database session
+            token: Raw refresh token
+
+        Returns:
+            Tuple of (user_id, new refresh token), or None if the token is
+            unknown, expired, revoked or belongs to an inactive user
+        """
+        now = datetime.utcnow()
+        token_hash = TokenService.hash_token(token)
+        claimed = db.exec(
+            update(RefreshToken)
+            .where(RefreshToken.token_hash == token_hash)
+            .where(RefreshToken.revoked_at.is_(None))
+            .where(RefreshToken.expires_at > now)
+            .values(revoked_at=now)
+        ).rowcount == 1
+
+        if not claimed:
+            row = db.exec(
+                select(RefreshToken.family_id, RefreshToken.revoked_at)
+                .where(RefreshToken.token_hash == token_hash)
+            ).first()
+            if row is not None and row.revoked_at is not None:
+                TokenService.revoke_family(db, row.family_id)
+            return None
+
+        user_id, family_id, is_active = db.exec(
+            select(RefreshToken.user_id, RefreshToken.family_id, User.is_active)
+            .join(User, User.id == RefreshToken.user_id)
+            .where(RefreshToken.token_hash == token_hash)
+        ).one()
+        if not is_active:
+            db.commit()
+            return None
+
+        return user_id, TokenService.issue(db, user_id, family_id)
+
+    @staticmethod
+    def revoke(db: Session, token: str) -> bool:
+        """
+        Revoke a single refresh token, e.g. on logout.
+
+        Returns:
+            True if an active token was revoked, False otherwise
+        """
+        result = db.exec(
+            update(RefreshToken)
+            .where(RefreshToken.token_hash == TokenService.hash_token(token))
+            .where(RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=datetime.utcnow())
+        )
+        db.commit()
+
+        return result.rowcount > 0
+
+    @staticmethod
+    def revoke_family(db: Session, family_id: UUID) -> None:
+        """Revoke every token in a rotation chain."""
+        db.exec(
+            update(RefreshToken)
+            .where(RefreshToken.family_id == family_id)
+            .where(RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=datetime.utcnow())
+        )
+        db.commit()
+
+    @staticmethod
+    def purge_expired(db: Session, now: Optional[datetime] = None) -> int:
+        """
+        Delete expired refresh tokens using the expires_at index.
+
+        Revoked tokens are kept until they expire so that replays can still be
+        detected.
+
+        Returns:
+            Number of tokens deleted
+        """
+        result = db.exec(
+            delete(RefreshToken).where(RefreshToken.expires_at < (now or datetime.utcnow()))
+        )
+        db.commit()
+
+        return result.rowcount
@@ -3,11 +3,13 @@ from uuid import UUID
 
 from sqlmodel import Session, select
 
-from app.core.security import get_password_hash, verify_password
+from app.core.principal import principal_cache
+from app.core.security import get_password_hash, verify_and_update_password
 from app.models.user import User
 from app.models.goal import Goal
 from app.models.streak import Streak
 from app.schemas.user import UserCreate, UserUpdate
+from app.services.reminders import ReminderService
 
 
 class UserService:
@@ -50,13 +52,17 @@ class UserService:
         return db.get(User, user_id)
 
     @staticmethod
-    def create(db: Session, user_in: UserCreate) -> User:
+    def create(
+        db: Session, user_in: UserCreate, hashed_password: Optional[str] = None
+    ) -> User:
         """
         Create a new user with default goal and streak.
 
         Args:
             db: Database session
             user_in: User creation data
+            hashed_password: Pre-computed hash of user_in.password, if the
+                caller already hashed it off the request thread
 
         Returns:
             Created user object or None if user already exists
@@ -65,14 +71,18 @@ class UserService:
         if existing_user:
             return None
 
+        if hashed_password is None:
+            hashed_password = get_password_hash(user_in.password)
+
         user = User(
             email=user_in.email,
-            hashed_password=get_password_hash(user_in.password),
+            hashed_password=hashed_password,
             is_active=True,
             reminder_frequency=user_in.reminder_frequency,
             active_hours_start=user_in.active_hours_start,
             active_hours_end=user_in.active_hours_end,
         )
+        user.next_reminder_at = ReminderService.next_for(user)
         db.add(user)
         db.commit()
         db.refresh(user)
@@ -121,11 +131,21 @@ class UserService:
             user.active_hours_end = user_in.active_hours_end
         if user_in.password is not None:
             user.hashed_password = get_password_hash(user_in.password)
+        if (
+            user_in.is_active is not None
+            or user_in.reminder_frequency is not None
+            or user_in.active_hours_start is not None
+            or user_in.active_hours_end is not None
+        ):
+            user.next_reminder_at = ReminderService.next_for(user)
 
         db.add(user)
         db.commit()
         db.refresh(user)
 
+        # Cached principals may carry a stale is_active flag
+        principal_cache.invalidate(user.id)
+
         return user
 
     @staticmethod
@@ -144,8 +164,31 @@ class UserService:
         user = UserService.get_by_email(db, email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        valid, new_hash = verify_and_update_password(password, user.hashed_password)
+        if not valid:
             return None
+        if new_hash:
+            UserService.update_password_hash(db, user, new_hash)
+        return user
+
+    @staticmethod
+    def update_password_hash(db: Session, user: User, hashed_password: str) -> User:
+        """
+        Replace a user's stored password hash, e.g. after a cost change.
+
+        Args:
+            db: Database session
+            user: User object to update
+            hashed_password: New hash of the user's unchanged password
+
+        Returns:
+            Updated user object
+        """
+        user.hashed_password = hashed_password
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+
         return user
 
     @staticmethod
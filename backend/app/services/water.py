@@ -1,13 +1,39 @@
+import base64
+import binascii
 from datetime import date, datetime, timedelta
-from typing import Dict, List, Optional, Tuple
-from uuid import UUID
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+from uuid import UUID, uuid4
 
-from sqlmodel import Session, select, func
+from pydantic import ValidationError
+from sqlalchemy import Row, case, tuple_
+from sqlmodel import Session, delete, insert, select, func
 
+from app.core.metrics import STREAK_UPDATES, WATER_TAPS
+from app.core.pubsub import broker
+from app.core.response_cache import response_cache
+from app.db import dialect
+from app.models.daily_total import DailyTotal
+from app.models.data_version import DataVersion
 from app.models.water_log import WaterLog
 from app.models.goal import Goal
 from app.models.streak import Streak
-from app.schemas.water import WaterLogCreate, DateRange, WaterStats
+from app.schemas.water import (
+    WaterLogBatchItemResult, WaterLogCreate, DateRange, WaterProgress, WaterStats
+)
+from app.services.leaderboard import LeaderboardService
+from app.services.reminders import ReminderService
+from app.services.stats import StatsService, period_range
+
+# Keyset position of a log: its (timestamp, id)
+LogKey = Tuple[datetime, UUID]
+
+
+class LogBatch(NamedTuple):
+    """A validated batch of logs, ready to be written."""
+    results: List[WaterLogBatchItemResult]  # One per submitted item, in order
+    rows: List[Dict[str, Any]]  # WaterLog rows of the valid items
+    totals: Dict[date, List[int]]  # [amount, log count] per day
+    received_at: datetime
 
 
 class WaterService:
@@ -15,7 +41,17 @@ class WaterService:
     
     @staticmethod
     def create_log(db: Session, user_id: UUID, log_in: WaterLogCreate) -> WaterLog:
-        """Create a new water log."""
+        """
+        Create a new water log.
+
+        The log insert, the daily rollup upsert, the streak upsert, the data
+        version bump, pushing back the user's next reminder and updating
+        their leaderboard entry share one transaction and one commit. All log
+        columns are generated here, so the log is inserted with a Core INSERT
+        and returned without a refresh. The new daily total and streak, read
+        back by the upserts, are then published to the user's live
+        subscribers.
+        """
         # Create water log
         water_log = WaterLog(
             user_id=user_id,
@@ -23,15 +59,114 @@ class WaterService:
             notes=log_in.notes,
             timestamp=log_in.timestamp or datetime.utcnow(),
         )
-        db.add(water_log)
-        db.commit()
-        db.refresh(water_log)
+        db.exec(insert(WaterLog).values(**water_log.model_dump()))
+        day = water_log.timestamp.date()
+        total_amount = WaterService.add_to_daily_total(db, user_id, day, water_log.amount)
         
         # Update streak
-        WaterService.update_streak(db, user_id)
+        streak = WaterService.upsert_streak(db, user_id)
+        WaterService.bump_data_version(db, user_id)
+        ReminderService.touch(db, user_id)
+        entry = LeaderboardService.record_log(db, user_id, streak, {day: water_log.amount})
+        db.commit()
+        response_cache.invalidate(user_id)
+        LeaderboardService.apply(user_id, entry)
+        WaterService.publish_log(user_id, day, total_amount, streak)
+        WATER_TAPS.inc()
+        STREAK_UPDATES.inc()
         
         return water_log
     
+    @staticmethod
+    def create_logs_batch(
+        db: Session, user_id: UUID, items: List[Union[WaterLogCreate, Dict[str, Any]]]
+    ) -> List[WaterLogBatchItemResult]:
+        """
+        Create many water logs in a single transaction.
+
+        Valid items are written with one bulk INSERT, the daily rollup gets one
+        upsert per affected day and the streak is advanced once for the whole
+        batch. Items that fail WaterLogCreate validation are reported back and
+        skipped.
+
+        Like a single log, the batch counts towards the streak as activity on
+        the day it is received, whatever the items' timestamps: replaying taps
+        from earlier days adds them to those days' totals but does not extend
+        or repair the streak for them.
+        """
+        batch = WaterService.prepare_logs_batch(user_id, items)
+        WaterService.write_logs_batch(db, user_id, batch)
+        return batch.results
+
+    @staticmethod
+    def prepare_logs_batch(
+        user_id: UUID, items: List[Union[WaterLogCreate, Dict[str, Any]]]
+    ) -> LogBatch:
+        """
+        Validate batch items and build their rows, without touching the database.
+
+        Kept apart from the write so async handlers can run this CPU-bound
+        part in the threadpool rather than on the event loop.
+        """
+        batch = LogBatch(results=[], rows=[], totals={}, received_at=datetime.utcnow())
+
+        for index, raw_item in enumerate(items):
+            try:
+                item = WaterLogCreate.model_validate(raw_item)
+            except ValidationError as e:
+                error = e.errors()[0]
+                field = ".".join(str(part) for part in error["loc"])
+                batch.results.append(WaterLogBatchItemResult(
+                    index=index,
+                    status="rejected",
+                    error=f"{field}: {error['msg']}" if field else error["msg"],
+                ))
+                continue
+
+            water_log = WaterLog(
+                user_id=user_id,
+                amount=item.amount or 1,
+                notes=item.notes,
+                timestamp=item.timestamp or batch.received_at,
+            )
+            batch.rows.append(water_log.model_dump())
+            day_total = batch.totals.setdefault(water_log.timestamp.date(), [0, 0])
+            day_total[0] += water_log.amount
+            day_total[1] += 1
+            batch.results.append(WaterLogBatchItemResult(
+                index=index,
+                status="created",
+                log=water_log.model_dump(),
+            ))
+
+        return batch
+
+    @staticmethod
+    def write_logs_batch(db: Session, user_id: UUID, batch: LogBatch) -> None:
+        """Write a prepared batch's valid rows in one transaction and commit."""
+        if not batch.rows:
+            return
+
+        totals = batch.totals
+        db.exec(insert(WaterLog), params=batch.rows)
+        day_totals = {
+            day: WaterService.add_to_daily_total(db, user_id, day, amount, log_count)
+            for day, (amount, log_count) in totals.items()
+        }
+        streak = WaterService.upsert_streak(db, user_id)
+        WaterService.bump_data_version(db, user_id)
+        ReminderService.touch(db, user_id, batch.received_at)
+        entry = LeaderboardService.record_log(
+            db, user_id, streak, {day: amount for day, (amount, _) in totals.items()}
+        )
+        db.commit()
+        response_cache.invalidate(user_id)
+        LeaderboardService.apply(user_id, entry)
+        latest = max(day_totals)
+        WaterService.publish_log(user_id, latest, day_totals[latest], streak)
+        WATER_TAPS.inc(len(batch.rows))
+        STREAK_UPDATES.inc()
+
     @staticmethod
     def get_logs_for_day(db: Session, user_id: UUID, day: date = None) -> List[WaterLog]:
         """Get water logs for a specific day."""
@@ -80,60 +215,203 @@ class WaterService:
         return logs_by_date
     
     @staticmethod
-    def get_stats(db: Session, user_id: UUID, period: str) -> WaterStats:
-        """Get water stats for a period."""
-        today = date.today()
-        
-        if period == "weekly":
-            # Get start and end of week
-            start_date = today - timedelta(days=today.weekday())
-            end_date = start_date + timedelta(days=6)
-            
-            # Get logs for week
-            date_range = DateRange(start_date=start_date, end_date=end_date)
-            logs_by_date = WaterService.get_logs_for_range(db, user_id, date_range)
-            
-            # Calculate stats
-            data = []
-            for i in range(7):
-                current_date = start_date + timedelta(days=i)
-                logs = logs_by_date.get(current_date, [])
-                total_amount = sum(log.amount for log in logs)
-                data.append({
-                    "date": current_date.isoformat(),
-                    "amount": total_amount,
-                })
-            
-            return WaterStats(period="weekly", data=data)
-        
-        elif period == "monthly":
-            # Get start and end of month
-            start_date = date(today.year, today.month, 1)
-            if today.month == 12:
-                end_date = date(today.year + 1, 1, 1) - timedelta(days=1)
-            else:
-                end_date = date(today.year, today.month + 1, 1) - timedelta(days=1)
-            
-            # Get logs for month
-            date_range = DateRange(start_date=start_date, end_date=end_date)
-            logs_by_date = WaterService.get_logs_for_range(db, user_id, date_range)
-            
-            # Calculate stats
-            data = []
-            current_date = start_date
-            while current_date <= end_date:
-                logs = logs_by_date.get(current_date, [])
-                total_amount = sum(log.amount for log in logs)
-                data.append({
-                    "date": current_date.isoformat(),
-                    "amount": total_amount,
-                })
-                current_date += timedelta(days=1)
-            
-            return WaterStats(period="monthly", data=data)
-        
+    def get_log_page(
+        db: Session,
+        user_id: UUID,
+        limit: int,
+        after: Optional[LogKey] = None,
+        date_range: Optional[DateRange] = None,
+    ) -> Tuple[List[Row], Optional[LogKey]]:
+        """
+        Get one page of a user's logs, oldest first, using keyset pagination.
+
+        Pages are addressed by the (timestamp, id) of the last row already
+        seen, so every page costs the same index range scan no matter how
+        deep into the history it is. Only the needed columns are selected and
+        rows come back as plain tuples, not ORM objects.
+
+        Args:
+            db: Database session
+            user_id: User's UUID
+            limit: Maximum number of rows to return
+            after: Key of the last row of the previous page, if any
+            date_range: Optional inclusive date range to restrict to
+
+        Returns:
+            Tuple of (rows of id, timestamp, amount, notes; key to pass as
+            ``after`` for the next page, or None on the last page)
+        """
+        query = (
+            select(WaterLog.id, WaterLog.timestamp, WaterLog.amount, WaterLog.notes)
+            .where(WaterLog.user_id == user_id)
+        )
+        if date_range is not None:
+            query = (
+                query
+                .where(WaterLog.timestamp >= datetime.combine(date_range.start_date, datetime.min.time()))
+                .where(WaterLog.timestamp <= datetime.combine(date_range.end_date, datetime.max.time()))
+            )
+        if after is not None:
+            query = query.where(tuple_(WaterLog.timestamp, WaterLog.id) > tuple_(*after))
+
+        # Fetch one extra row to learn whether another page follows
+        rows = db.exec(
+            query.order_by(WaterLog.timestamp, WaterLog.id).limit(limit + 1)
+        ).all()
+
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, (rows[-1].timestamp, rows[-1].id)
+
+    @staticmethod
+    def encode_cursor(key: LogKey) -> str:
+        """Encode a (timestamp, id) page key as an opaque cursor string."""
+        timestamp, log_id = key
+        raw = f"{timestamp.isoformat()}|{log_id.hex}".encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> LogKey:
+        """
+        Decode a cursor produced by encode_cursor.
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+            timestamp, log_id = raw.split("|")
+            return datetime.fromisoformat(timestamp), UUID(log_id)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise ValueError("Invalid cursor")
+
+    @staticmethod
+    def add_to_daily_total(
+        db: Session, user_id: UUID, day: date, amount: int, log_count: int = 1
+    ) -> int:
+        """
+        Fold new intake into the user's rollup row for a day.
+
+        Runs as a single upsert and does not commit, so the rollup is updated
+        in the same transaction as the logs it summarises.
+
+        Returns:
+            The day's new total, read back with RETURNING where the backend
+            supports it
+        """
+        stmt = dialect.insert(db, DailyTotal).values(
+            user_id=user_id,
+            day=day,
+            total_amount=amount,
+            log_count=log_count,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DailyTotal.user_id, DailyTotal.day],
+            set_={
+                "total_amount": DailyTotal.total_amount + stmt.excluded.total_amount,
+                "log_count": DailyTotal.log_count + stmt.excluded.log_count,
+            },
+        )
+        if db.get_bind().dialect.insert_returning:
+            return db.exec(stmt.returning(DailyTotal.total_amount)).scalar_one()
+        db.exec(stmt)
+        return WaterService.get_daily_total(db, user_id, day)
+
+    @staticmethod
+    def bump_data_version(db: Session, user_id: UUID) -> None:
+        """
+        Mark a user's water data as changed without committing.
+
+        Call in the same transaction as any write to the user's logs, rollup,
+        streak or goal, so ETags derived from the version change with it.
+        """
+        stmt = dialect.insert(db, DataVersion).values(user_id=user_id, version=1)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DataVersion.user_id],
+            set_={"version": DataVersion.version + 1},
+        )
+        db.exec(stmt)
+
+    @staticmethod
+    def get_data_version(db: Session, user_id: UUID) -> int:
+        """Get a user's data version, 0 if their data never changed."""
+        version = db.exec(
+            select(DataVersion.version).where(DataVersion.user_id == user_id)
+        ).first()
+        return version or 0
+
+    @staticmethod
+    def get_daily_totals(db: Session, user_id: UUID, date_range: DateRange) -> Dict[date, int]:
+        """Get the total intake per day for a date range, from the rollup."""
+        rows = db.exec(
+            select(DailyTotal.day, DailyTotal.total_amount)
+            .where(DailyTotal.user_id == user_id)
+            .where(DailyTotal.day >= date_range.start_date)
+            .where(DailyTotal.day <= date_range.end_date)
+        ).all()
+
+        return {day: total_amount for day, total_amount in rows}
+
+    @staticmethod
+    def get_daily_total(db: Session, user_id: UUID, day: date = None) -> int:
+        """Get the total intake for a single day, from the rollup."""
+        if day is None:
+            day = date.today()
+
+        total_amount = db.exec(
+            select(DailyTotal.total_amount)
+            .where(DailyTotal.user_id == user_id)
+            .where(DailyTotal.day == day)
+        ).first()
+
+        return total_amount or 0
+
+    @staticmethod
+    def rebuild_daily_totals(db: Session, user_id: Optional[UUID] = None) -> None:
+        """
+        Recompute rollup rows from the raw logs.
+
+        Used to backfill after bulk loads; limited to one user when
+        ``user_id`` is given. Commits the rebuilt rows.
+        """
+        WaterService.replace_daily_totals(db, user_id)
+        db.commit()
+        if user_id is None:
+            response_cache.clear()
         else:
-            raise ValueError(f"Invalid period: {period}")
+            response_cache.invalidate(user_id)
+
+    @staticmethod
+    def replace_daily_totals(db: Session, user_id: Optional[UUID] = None) -> None:
+        """Recompute rollup rows from the raw logs without committing."""
+        day = dialect.day_of(db, WaterLog.timestamp)
+        source = select(
+            WaterLog.user_id,
+            day.label("day"),
+            func.sum(WaterLog.amount),
+            func.count(),
+        ).group_by(WaterLog.user_id, day)
+        clear = delete(DailyTotal)
+
+        if user_id is not None:
+            source = source.where(WaterLog.user_id == user_id)
+            clear = clear.where(DailyTotal.user_id == user_id)
+
+        db.exec(clear)
+        db.exec(
+            DailyTotal.__table__.insert().from_select(
+                ["user_id", "day", "total_amount", "log_count"], source
+            )
+        )
+
+    @staticmethod
+    def get_stats(db: Session, user_id: UUID, period: str) -> WaterStats:
+        """Get daily water stats for the current week or month."""
+        start_date, end_date = period_range(period)
+        return StatsService.aggregate(
+            db, user_id, "day", start_date, end_date, period=period
+        )
     
     @staticmethod
     def get_goal(db: Session, user_id: UUID) -> Goal:
@@ -158,8 +436,14 @@ class WaterService:
             )
         
         db.add(goal)
+        WaterService.bump_data_version(db, user_id)
         db.commit()
+        response_cache.invalidate(user_id)
         db.refresh(goal)
+        broker.publish(WaterService.live_channel(user_id), {
+            "type": "goal",
+            "goal_amount": goal.goal_amount,
+        })
         
         return goal
     
@@ -172,40 +456,128 @@ class WaterService:
     @staticmethod
     def update_streak(db: Session, user_id: UUID) -> Streak:
         """Update a user's streak."""
-        streak = WaterService.get_streak(db, user_id)
-        today = date.today()
-        
-        if not streak:
-            # Create new streak
-            streak = Streak(
-                user_id=user_id,
-                current_streak=1,
-                longest_streak=1,
-                last_logged_date=today,
-            )
-        else:
-            # Update existing streak
-            if streak.last_logged_date == today:
-                # Already logged today, no change to streak
-                pass
-            elif streak.last_logged_date == today - timedelta(days=1):
-                # Logged yesterday, increment streak
-                streak.current_streak += 1
-                if streak.current_streak > streak.longest_streak:
-                    streak.longest_streak = streak.current_streak
-                streak.last_logged_date = today
-            else:
-                # Missed a day, reset streak
-                streak.current_streak = 1
-                streak.last_logged_date = today
-        
-        streak.updated_at = datetime.utcnow()
-        db.add(streak)
+        streak = WaterService.upsert_streak(db, user_id)
+        WaterService.bump_data_version(db, user_id)
+        entry = LeaderboardService.record_log(db, user_id, streak, {})
         db.commit()
-        db.refresh(streak)
+        response_cache.invalidate(user_id)
+        LeaderboardService.apply(user_id, entry)
+        STREAK_UPDATES.inc()
         
         return streak
     
+    @staticmethod
+    def upsert_streak(db: Session, user_id: UUID, today: date = None) -> Streak:
+        """
+        Apply a day's activity to a user's streak without committing.
+
+        Runs as a single INSERT ... ON CONFLICT DO UPDATE that computes the new
+        streak in SQL:
+        - Already logged today: no change
+        - Logged yesterday: increment the streak
+        - Otherwise: restart the streak at 1
+        The longest streak is raised whenever the current one passes it.
+
+        Returns:
+            Detached Streak holding the values now stored, read back with
+            RETURNING where the backend supports it
+        """
+        if today is None:
+            today = date.today()
+        now = datetime.utcnow()
+
+        stmt = dialect.insert(db, Streak).values(
+            id=uuid4(),
+            user_id=user_id,
+            current_streak=1,
+            longest_streak=1,
+            last_logged_date=today,
+            updated_at=now,
+        )
+        # A fresh streak row starts at 0 with today's date, which must still
+        # count as the first day
+        current_streak = case(
+            (
+                (Streak.last_logged_date == today) & (Streak.current_streak > 0),
+                Streak.current_streak,
+            ),
+            (
+                Streak.last_logged_date == today - timedelta(days=1),
+                Streak.current_streak + 1,
+            ),
+            else_=1,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Streak.user_id],
+            set_={
+                "current_streak": current_streak,
+                "longest_streak": case(
+                    (current_streak > Streak.longest_streak, current_streak),
+                    else_=Streak.longest_streak,
+                ),
+                "last_logged_date": today,
+                "updated_at": now,
+            },
+        )
+
+        columns = Streak.__table__.columns
+        if db.get_bind().dialect.insert_returning:
+            row = db.exec(stmt.returning(*columns)).one()
+        else:
+            db.exec(stmt)
+            row = db.exec(
+                select(*columns).where(Streak.user_id == user_id)
+            ).one()
+
+        return Streak(**row._mapping)
+    
+    @staticmethod
+    def rebuild_streak(db: Session, user_id: UUID) -> Optional[Streak]:
+        """
+        Recompute a user's streak from their daily rollup without committing.
+
+        Used after bulk loads, where logs arrive out of order and replaying
+        them through upsert_streak would be both slow and wrong. The current
+        streak is the run of consecutive days ending at the latest logged
+        day, matching what upsert_streak would have stored.
+
+        Returns:
+            Detached Streak holding the values now stored, or None if the
+            user has no logs
+        """
+        days = db.exec(
+            select(DailyTotal.day)
+            .where(DailyTotal.user_id == user_id)
+            .order_by(DailyTotal.day)
+        ).all()
+        if not days:
+            return None
+
+        current = longest = 0
+        previous = None
+        for day in days:
+            if previous is not None and day - previous == timedelta(days=1):
+                current += 1
+            else:
+                current = 1
+            longest = max(longest, current)
+            previous = day
+
+        now = datetime.utcnow()
+        values = {
+            "current_streak": current,
+            "longest_streak": longest,
+            "last_logged_date": previous,
+            "updated_at": now,
+        }
+        stmt = dialect.insert(db, Streak).values(id=uuid4(), user_id=user_id, **values)
+        db.exec(stmt.on_conflict_do_update(index_elements=[Streak.user_id], set_=values))
+
+        row = db.exec(
+            select(*Streak.__table__.columns).where(Streak.user_id == user_id)
+        ).one()
+        return Streak(**row._mapping)
+
     @staticmethod
     def check_goal_achieved(db: Session, user_id: UUID, day: date = None) -> Tuple[bool, int, int]:
         """Check if a user has achieved their water goal for a day."""
@@ -217,9 +589,62 @@ class WaterService:
         if not goal:
             return False, 0, 8  # Default goal is 8
         
-        # Get logs for day
-        logs = WaterService.get_logs_for_day(db, user_id, day)
-        total_amount = sum(log.amount for log in logs)
+        # Get rolled-up total for day
+        total_amount = WaterService.get_daily_total(db, user_id, day)
         
         # Check if goal achieved
         return total_amount >= goal.goal_amount, total_amount, goal.goal_amount
+
+    @staticmethod
+    def live_channel(user_id: UUID) -> str:
+        """Pub/sub channel carrying a user's live updates."""
+        return f"water:{user_id}"
+
+    @staticmethod
+    def publish_log(user_id: UUID, day: date, total_amount: int, streak: Streak) -> None:
+        """Publish a day's new total and the streak after logs were committed."""
+        broker.publish(WaterService.live_channel(user_id), {
+            "type": "log",
+            "date": day.isoformat(),
+            "total_amount": total_amount,
+            "current_streak": streak.current_streak,
+            "longest_streak": streak.longest_streak,
+        })
+
+    @staticmethod
+    def get_progress(db: Session, user_id: UUID) -> WaterProgress:
+        """Get today's total against the goal, with the streak."""
+        today = date.today()
+        achieved, total_amount, goal_amount = WaterService.check_goal_achieved(db, user_id, today)
+        streak = WaterService.get_streak(db, user_id)
+        return WaterProgress(
+            date=today,
+            total_amount=total_amount,
+            goal_amount=goal_amount,
+            goal_achieved=achieved,
+            current_streak=streak.current_streak if streak else 0,
+            longest_streak=streak.longest_streak if streak else 0,
+        )
+
+    @staticmethod
+    def apply_live_update(progress: WaterProgress, message: Dict) -> WaterProgress:
+        """
+        Fold a published update into a progress snapshot.
+
+        Only totals for today change it, so backdated or future-dated logs
+        leave the total alone; the first total after midnight starts the new
+        day.
+        """
+        values = progress.model_dump()
+        if message["type"] == "log":
+            day = date.fromisoformat(message["date"])
+            if progress.date <= day == date.today():
+                values.update(date=day, total_amount=message["total_amount"])
+            values.update(
+                current_streak=message["current_streak"],
+                longest_streak=message["longest_streak"],
+            )
+        elif message["type"] == "goal":
+            values["goal_amount"] = message["goal_amount"]
+        values["goal_achieved"] = values["total_amount"] >= values["goal_amount"]
+        return WaterProgress(**values)
@@ -0,0 +1,131 @@
+"""
+Import-time profile of the application.
+
+Runs a fresh interpreter with ``-X importtime`` and summarises where the time
+to import a module (``app.main`` by default) goes, by module and by top-level
+package::
+
+    python -m app.startup_profile
+    python -m app.startup_profile --module app.api.water --top 30
+"""
+import argparse
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+PROJECT_DIR = Path(__file__).resolve().parents[1]
+
+
+@dataclass(frozen=True)
+class ImportRecord:
+    """One line of ``-X importtime`` output; times are in microseconds."""
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> List[ImportRecord]:
+    """
+    Parse ``-X importtime`` output into records.
+
+    Lines look like ``import time:   334 |   398769 |   fastapi``, where the
+    indentation of the module name gives its nesting depth. The header line
+    and any unrelated stderr output are skipped.
+    """
+    records = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3:
+            continue
+        self_us, cumulative_us, name = fields
+        try:
+            self_value, cumulative_value = int(self_us), int(cumulative_us)
+        except ValueError:
+            continue  # Header line
+        stripped = name.lstrip(" ")
+        records.append(ImportRecord(
+            module=stripped.rstrip(),
+            self_us=self_value,
+            cumulative_us=cumulative_value,
+            depth=(len(name) - len(stripped) - 1) // 2,
+        ))
+    return records
+
+
+def profile_imports(module: str = "app.main") -> List[ImportRecord]:
+    """Import ``module`` in a fresh interpreter and return its import profile."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def import_time_ms(records: List[ImportRecord], module: str) -> Optional[float]:
+    """Cumulative import time of ``module`` in milliseconds, if it was imported."""
+    for record in records:
+        if record.module == module:
+            return record.cumulative_us / 1000
+    return None
+
+
+def package_totals(records: List[ImportRecord]) -> Dict[str, int]:
+    """Self time per top-level package in microseconds, largest first."""
+    totals: Dict[str, int] = {}
+    for record in records:
+        package = record.module.split(".")[0]
+        totals[package] = totals.get(package, 0) + record.self_us
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def format_report(records: List[ImportRecord], module: str, top: int = 20) -> str:
+    """Render the slowest modules and packages as a plain-text report."""
+    total = import_time_ms(records, module)
+    lines = [
+        f"import {module}: {total:.1f} ms, {len(records)} modules"
+        if total is not None else f"import {module}: not found in profile",
+        "",
+        f"Slowest modules (cumulative, top {top}):",
+    ]
+    slowest = sorted(records, key=lambda record: record.cumulative_us, reverse=True)
+    for record in slowest[:top]:
+        lines.append(
+            f"  {record.cumulative_us / 1000:9.1f} ms  {record.self_us / 1000:8.1f} ms self"
+            f"  {record.module}"
+        )
+
+    lines += ["", f"Packages (self time, top {top}):"]
+    for package, self_us in list(package_totals(records).items())[:top]:
+        lines.append(f"  {self_us / 1000:9.1f} ms  {package}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Print an import-time report."""
+    parser = argparse.ArgumentParser(
+        prog="python -m app.startup_profile",
+        description="Show where the time to import the application goes.",
+    )
+    parser.add_argument(
+        "--module", default="app.main", help="Module to import (default: app.main)",
+    )
+    parser.add_argument(
+        "--top", type=int, default=20, help="Rows per section (default: 20)",
+    )
+    args = parser.parse_args(argv)
+
+    records = profile_imports(args.module)
+    print(format_report(records, args.module, args.top))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,292 @@
+"""
+HTTP load test against a real server.
+
+Seeds a scratch database, starts the app under uvicorn in a subprocess and
+drives it with concurrent virtual users. Each user logs in, then loops over
+a weighted mix of requests with a short think time in between. Concurrency is
+stepped through several levels; throughput and latency percentiles are
+reported per route and level, so the level where throughput stops growing
+shows where one worker saturates::
+
+    python -m benchmarks.loadtest --concurrency 1,10,50 --duration 20
+    python -m benchmarks.loadtest --url http://localhost:8000 --concurrency 20
+
+With ``--url`` an already running server is used and nothing is seeded; its
+users must have the seed password. Needs httpx.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.db.session import create_db_engine
+from benchmarks.seed import SEED_PASSWORD, SeedConfig, seed, user_email
+from benchmarks.services import summarize
+
+PROJECT_DIR = Path(__file__).resolve().parents[1]
+
+API = settings.API_V1_STR
+
+# Action -> (route label, method, path, request kwargs)
+ACTIONS: Dict[str, Tuple[str, str, str, Dict[str, Any]]] = {
+    "log": ("POST /water/log", "POST", f"{API}/water/log", {"json": {"amount": 1}}),
+    "today": ("GET /water/today", "GET", f"{API}/water/today", {}),
+    "stats": ("GET /water/stats", "GET", f"{API}/water/stats", {"params": {"period": "weekly"}}),
+}
+LOGIN_ROUTE = "POST /auth/login"
+
+DEFAULT_MIX = "log=6,today=3,stats=1"
+
+
+@dataclass
+class Recorder:
+    """Latencies and failures of the requests made during one level."""
+    timings: Dict[str, List[float]] = field(default_factory=dict)
+    errors: Counter = field(default_factory=Counter)
+
+    def record(self, route: str, elapsed: float, ok: bool) -> None:
+        self.timings.setdefault(route, []).append(elapsed)
+        if not ok:
+            self.errors[route] += 1
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    """Parse ``action=weight`` pairs, e.g. ``log=6,today=3,stats=1``."""
+    mix = {}
+    for pair in value.split(","):
+        action, _, weight = pair.partition("=")
+        if action not in ACTIONS or not weight.isdigit():
+            raise argparse.ArgumentTypeError(
+                f"Invalid mix entry {pair!r}, expected <{'|'.join(ACTIONS)}>=<weight>"
+            )
+        mix[action] = int(weight)
+    return mix
+
+
+async def virtual_user(
+    client: Any,
+    email: str,
+    deadline: float,
+    mix: Dict[str, int],
+    think_time: float,
+    recorder: Recorder,
+    rng: random.Random,
+) -> None:
+    """Log in, then send requests from the mix until the deadline."""
+    start = time.perf_counter()
+    response = await client.post(
+        f"{API}/auth/login", data={"username": email, "password": SEED_PASSWORD},
+    )
+    recorder.record(LOGIN_ROUTE, time.perf_counter() - start, response.status_code == 200)
+    if response.status_code != 200:
+        return
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    actions, weights = list(mix), list(mix.values())
+    while time.perf_counter() < deadline:
+        route, method, path, kwargs = ACTIONS[rng.choices(actions, weights)[0]]
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, path, headers=headers, **kwargs)
+            ok = response.status_code < 400
+        except Exception:
+            ok = False
+        recorder.record(route, time.perf_counter() - start, ok)
+        if think_time:
+            await asyncio.sleep(rng.uniform(0, 2 * think_time))
+
+
+async def run_level(
+    concurrency: int,
+    duration: float,
+    emails: List[str],
+    mix: Dict[str, int],
+    think_time: float = 0.05,
+    base_url: Optional[str] = None,
+    transport: Any = None,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Run ``concurrency`` virtual users for ``duration`` seconds.
+
+    Users are assigned seeded accounts round-robin. ``transport`` replaces
+    the network, e.g. an httpx.ASGITransport in tests.
+    """
+    import httpx
+
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url or "http://loadtest", transport=transport, limits=limits, timeout=60,
+    ) as client:
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(*(
+            virtual_user(
+                client, emails[index % len(emails)], deadline, mix, think_time,
+                recorder, random.Random(seed + index),
+            )
+            for index in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - start
+
+    routes = {}
+    for route, timings in sorted(recorder.timings.items()):
+        summary = summarize(timings)
+        summary.pop("ops_per_sec")
+        routes[route] = {**summary, "rps": len(timings) / elapsed, "errors": recorder.errors[route]}
+    requests = sum(len(timings) for timings in recorder.timings.values())
+    return {
+        "concurrency": concurrency,
+        "seconds": elapsed,
+        "requests": requests,
+        "errors": sum(recorder.errors.values()),
+        "rps": requests / elapsed,
+        "routes": routes,
+    }
+
+
+def free_port() -> int:
+    """Ask the OS for an unused local port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(database_url: str, port: int, workers: int = 1, timeout: float = 60) -> subprocess.Popen:
+    """Start uvicorn on ``database_url`` and wait until /health answers."""
+    import httpx
+
+    env = {**os.environ, "SQLALCHEMY_DATABASE_URI": database_url}
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning", "--no-access-log",
+        ],
+        cwd=PROJECT_DIR,
+        env=env,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with status {server.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return server
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError(f"Server did not come up within {timeout:.0f} s")
+
+
+def format_report(levels: List[Dict[str, Any]]) -> str:
+    """Render per-route throughput and latency for every level."""
+    lines = [
+        f"{'users':>5} {'route':20} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'p99 ms':>8} {'max ms':>8} {'errors':>6}"
+    ]
+    for level in levels:
+        for route, summary in level["routes"].items():
+            lines.append(
+                f"{level['concurrency']:>5} {route:20} {summary['rps']:>8.1f} "
+                f"{summary['p50_ms']:>8.1f} {summary['p95_ms']:>8.1f} "
+                f"{summary['p99_ms']:>8.1f} {summary['max_ms']:>8.1f} {summary['errors']:>6}"
+            )
+        lines.append(
+            f"{level['concurrency']:>5} {'total':20} {level['rps']:>8.1f} "
+            f"{'':>8} {'':>8} {'':>8} {'':>8} {level['errors']:>6}"
+        )
+
+    best = max(levels, key=lambda level: level["rps"])
+    lines.append(f"\nPeak throughput {best['rps']:.1f} req/s at {best['concurrency']} users")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the load test from the command line."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.loadtest",
+        description="Drive the API with concurrent virtual users and report latency per route.",
+    )
+    parser.add_argument(
+        "--concurrency", type=lambda value: [int(level) for level in value.split(",")],
+        default=[1, 10, 50], help="Comma-separated virtual user counts (default: 1,10,50)",
+    )
+    parser.add_argument(
+        "--duration", type=float, default=20, help="Seconds per level (default: 20)",
+    )
+    parser.add_argument(
+        "--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+        help=f"Weighted request mix (default: {DEFAULT_MIX})",
+    )
+    parser.add_argument(
+        "--think-time", type=float, default=0.05,
+        help="Mean pause between a user's requests in seconds (default: 0.05)",
+    )
+    parser.add_argument("--users", type=int, default=1000, help="Users to seed (default: 1000)")
+    parser.add_argument("--days", type=int, default=90, help="Days of history to seed (default: 90)")
+    parser.add_argument(
+        "--workers", type=int, default=1, help="uvicorn worker processes (default: 1)",
+    )
+    parser.add_argument(
+        "--database-url",
+        help="Database to seed and serve, dropping its tables first "
+             "(default: a scratch SQLite file)",
+    )
+    parser.add_argument(
+        "--url", help="Test an already running server instead of starting one",
+    )
+    parser.add_argument("-o", "--output", help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    emails = [user_email(index) for index in range(args.users)]
+    levels = []
+    with tempfile.TemporaryDirectory(prefix="water-load-") as scratch:
+        server = None
+        base_url = args.url
+        if base_url is None:
+            database_url = args.database_url or f"sqlite:///{Path(scratch) / 'loadtest.db'}"
+            engine = create_db_engine(database_url)
+            try:
+                seeded = seed(engine, SeedConfig(args.users, args.days), reset=True)
+            finally:
+                engine.dispose()
+            print(f"Seeded {seeded.users} users and {seeded.logs} logs", file=sys.stderr)
+
+            port = free_port()
+            server = start_server(database_url, port, args.workers)
+            base_url = f"http://127.0.0.1:{port}"
+
+        try:
+            for concurrency in args.concurrency:
+                print(f"Running {concurrency} users for {args.duration:.0f} s", file=sys.stderr)
+                levels.append(asyncio.run(run_level(
+                    concurrency, args.duration, emails, args.mix, args.think_time, base_url,
+                )))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=30)
+
+    print(format_report(levels))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"mix": args.mix, "duration": args.duration, "levels": levels}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
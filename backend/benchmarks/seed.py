@@ -0,0 +1,235 @@
+"""
+Synthetic data generator for benchmarks.
+
+Seeds a database with a population of users, each with a goal, a streak and
+``days`` days of water logs ending today. Rows are generated lazily and
+written in bulk (COPY on PostgreSQL, executemany elsewhere), so populations
+far larger than memory can be seeded::
+
+    python -m benchmarks.seed --users 100000 --days 1825 --database-url postgresql://...
+
+Every user gets the same password, so login paths can be benchmarked too.
+"""
+import argparse
+import random
+import sys
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID, uuid4
+
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, SQLModel, insert
+
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.db.session import create_db_engine
+from app.models import Goal, Streak, User
+from app.services.importer import ImportService
+from app.services.water import WaterService
+
+SEED_PASSWORD = "benchmark"
+
+
+@dataclass(frozen=True)
+class SeedConfig:
+    """Shape of a synthetic population."""
+    users: int
+    days: int
+    # Mean taps per user and day; actual counts are uniform in [0, 2 * mean]
+    taps_per_day: int = 8
+    seed: int = 0
+
+    @property
+    def label(self) -> str:
+        return f"{self.users}x{self.days}"
+
+
+@dataclass
+class SeedResult:
+    """What was written and how long it took."""
+    users: int = 0
+    logs: int = 0
+    seconds: float = 0.0
+
+
+def user_email(index: int) -> str:
+    """Email of the ``index``-th seeded user."""
+    return f"user{index}@bench.example"
+
+
+def generate_logs(
+    rng: random.Random, user_id: UUID, config: SeedConfig, today: date
+) -> Tuple[List[Dict[str, Any]], List[date]]:
+    """
+    Generate one user's logs, oldest first.
+
+    Taps fall within the user's active hours. Returns the log rows and the
+    days with at least one tap.
+    """
+    rows = []
+    logged_days = []
+    for offset in range(config.days - 1, -1, -1):
+        day = today - timedelta(days=offset)
+        taps = rng.randint(0, 2 * config.taps_per_day)
+        if not taps:
+            continue
+        logged_days.append(day)
+        start = datetime.combine(day, datetime.min.time()) + timedelta(hours=8)
+        for second in sorted(rng.randrange(14 * 3600) for _ in range(taps)):
+            rows.append({
+                "id": uuid4(),
+                "user_id": user_id,
+                "timestamp": start + timedelta(seconds=second),
+                "amount": rng.choice((1, 1, 1, 2)),
+                "notes": None,
+            })
+    return rows, logged_days
+
+
+def streak_for(logged_days: List[date], user_id: UUID, today: date) -> Dict[str, Any]:
+    """Streak row matching a user's logged days."""
+    current = longest = 0
+    previous = None
+    for day in logged_days:
+        current = current + 1 if previous == day - timedelta(days=1) else 1
+        longest = max(longest, current)
+        previous = day
+    return {
+        "id": uuid4(),
+        "user_id": user_id,
+        "current_streak": current,
+        "longest_streak": longest,
+        "last_logged_date": previous or today,
+        "updated_at": datetime.utcnow(),
+    }
+
+
+def generate_population(
+    config: SeedConfig, hashed_password: str, today: Optional[date] = None
+) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any], List[Dict[str, Any]]]]:
+    """Yield (user, goal, streak, logs) rows for each synthetic user."""
+    today = today or date.today()
+    rng = random.Random(config.seed)
+    now = datetime.utcnow()
+    for index in range(config.users):
+        user_id = uuid4()
+        user = {
+            "id": user_id,
+            "email": user_email(index),
+            "hashed_password": hashed_password,
+            "is_active": True,
+            "reminder_frequency": 60,
+            "active_hours_start": 8,
+            "active_hours_end": 22,
+            "next_reminder_at": now + timedelta(minutes=rng.randint(1, 60)),
+            "created_at": now,
+            "updated_at": now,
+        }
+        goal = {
+            "id": uuid4(),
+            "user_id": user_id,
+            "goal_amount": rng.randint(6, 12),
+            "updated_at": now,
+        }
+        logs, logged_days = generate_logs(rng, user_id, config, today)
+        yield user, goal, streak_for(logged_days, user_id, today), logs
+
+
+def seed(
+    engine: Engine,
+    config: SeedConfig,
+    batch_size: Optional[int] = None,
+    reset: bool = False,
+) -> SeedResult:
+    """
+    Seed a database with a synthetic population.
+
+    Users are written ``batch_size`` at a time, each batch committed with its
+    goals, streaks and logs; the daily rollup is rebuilt once at the end.
+
+    Args:
+        engine: Database to seed
+        config: Population to generate
+        batch_size: Users per transaction (default: enough for about
+            IMPORT_BATCH_SIZE logs)
+        reset: Drop and recreate every table first
+    """
+    if reset:
+        SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+
+    if batch_size is None:
+        logs_per_user = max(1, config.days * config.taps_per_day)
+        batch_size = max(1, settings.IMPORT_BATCH_SIZE // logs_per_user)
+
+    result = SeedResult()
+    start = time.perf_counter()
+    population = generate_population(config, get_password_hash(SEED_PASSWORD))
+    with Session(engine) as db:
+        while batch := list(islice(population, batch_size)):
+            users, goals, streaks, logs = [], [], [], []
+            for user, goal, streak, user_logs in batch:
+                users.append(user)
+                goals.append(goal)
+                streaks.append(streak)
+                logs.extend(user_logs)
+
+            db.exec(insert(User), params=users)
+            db.exec(insert(Goal), params=goals)
+            db.exec(insert(Streak), params=streaks)
+            for offset in range(0, len(logs), settings.IMPORT_BATCH_SIZE):
+                ImportService.insert_batch(db, logs[offset:offset + settings.IMPORT_BATCH_SIZE])
+            db.commit()
+
+            result.users += len(users)
+            result.logs += len(logs)
+
+        WaterService.replace_daily_totals(db)
+        db.commit()
+
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Seed a database from the command line."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.seed",
+        description="Seed a database with synthetic users and water logs.",
+    )
+    parser.add_argument("--users", type=int, default=1000, help="Users to create (default: 1000)")
+    parser.add_argument("--days", type=int, default=365, help="Days of history per user (default: 365)")
+    parser.add_argument(
+        "--taps-per-day", type=int, default=8, help="Mean taps per user and day (default: 8)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument(
+        "--batch-size", type=int, help="Users per transaction (default: about IMPORT_BATCH_SIZE logs)",
+    )
+    parser.add_argument(
+        "--reset", action="store_true", help="Drop and recreate all tables first",
+    )
+    parser.add_argument(
+        "--database-url", default=settings.SQLALCHEMY_DATABASE_URI,
+        help="Database to seed (default: the configured database)",
+    )
+    args = parser.parse_args(argv)
+
+    config = SeedConfig(args.users, args.days, args.taps_per_day, args.seed)
+    engine = create_db_engine(args.database_url)
+    try:
+        result = seed(engine, config, batch_size=args.batch_size, reset=args.reset)
+    finally:
+        engine.dispose()
+    print(
+        f"Seeded {result.users} users and {result.logs} logs in {result.seconds:.1f} s",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+"""
+Service-level microbenchmarks.
+
+Seeds a fresh database for each population size and times the hot service
+calls against it, writing the results as JSON so runs can be compared::
+
+    python -m benchmarks.services --sizes 100x30,1000x365 -o results.json
+    python -m benchmarks.services --sizes 100x30,1000x365 --compare results.json
+
+Sizes are ``<users>x<days>``. SQLite databases are created in a scratch
+directory; with ``--database-url`` every size is seeded into that database
+instead, dropping its tables first, e.g. a throwaway PostgreSQL database.
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+
+from app.db.session import create_db_engine
+from app.models import User
+from app.schemas.water import DateRange, WaterLogCreate
+from app.services.user import UserService
+from app.services.water import WaterService
+from benchmarks.seed import SEED_PASSWORD, SeedConfig, seed
+
+# Name -> call taking (db, user) and exercising one service method
+BENCHMARKS: Dict[str, Callable[[Session, User], Any]] = {
+    "WaterService.create_log": lambda db, user: WaterService.create_log(
+        db, user.id, WaterLogCreate(amount=1)
+    ),
+    "WaterService.get_logs_for_range": lambda db, user: WaterService.get_logs_for_range(
+        db, user.id, DateRange(start_date=date.today() - timedelta(days=29), end_date=date.today())
+    ),
+    "WaterService.get_stats": lambda db, user: WaterService.get_stats(db, user.id, "monthly"),
+    "WaterService.check_goal_achieved": lambda db, user: WaterService.check_goal_achieved(
+        db, user.id
+    ),
+    "UserService.authenticate": lambda db, user: UserService.authenticate(
+        db, user.email, SEED_PASSWORD
+    ),
+}
+
+# Users sampled per size; each timed call picks one of them at random
+SAMPLE_USERS = 100
+
+
+def parse_size(value: str) -> SeedConfig:
+    """Parse a ``<users>x<days>`` size."""
+    try:
+        users, days = (int(part) for part in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid size {value!r}, expected <users>x<days>")
+    return SeedConfig(users=users, days=days)
+
+
+def summarize(timings: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds of per-call timings in seconds."""
+    ordered = sorted(timings)
+
+    def percentile(fraction: float) -> float:
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000
+
+    total = sum(ordered)
+    return {
+        "calls": len(ordered),
+        "min_ms": ordered[0] * 1000,
+        "mean_ms": total / len(ordered) * 1000,
+        "p50_ms": percentile(0.5),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "max_ms": ordered[-1] * 1000,
+        "ops_per_sec": len(ordered) / total if total else 0.0,
+    }
+
+
+def run_benchmark(
+    engine: Engine,
+    call: Callable[[Session, User], Any],
+    users: List[User],
+    iterations: int,
+    warmup: int = 3,
+    seed: int = 0,
+) -> Dict[str, float]:
+    """Time ``iterations`` calls, each for a randomly chosen user."""
+    rng = random.Random(seed)
+    timings = []
+    with Session(engine, expire_on_commit=False) as db:
+        for iteration in range(warmup + iterations):
+            user = rng.choice(users)
+            start = time.perf_counter()
+            call(db, user)
+            elapsed = time.perf_counter() - start
+            if iteration >= warmup:
+                timings.append(elapsed)
+            # Don't let the identity map answer later calls
+            db.expunge_all()
+    return summarize(timings)
+
+
+def run_size(
+    engine: Engine,
+    config: SeedConfig,
+    iterations: int,
+    names: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    """Seed a population and run the benchmarks against it."""
+    seeded = seed(engine, config, reset=True)
+    print(
+        f"[{config.label}] seeded {seeded.users} users, {seeded.logs} logs "
+        f"in {seeded.seconds:.1f} s",
+        file=sys.stderr,
+    )
+
+    with Session(engine, expire_on_commit=False) as db:
+        users = list(db.exec(select(User).limit(SAMPLE_USERS)).all())
+        db.expunge_all()
+
+    results = []
+    for name in names or list(BENCHMARKS):
+        summary = run_benchmark(engine, BENCHMARKS[name], users, iterations, seed=config.seed)
+        print(
+            f"[{config.label}] {name}: p50 {summary['p50_ms']:.3f} ms, "
+            f"p95 {summary['p95_ms']:.3f} ms",
+            file=sys.stderr,
+        )
+        results.append({
+            "benchmark": name,
+            "size": config.label,
+            "users": config.users,
+            "days": config.days,
+            "logs": seeded.logs,
+            **summary,
+        })
+    return results
+
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]]) -> str:
+    """Render the p50 change of every benchmark against a previous run."""
+    previous = {(row["benchmark"], row["size"]): row for row in baseline}
+    lines = [f"{'benchmark':40} {'size':>12} {'p50 before':>11} {'p50 after':>10} {'change':>8}"]
+    for row in results:
+        old = previous.get((row["benchmark"], row["size"]))
+        if old is None or not old["p50_ms"]:
+            continue
+        change = (row["p50_ms"] / old["p50_ms"] - 1) * 100
+        lines.append(
+            f"{row['benchmark']:40} {row['size']:>12} {old['p50_ms']:>9.3f}ms "
+            f"{row['p50_ms']:>8.3f}ms {change:>+7.1f}%"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the service benchmarks from the command line."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.services",
+        description="Time service calls against synthetic populations of several sizes.",
+    )
+    parser.add_argument(
+        "--sizes", type=lambda value: [parse_size(size) for size in value.split(",")],
+        default=[parse_size("100x30"), parse_size("1000x365")],
+        help="Comma-separated <users>x<days> populations (default: 100x30,1000x365)",
+    )
+    parser.add_argument(
+        "--iterations", type=int, default=200, help="Timed calls per benchmark (default: 200)",
+    )
+    parser.add_argument(
+        "--benchmark", action="append", choices=list(BENCHMARKS), dest="names",
+        help="Benchmark to run, repeatable (default: all)",
+    )
+    parser.add_argument(
+        "--database-url",
+        help="Database to seed for every size, dropping its tables first "
+             "(default: a scratch SQLite file per size)",
+    )
+    parser.add_argument("-o", "--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Previous results JSON to compare against")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="water-bench-") as scratch:
+        for config in args.sizes:
+            url = args.database_url or f"sqlite:///{Path(scratch) / f'bench_{config.label}.db'}"
+            engine = create_db_engine(url)
+            try:
+                results.extend(run_size(engine, config, args.iterations, args.names))
+            finally:
+                engine.dispose()
+
+    report = {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": engine.dialect.name,
+            "iterations": args.iterations,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+
+    if baseline is not None:
+        print(compare(results, baseline), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
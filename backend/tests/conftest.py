@@ -1,11 +1,32 @@
+import atexit
 import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+# Before the app is imported: point its own engine at a scratch database and
+# keep the background tasks off, so the lifespan that TestClient runs never
+# migrates or writes the development database.
+TEST_DATA_DIR = tempfile.mkdtemp(prefix="water-reminder-tests-")
+atexit.register(shutil.rmtree, TEST_DATA_DIR, ignore_errors=True)
+os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{Path(TEST_DATA_DIR) / 'app.db'}"
+os.environ.pop("ASYNC_SQLALCHEMY_DATABASE_URI", None)
+os.environ["REMINDERS_ENABLED"] = "False"
+os.environ["REFRESH_TOKEN_SWEEP_INTERVAL_SECONDS"] = "0"
+os.environ["LEADERBOARD_BACKGROUND_REFRESH"] = "False"
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlmodel import Session, SQLModel, create_engine
 from sqlmodel.pool import StaticPool
 
 from app.core.config import settings
+from app.core.principal import principal_cache
+from app.core.ranking import leaderboards
+from app.core.response_cache import response_cache
 from app.api.deps import get_db
+from app.db.instrumentation import count_queries, instrument_engine
 from app.main import app
 from app.models import User, Goal, Streak
 from app.core.security import get_password_hash
@@ -28,6 +49,7 @@ def session_fixture():
         poolclass=StaticPool,
     )
     SQLModel.metadata.create_all(engine)
+    instrument_engine(engine)
 
     with Session(engine) as session:
         # Override the get_db dependency
@@ -41,6 +63,33 @@ def session_fixture():
     # Clean up
     SQLModel.metadata.drop_all(engine)
     app.dependency_overrides.clear()
+    principal_cache.clear()
+    response_cache.clear()
+    leaderboards.clear()
+
+
+@pytest.fixture(name="assert_max_queries")
+def assert_max_queries_fixture(session):
+    """
+    Fail when a block runs more statements than allowed on the test database.
+
+    Usage::
+
+        with assert_max_queries(3):
+            client.get("/api/v1/water/today", headers=headers)
+    """
+    @contextmanager
+    def check(limit: int):
+        with count_queries(session.get_bind()) as stats:
+            yield stats
+        statements = "\n".join(
+            f"  {count}x {statement}" for statement, count in stats.statements.items()
+        )
+        assert stats.count <= limit, (
+            f"Expected at most {limit} queries, ran {stats.count}:\n{statements}"
+        )
+
+    return check
 
 
 @pytest.fixture(name="test_user")
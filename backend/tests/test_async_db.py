@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.deps import get_db
+from app.main import app
+
+
+@pytest.fixture(name="async_db")
+def async_db_fixture(tmp_path):
+    """Serve requests from an aiosqlite-backed AsyncSession."""
+    pytest.importorskip("aiosqlite")
+    path = tmp_path / "async.db"
+
+    # Create the schema with a plain engine; the async engine connects lazily
+    # inside the test client's event loop.
+    sync_engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(sync_engine)
+    sync_engine.dispose()
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+
+    async def get_test_async_session():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
+
+    app.dependency_overrides[get_db] = get_test_async_session
+    yield async_engine
+    app.dependency_overrides.clear()
+
+
+def test_async_session_end_to_end(client: TestClient, async_db):
+    """Test the auth and water endpoints on the async database path."""
+    # Register and log in
+    response = client.post(
+        "/api/v1/auth/register",
+        json={"email": "async@example.com", "password": "password123"},
+    )
+    assert response.status_code == 200
+
+    response = client.post(
+        "/api/v1/auth/login",
+        data={"username": "async@example.com", "password": "password123"},
+    )
+    assert response.status_code == 200
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    # Log water and read it back
+    response = client.post("/api/v1/water/log", json={"amount": 2}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["amount"] == 2
+
+    response = client.get("/api/v1/water/today", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["total_amount"] == 2
+
+    response = client.get("/api/v1/water/stats?period=weekly", headers=headers)
+    assert response.status_code == 200
+    assert sum(point["amount"] for point in response.json()["data"]) == 2
+
+    response = client.get("/api/v1/water/streak", headers=headers)
+    assert response.status_code == 200
+
+
+def test_async_session_offloads_cpu_work(client: TestClient, async_db, monkeypatch):
+    """Test that batch validation, CSV parsing and bucket filling run off the event loop."""
+    from app.services.importer import ImportService
+    from app.services.stats import StatsService
+    from app.services.water import WaterService
+
+    on_loop = {}
+    for cls, name in [
+        (WaterService, "prepare_logs_batch"),
+        (ImportService, "read_batches"),
+        (StatsService, "fill_buckets"),
+    ]:
+        def wrapper(*args, _name=name, _original=getattr(cls, name), **kwargs):
+            try:
+                asyncio.get_running_loop()
+                on_loop[_name] = True
+            except RuntimeError:
+                on_loop[_name] = False
+            return _original(*args, **kwargs)
+
+        monkeypatch.setattr(cls, name, staticmethod(wrapper))
+
+    client.post(
+        "/api/v1/auth/register",
+        json={"email": "offload@example.com", "password": "password123"},
+    )
+    response = client.post(
+        "/api/v1/auth/login",
+        data={"username": "offload@example.com", "password": "password123"},
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    response = client.post(
+        "/api/v1/water/log/batch",
+        json={"items": [{"amount": 1}, {"amount": -1}]},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert (response.json()["created"], response.json()["rejected"]) == (1, 1)
+
+    response = client.post(
+        "/api/v1/water/import",
+        files={"file": ("logs.csv", "timestamp,amount\n2024-01-01T08:00:00,3\n", "text/csv")},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert response.json()["imported"] == 1
+
+    response = client.get(
+        "/api/v1/water/stats",
+        params={"start_date": "2024-01-01", "end_date": "2024-01-07"},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert response.json()["data"][0]["amount"] == 3
+
+    assert on_loop == {"prepare_logs_batch": False, "read_batches": False, "fill_buckets": False}
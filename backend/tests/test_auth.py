@@ -91,3 +91,158 @@ def test_login_wrong_password(client: TestClient, test_user: User):
     assert response.status_code == 401
     data = response.json()
     assert "detail" in data
+
+
+def test_principal_cache(client: TestClient, session: Session, test_user: User):
+    """
+    Test that authenticated requests reuse cached principals.
+
+    Verifies that:
+    1. Only the first request with a token looks the user up
+    2. Updating the user invalidates the cached principal
+    """
+    from sqlalchemy import event
+
+    from app.schemas.user import UserUpdate
+    from app.services.user import UserService
+    from tests.test_water import get_auth_headers
+
+    user_lookups = []
+
+    def count_user_lookups(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().startswith("SELECT") and "FROM user" in statement:
+            user_lookups.append(statement)
+
+    headers = get_auth_headers(test_user)
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", count_user_lookups)
+    try:
+        assert client.get("/api/v1/water/goal", headers=headers).status_code == 200
+        assert client.get("/api/v1/water/goal", headers=headers).status_code == 200
+        assert len(user_lookups) == 1
+
+        # Deactivating the user must take effect immediately
+        UserService.update(session, test_user, UserUpdate(is_active=False))
+        response = client.get("/api/v1/water/goal", headers=headers)
+        assert response.status_code == 400
+    finally:
+        event.remove(engine, "before_cursor_execute", count_user_lookups)
+
+
+def test_login_rehashes_outdated_password_hash(
+    client: TestClient, session: Session, test_user: User
+):
+    """
+    Test that logging in upgrades a hash made with another bcrypt cost.
+
+    Verifies that:
+    1. Login succeeds with a hash of a different cost
+    2. The stored hash is replaced by one with the configured cost
+    3. The new hash still verifies the same password
+    """
+    from passlib.context import CryptContext
+
+    from app.core.config import settings
+    from app.core.security import verify_password
+
+    cheap_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4)
+    test_user.hashed_password = cheap_context.hash("password")
+    session.add(test_user)
+    session.commit()
+
+    response = client.post(
+        "/api/v1/auth/login",
+        data={"username": "test@example.com", "password": "password"},
+    )
+    assert response.status_code == 200
+
+    session.refresh(test_user)
+    assert test_user.hashed_password.startswith(f"$2b${settings.BCRYPT_ROUNDS:02d}$")
+    assert verify_password("password", test_user.hashed_password)
+
+
+def test_refresh_token_rotation(client: TestClient, test_user: User):
+    """
+    Test exchanging refresh tokens for new access tokens.
+
+    Verifies that:
+    1. Login returns a refresh token
+    2. A refresh token can be exchanged once for a new token pair
+    3. Replaying a rotated refresh token fails and revokes its successors
+    """
+    response = client.post(
+        "/api/v1/auth/login",
+        data={"username": "test@example.com", "password": "password"},
+    )
+    assert response.status_code == 200
+    first = response.json()["refresh_token"]
+    assert first
+
+    # Rotate
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": first})
+    assert response.status_code == 200
+    data = response.json()
+    second = data["refresh_token"]
+    assert second != first
+    assert data["token_type"] == "bearer"
+    headers = {"Authorization": f"Bearer {data['access_token']}"}
+    assert client.get("/api/v1/water/goal", headers=headers).status_code == 200
+
+    # Replaying the first token is rejected and revokes the second
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": first})
+    assert response.status_code == 401
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": second})
+    assert response.status_code == 401
+
+
+def test_purge_expired_refresh_tokens(session: Session, test_user: User):
+    """
+    Test sweeping expired refresh tokens.
+
+    Verifies that:
+    1. Only tokens past their expiry are deleted
+    """
+    from datetime import datetime, timedelta
+
+    from app.models import RefreshToken
+    from app.services.token import TokenService
+
+    TokenService.issue(session, test_user.id)
+    TokenService.issue(session, test_user.id)
+    tokens = session.exec(select(RefreshToken)).all()
+    tokens[0].expires_at = datetime.utcnow() - timedelta(seconds=1)
+    session.add(tokens[0])
+    session.commit()
+
+    assert TokenService.purge_expired(session) == 1
+    assert len(session.exec(select(RefreshToken)).all()) == 1
+
+
+def test_redeeming_claimed_refresh_token_fails(session: Session, test_user: User):
+    """
+    Test that a refresh token claimed by a concurrent redemption cannot be
+    redeemed again.
+
+    Verifies that:
+    1. A token revoked by another session after this one loaded it is not
+       rotated from the stale copy
+    2. The losing redemption revokes the family, like a replay
+    """
+    from app.models import RefreshToken
+    from app.services.token import TokenService
+
+    token = TokenService.issue(session, test_user.id)
+    # This session has the token loaded, as it would mid-redemption
+    loaded = session.exec(select(RefreshToken)).one()
+    assert loaded.revoked_at is None
+
+    # Another worker redeems it first
+    with Session(session.get_bind()) as other:
+        winner = TokenService.rotate(other, token)
+    assert winner is not None
+
+    assert TokenService.rotate(session, token) is None
+    session.expire_all()
+    tokens = session.exec(select(RefreshToken)).all()
+    assert len(tokens) == 2
+    assert all(t.revoked_at is not None for t in tokens)
@@ -0,0 +1,60 @@
+from sqlmodel import Session, func, select
+
+from app.models import DailyTotal, Streak, User, WaterLog
+from app.services.water import WaterService
+from benchmarks.seed import SeedConfig, seed
+from benchmarks.services import compare, parse_size, run_size
+
+
+def test_seed_population(session: Session):
+    """Test that seeding writes consistent users, logs, rollups and streaks."""
+    engine = session.get_bind()
+    result = seed(engine, SeedConfig(users=5, days=20, taps_per_day=2), batch_size=2)
+
+    assert result.users == 5
+    assert session.exec(select(func.count()).select_from(User)).one() == 5
+    assert session.exec(select(func.count()).select_from(WaterLog)).one() == result.logs
+    assert session.exec(select(func.sum(DailyTotal.log_count))).one() == result.logs
+
+    # Seeded streaks agree with a rebuild from the rollup
+    for streak in session.exec(select(Streak)).all():
+        seeded = (streak.current_streak, streak.longest_streak, streak.last_logged_date)
+        rebuilt = WaterService.rebuild_streak(session, streak.user_id)
+        assert (rebuilt.current_streak, rebuilt.longest_streak, rebuilt.last_logged_date) == seeded
+
+
+def test_run_size(session: Session):
+    """Test that a benchmark run reports one result per benchmark."""
+    names = ["WaterService.get_stats", "WaterService.check_goal_achieved"]
+    results = run_size(session.get_bind(), parse_size("3x7"), iterations=5, names=names)
+
+    assert [row["benchmark"] for row in results] == names
+    assert all(row["size"] == "3x7" and row["calls"] == 5 for row in results)
+    assert all(row["p50_ms"] <= row["max_ms"] for row in results)
+    assert "WaterService.get_stats" in compare(results, results)
+
+
+def test_load_test_level(session: Session):
+    """Test that a load test level logs in and reports every route it hit."""
+    import asyncio
+
+    import httpx
+
+    from app.main import app
+    from benchmarks.loadtest import LOGIN_ROUTE, parse_mix, run_level
+    from benchmarks.seed import user_email
+
+    seed(session.get_bind(), SeedConfig(users=2, days=3))
+    level = asyncio.run(run_level(
+        concurrency=1,
+        duration=3,
+        emails=[user_email(0)],
+        mix=parse_mix("log=1,today=1"),
+        think_time=0,
+        transport=httpx.ASGITransport(app=app),
+    ))
+
+    assert level["errors"] == 0
+    assert level["routes"][LOGIN_ROUTE]["calls"] == 1
+    assert {"POST /water/log", "GET /water/today"} <= set(level["routes"])
+    assert level["requests"] == sum(route["calls"] for route in level["routes"].values())
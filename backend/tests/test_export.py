@@ -0,0 +1,76 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel
+
+from app.cli.__main__ import main
+from app.db.session import create_db_engine
+from app.models import User, WaterLog
+from app.services.export import EXPORT_COLUMNS, ExportService
+from tests.test_water import get_auth_headers
+
+
+def add_logs(session: Session, user: User, count: int) -> None:
+    """Add ``count`` hourly logs for a user."""
+    for i in range(count):
+        session.add(WaterLog(user_id=user.id, amount=i + 1, timestamp=datetime(2024, 1, 1, i)))
+    session.commit()
+
+
+def test_export_ndjson(client: TestClient, session: Session, test_user: User):
+    """Test streaming a user's logs as NDJSON."""
+    other = User(email="other@example.com", hashed_password="x", is_active=True)
+    session.add(other)
+    session.commit()
+    add_logs(session, test_user, 5)
+    add_logs(session, other, 2)
+
+    response = client.get("/api/v1/water/export", headers=get_auth_headers(test_user))
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["amount"] for row in rows] == [1, 2, 3, 4, 5]
+    assert {row["user_id"] for row in rows} == {str(test_user.id)}
+
+    response = client.get(
+        "/api/v1/water/export", params={"format": "xml"}, headers=get_auth_headers(test_user),
+    )
+    assert response.status_code == 400
+
+
+def test_export_csv_in_chunks(session: Session, test_user: User):
+    """Test that CSV output is written chunk by chunk under one header."""
+    add_logs(session, test_user, 5)
+
+    chunks = list(ExportService.stream(session.get_bind(), "csv", chunk_size=2))
+    assert len(chunks) == 3
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+    assert tuple(rows[0]) == EXPORT_COLUMNS
+    assert [row[3] for row in rows[1:]] == ["1", "2", "3", "4", "5"]
+
+
+def test_export_cli(tmp_path):
+    """Test exporting one user's logs from the command line."""
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'export.db'}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        user = User(email="cli@example.com", hashed_password="x", is_active=True)
+        session.add(user)
+        session.commit()
+        add_logs(session, user, 3)
+    engine.dispose()
+
+    output = tmp_path / "logs.csv"
+    assert main([
+        "export", "--format", "csv", "--user", "cli@example.com",
+        "--database-url", f"sqlite:///{tmp_path / 'export.db'}", "-o", str(output),
+    ]) == 0
+    assert len(output.read_text().splitlines()) == 4
+
+    assert main([
+        "export", "--user", "missing@example.com",
+        "--database-url", f"sqlite:///{tmp_path / 'export.db'}",
+    ]) == 1
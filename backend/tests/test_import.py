@@ -0,0 +1,93 @@
+from datetime import date
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, func, select
+
+from app.cli.__main__ import main
+from app.db.session import create_db_engine
+from app.models import DailyTotal, Streak, User, WaterLog
+from app.services.importer import ImportService
+from tests.test_water import get_auth_headers
+
+CSV = (
+    "timestamp,amount,notes\n"
+    "2024-01-01T08:00:00,2,Morning\n"
+    "2024-01-01T12:00:00,,\n"
+    "2024-01-02T08:00:00Z,3,\n"
+    "not-a-date,1,\n"
+    "2024-01-03T08:00:00,-1,\n"
+    "2024-01-05T08:00:00,1,\n"
+    "2024-01-06T08:00:00,1,\n"
+)
+
+
+def test_import_csv(client: TestClient, session: Session, test_user: User):
+    """Test bulk-importing a CSV and rebuilding the derived aggregates."""
+    response = client.post(
+        "/api/v1/water/import",
+        files={"file": ("logs.csv", CSV, "text/csv")},
+        headers=get_auth_headers(test_user),
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["imported"] == 5
+    assert data["rejected"] == 2
+    assert data["errors"][0].startswith("Line 5:")
+
+    # Daily totals rebuilt once from the imported logs
+    session.expire_all()
+    total = session.get(DailyTotal, (test_user.id, date(2024, 1, 1)))
+    assert total.total_amount == 3
+    assert total.log_count == 2
+
+    # Jan 1-2 is the longest run, Jan 5-6 the current one
+    streak = session.exec(select(Streak).where(Streak.user_id == test_user.id)).one()
+    assert streak.longest_streak == 2
+    assert streak.current_streak == 2
+    assert streak.last_logged_date == date(2024, 1, 6)
+
+    response = client.post(
+        "/api/v1/water/import",
+        files={"file": ("logs.csv", "when,amount\n", "text/csv")},
+        headers=get_auth_headers(test_user),
+    )
+    assert response.status_code == 400
+
+    # Fields past the csv module's size limit are a client error, not a 500
+    oversized = "timestamp,amount,notes\n2024-01-07T08:00:00,1,\"" + "x" * 200_000 + "\"\n"
+    response = client.post(
+        "/api/v1/water/import",
+        files={"file": ("logs.csv", oversized, "text/csv")},
+        headers=get_auth_headers(test_user),
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Line 2: malformed CSV")
+
+
+def test_import_in_batches(session: Session, test_user: User):
+    """Test that imports are written in batches within one transaction."""
+    lines = ["timestamp,amount\n"] + [f"2024-02-01T{hour:02d}:00:00,1\n" for hour in range(24)]
+    result = ImportService.import_csv(session, test_user.id, lines, batch_size=5)
+    assert result.imported == 24
+    count = session.exec(
+        select(func.count()).select_from(WaterLog).where(WaterLog.user_id == test_user.id)
+    ).one()
+    assert count == 24
+
+
+def test_import_cli(tmp_path):
+    """Test importing a CSV from the command line."""
+    url = f"sqlite:///{tmp_path / 'import.db'}"
+    engine = create_db_engine(url)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(User(email="cli@example.com", hashed_password="x", is_active=True))
+        session.commit()
+
+    path = tmp_path / "logs.csv"
+    path.write_text(CSV)
+    assert main(["import", str(path), "--user", "cli@example.com", "--database-url", url]) == 0
+
+    with Session(engine) as session:
+        assert session.exec(select(func.count()).select_from(WaterLog)).one() == 5
+    engine.dispose()
@@ -0,0 +1,301 @@
+import random
+from datetime import date, timedelta
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.ranking import MAX_SCORE, Leaderboards, RankIndex
+from app.models import LeaderboardEntry, Streak, User
+from app.services.leaderboard import METRICS, LeaderboardService, scores
+from app.services.stats import period_range
+from tests.test_water import get_auth_headers
+
+
+def add_user(session: Session, email: str) -> User:
+    """Add another active user."""
+    user = User(email=email, hashed_password="x")
+    session.add(user)
+    session.commit()
+    session.refresh(user)
+    return user
+
+
+def test_rank_index():
+    """Test ranks, ties and top-k of the rank index against a sort."""
+    index = RankIndex()
+    for key, score in [("a", 3), ("b", 7), ("c", 3), ("d", 0), ("e", 12)]:
+        index.set(key, score)
+
+    assert index.top(3) == [("e", 12, 1), ("b", 7, 2), ("a", 3, 3)]
+    assert [index.rank(key) for key in "abcde"] == [3, 2, 3, 5, 1]
+    assert index.rank("missing") is None
+
+    # Moving a key re-ranks it; ties keep the order scores were reached in
+    index.set("a", 12)
+    assert index.top(2) == [("e", 12, 1), ("a", 12, 1)]
+    index.discard("e")
+    assert index.top(10) == [("a", 12, 1), ("b", 7, 2), ("c", 3, 3), ("d", 0, 4)]
+
+    rng = random.Random(0)
+    expected = {}
+    for _ in range(2000):
+        key = rng.randrange(100)
+        if rng.random() < 0.1:
+            index.discard(key)
+            expected.pop(key, None)
+        else:
+            expected[key] = rng.randrange(1000)
+            index.set(key, expected[key])
+    ranked = sorted(expected.values(), reverse=True)
+    assert [score for _, score, _ in index.top(20)] == ranked[:20]
+    for key, score in expected.items():
+        assert index.rank(key) == ranked.index(score) + 1
+
+
+def test_rank_index_huge_scores():
+    """Test that huge scores neither grow the index nor break its order."""
+    index = RankIndex()
+    index.set("a", 10**9)
+    index.set("b", 10**18)
+    index.set("c", 5)
+    assert len(index._tree) <= 3 * 33
+    assert index.top(3) == [("b", MAX_SCORE, 1), ("a", 10**9, 2), ("c", 5, 3)]
+
+    index.discard("a")
+    index.discard("b")
+    assert index.rank("c") == 1
+    assert len(index._tree) <= 33
+
+
+def test_scores_lapse():
+    """Test that lapsed streaks and last week's intake score 0."""
+    today = date.today()
+    week_start, _ = period_range("weekly", today)
+    entry = {
+        "current_streak": 4,
+        "longest_streak": 9,
+        "last_logged_date": today - timedelta(days=1),
+        "week_start": week_start,
+        "week_amount": 5,
+    }
+    assert scores(entry, today) == {"current_streak": 4, "longest_streak": 9, "week_amount": 5}
+
+    later = today + timedelta(days=7)
+    assert scores(entry, later) == {"current_streak": 0, "longest_streak": 9, "week_amount": 0}
+
+
+def test_background_refresh_serves_stale_boards():
+    """Test that readers keep the old board while refresh() rebuilds it."""
+    boards = Leaderboards(max_age=60, background=True)
+    today = date.today()
+
+    def fail():
+        raise AssertionError("readers must not rebuild a loaded board")
+
+    boards.refresh(["week_amount"], today, lambda metric: [("a", "A", 1), ("b", "B", 2)])
+    assert boards.standings("week_amount", today, fail, 10).total == 2
+
+    # Stale by age and then by day: still served as is
+    boards._boards["week_amount"] = boards._boards["week_amount"][:2] + (0.0,)
+    assert boards.standings("week_amount", today, fail, 10).total == 2
+    tomorrow = today + timedelta(days=1)
+    assert boards.standings("week_amount", tomorrow, fail, 10).total == 2
+
+    # Changes applied during the rebuild survive the swap
+    def load(metric):
+        boards.apply("c", {"week_amount": 9}, "C")
+        return [("a", "A", 5)]
+
+    assert boards.refresh(["week_amount"], tomorrow, load) == 1
+    assert boards.refresh(["week_amount"], tomorrow, load) == 0  # Fresh now
+    standings = boards.standings("week_amount", tomorrow, fail, 10)
+    assert [(name, score) for _, name, score, _ in standings.top] == [("C", 9), ("A", 5)]
+
+
+def test_refresh_leaderboards_builds_every_board(
+    client: TestClient, session: Session, test_user: User, assert_max_queries
+):
+    """Test that the background refresh builds every board, so readers need no query."""
+    headers = get_auth_headers(test_user)
+    client.put("/api/v1/leaderboard/me", json={"display_name": "Tester"}, headers=headers)
+
+    assert LeaderboardService.refresh_leaderboards(session) == len(METRICS)
+    assert LeaderboardService.refresh_leaderboards(session) == 0
+    with assert_max_queries(0):
+        leaderboard = LeaderboardService.get_leaderboard(session, "longest_streak", 10)
+    assert leaderboard.total == 1
+
+
+def test_global_leaderboard(
+    client: TestClient, session: Session, test_user: User, assert_max_queries
+):
+    """Test opting in, ranking by each metric and incremental updates."""
+    other = add_user(session, "other@example.com")
+    lurker = add_user(session, "lurker@example.com")
+    headers = get_auth_headers(test_user)
+    other_headers = get_auth_headers(other)
+    lurker_headers = get_auth_headers(lurker)
+
+    response = client.put("/api/v1/leaderboard/me", json={"display_name": "Tester"}, headers=headers)
+    assert response.status_code == 200
+    client.put("/api/v1/leaderboard/me", json={"display_name": "Other"}, headers=other_headers)
+
+    client.post("/api/v1/water/log", json={"amount": 2}, headers=headers)
+    client.post("/api/v1/water/log", json={"amount": 5}, headers=other_headers)
+    # Not opted in, so not ranked
+    client.post("/api/v1/water/log", json={"amount": 9}, headers=lurker_headers)
+
+    response = client.get("/api/v1/leaderboard?metric=week_amount", headers=headers)
+    assert response.status_code == 200
+    board = response.json()
+    assert board["total"] == 2
+    assert board["entries"] == [
+        {"rank": 1, "display_name": "Other", "score": 5},
+        {"rank": 2, "display_name": "Tester", "score": 2},
+    ]
+    assert board["me"] == {"rank": 2, "display_name": "Tester", "score": 2}
+
+    # Later logs move users on the loaded board without rebuilding it
+    client.post("/api/v1/water/log", json={"amount": 4}, headers=headers)
+    with assert_max_queries(0):
+        board = client.get("/api/v1/leaderboard?metric=week_amount&limit=1", headers=headers).json()
+    assert board["entries"] == [{"rank": 1, "display_name": "Tester", "score": 6}]
+    assert board["me"]["rank"] == 1
+
+    board = client.get("/api/v1/leaderboard", headers=lurker_headers).json()
+    assert board["metric"] == "current_streak"
+    assert [entry["score"] for entry in board["entries"]] == [1, 1]
+    assert board["me"] is None
+
+    # Opting out takes the user off the board
+    assert client.delete("/api/v1/leaderboard/me", headers=other_headers).status_code == 204
+    board = client.get("/api/v1/leaderboard?metric=week_amount", headers=headers).json()
+    assert board["total"] == 1
+    assert client.get("/api/v1/leaderboard/me", headers=other_headers).status_code == 404
+
+    response = client.get("/api/v1/leaderboard?metric=steps", headers=headers)
+    assert response.status_code == 400
+
+
+def test_huge_amount_rejected(client: TestClient, session: Session, test_user: User):
+    """Test that amounts too large for a log are rejected before scoring."""
+    headers = get_auth_headers(test_user)
+    client.put("/api/v1/leaderboard/me", json={"display_name": "Tester"}, headers=headers)
+    client.get("/api/v1/leaderboard?metric=week_amount", headers=headers)
+
+    response = client.post("/api/v1/water/log", json={"amount": 10**9}, headers=headers)
+    assert response.status_code == 422
+    board = client.get("/api/v1/leaderboard?metric=week_amount", headers=headers).json()
+    assert board["me"]["score"] == 0
+
+
+def test_opt_in_copies_existing_progress(client: TestClient, session: Session, test_user: User):
+    """Test that opting in picks up the streak and this week's intake so far."""
+    headers = get_auth_headers(test_user)
+    client.post("/api/v1/water/log", json={"amount": 3}, headers=headers)
+
+    entry = client.put(
+        "/api/v1/leaderboard/me", json={"display_name": "Tester"}, headers=headers
+    ).json()
+    assert entry["current_streak"] == 1
+    assert entry["week_amount"] == 3
+
+
+def test_concurrent_first_join(
+    client: TestClient, session: Session, test_user: User, monkeypatch
+):
+    """Test that a join racing another first join of the same user updates its entry."""
+    headers = get_auth_headers(test_user)
+    fill_entry = LeaderboardService.fill_entry
+
+    def fill_entry_after_other_join(db, entry):
+        fill_entry(db, entry)
+        # The other request's entry is committed after this one looked
+        db.add(LeaderboardEntry(
+            user_id=entry.user_id, display_name="First", week_start=entry.week_start
+        ))
+        db.commit()
+
+    monkeypatch.setattr(LeaderboardService, "fill_entry", staticmethod(fill_entry_after_other_join))
+    response = client.put("/api/v1/leaderboard/me", json={"display_name": "Second"}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["display_name"] == "Second"
+
+    monkeypatch.undo()
+    session.expire_all()
+    assert session.get(LeaderboardEntry, test_user.id).display_name == "Second"
+    board = client.get("/api/v1/leaderboard", headers=headers).json()
+    assert [entry["display_name"] for entry in board["entries"]] == ["Second"]
+
+
+def test_weekly_amount_restarts(client: TestClient, session: Session, test_user: User):
+    """Test that the first log of a week restarts the weekly count."""
+    headers = get_auth_headers(test_user)
+    client.put("/api/v1/leaderboard/me", json={"display_name": "Tester"}, headers=headers)
+    entry = session.get(LeaderboardEntry, test_user.id)
+    entry.week_start = period_range("weekly")[0] - timedelta(days=7)
+    entry.week_amount = 40
+    session.add(entry)
+    session.commit()
+
+    client.post("/api/v1/water/log", json={"amount": 2}, headers=headers)
+
+    session.refresh(entry)
+    assert (entry.week_start, entry.week_amount) == (period_range("weekly")[0], 2)
+
+
+def test_teams(client: TestClient, session: Session, test_user: User, monkeypatch):
+    """Test creating, joining, ranking and leaving teams."""
+    other = add_user(session, "other@example.com")
+    outsider = add_user(session, "outsider@example.com")
+    headers = get_auth_headers(test_user)
+    other_headers = get_auth_headers(other)
+    outsider_headers = get_auth_headers(outsider)
+
+    # Teams need a leaderboard entry
+    response = client.post("/api/v1/teams", json={"name": "Hydrators"}, headers=headers)
+    assert response.status_code == 400
+
+    client.put("/api/v1/leaderboard/me", json={"display_name": "Tester"}, headers=headers)
+    client.put("/api/v1/leaderboard/me", json={"display_name": "Other"}, headers=other_headers)
+    client.put("/api/v1/leaderboard/me", json={"display_name": "Outsider"}, headers=outsider_headers)
+
+    team = client.post("/api/v1/teams", json={"name": "Hydrators"}, headers=headers).json()
+    response = client.post(f"/api/v1/teams/{team['id']}/members", headers=other_headers)
+    assert response.status_code == 200
+    assert [t["name"] for t in client.get("/api/v1/teams", headers=other_headers).json()] == ["Hydrators"]
+
+    # Only members are ranked, and only members see the board
+    streak = session.exec(select(Streak).where(Streak.user_id == test_user.id)).one()
+    streak.current_streak = 4
+    streak.longest_streak = 4
+    streak.last_logged_date = date.today() - timedelta(days=1)
+    session.add(streak)
+    session.commit()
+    client.post("/api/v1/water/log", json={"amount": 1}, headers=headers)
+    client.post("/api/v1/water/log", json={"amount": 1}, headers=outsider_headers)
+
+    board = client.get(f"/api/v1/teams/{team['id']}/leaderboard", headers=other_headers).json()
+    assert board["entries"] == [
+        {"rank": 1, "display_name": "Tester", "score": 5},
+        {"rank": 2, "display_name": "Other", "score": 0},
+    ]
+    assert board["me"] == {"rank": 2, "display_name": "Other", "score": 0}
+    response = client.get(f"/api/v1/teams/{team['id']}/leaderboard", headers=outsider_headers)
+    assert response.status_code == 404
+
+    monkeypatch.setattr(settings, "TEAM_MAX_MEMBERS", 2)
+    response = client.post(f"/api/v1/teams/{team['id']}/members", headers=outsider_headers)
+    assert response.status_code == 400
+
+    response = client.delete(f"/api/v1/teams/{team['id']}/members/me", headers=other_headers)
+    assert response.status_code == 204
+    board = client.get(f"/api/v1/teams/{team['id']}/leaderboard", headers=headers).json()
+    assert board["total"] == 1
+    response = client.post(f"/api/v1/teams/{team['id']}/members", headers=outsider_headers)
+    assert response.status_code == 200
+
+    unknown = "00000000-0000-0000-0000-000000000000"
+    response = client.post(f"/api/v1/teams/{unknown}/members", headers=other_headers)
+    assert response.status_code == 404
@@ -0,0 +1,171 @@
+import asyncio
+import json
+import threading
+from datetime import date, timedelta
+
+from sqlmodel import Session
+
+from app.core.pubsub import Broker, LocalBackend, broker
+from app.main import app
+from app.models import User
+from app.schemas.water import WaterLogCreate, WaterProgress
+from app.services.water import WaterService
+from tests.test_water import get_auth_headers
+
+
+async def read_events(headers: dict, on_connect, until) -> list:
+    """
+    Open GET /water/live, run ``on_connect`` in a thread once the first event
+    arrived and return the events up to the first one matching ``until``.
+    """
+    chunks: asyncio.Queue = asyncio.Queue()
+    disconnect = asyncio.Event()
+
+    async def receive():
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            assert message["status"] == 200
+        elif message["type"] == "http.response.body" and message.get("body"):
+            await chunks.put(message["body"].decode())
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "server": ("testserver", 80),
+        "client": ("testclient", 50000),
+        "path": "/api/v1/water/live",
+        "raw_path": b"/api/v1/water/live",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [
+            (name.lower().encode(), value.encode()) for name, value in headers.items()
+        ],
+    }
+    request = asyncio.create_task(app(scope, receive, send))
+
+    events = []
+    while not events or not until(events[-1]):
+        chunk = await asyncio.wait_for(chunks.get(), 5)
+        if chunk.startswith("event: progress"):
+            events.append(json.loads(chunk.split("data: ", 1)[1]))
+            if len(events) == 1:
+                await asyncio.get_running_loop().run_in_executor(None, on_connect)
+
+    disconnect.set()
+    await asyncio.wait_for(request, 5)
+    return events
+
+
+def test_broker_fans_out_latest_message_per_type():
+    """Test that subscribers get published messages, coalesced by type."""
+    async def run():
+        hub = Broker(LocalBackend())
+        first = hub.subscribe("water:a")
+        second = hub.subscribe("water:a")
+        other = hub.subscribe("water:b")
+
+        # Publish from another thread, as sync services do
+        def publish():
+            hub.publish("water:a", {"type": "log", "total_amount": 1})
+            hub.publish("water:a", {"type": "log", "total_amount": 2})
+            hub.publish("water:a", {"type": "goal", "goal_amount": 9})
+
+        thread = threading.Thread(target=publish)
+        thread.start()
+        thread.join()
+
+        expected = [{"type": "log", "total_amount": 2}, {"type": "goal", "goal_amount": 9}]
+        assert await asyncio.wait_for(first.get(), 1) == expected
+        assert await asyncio.wait_for(second.get(), 1) == expected
+        assert not other._ready.is_set()
+
+        for subscription in (first, second, other):
+            subscription.close()
+        assert hub.subscriber_count() == 0
+
+    asyncio.run(run())
+
+
+def test_publish_without_subscribers_is_skipped():
+    """Test that a local broker does not send messages nobody listens to."""
+    class CountingBackend(LocalBackend):
+        sent = 0
+
+        def publish(self, channel, message):
+            self.sent += 1
+            super().publish(channel, message)
+
+    backend = CountingBackend()
+    hub = Broker(backend)
+    hub.publish("water:nobody", {"type": "log"})
+    assert backend.sent == 0
+
+    async def run():
+        subscription = hub.subscribe("water:somebody")
+        hub.publish("water:somebody", {"type": "log"})
+        assert await asyncio.wait_for(subscription.get(), 1) == [{"type": "log"}]
+        subscription.close()
+
+    asyncio.run(run())
+    assert backend.sent == 1
+
+
+def test_apply_live_update():
+    """Test that published updates are folded into a progress snapshot."""
+    today = date.today()
+    progress = WaterProgress(
+        date=today, total_amount=7, goal_amount=8, goal_achieved=False,
+        current_streak=2, longest_streak=5,
+    )
+
+    updated = WaterService.apply_live_update(progress, {
+        "type": "log", "date": today.isoformat(), "total_amount": 8,
+        "current_streak": 3, "longest_streak": 5,
+    })
+    assert (updated.total_amount, updated.goal_achieved, updated.current_streak) == (8, True, 3)
+
+    # A backdated log does not change today's total
+    backdated = WaterService.apply_live_update(updated, {
+        "type": "log", "date": (today - timedelta(days=3)).isoformat(), "total_amount": 1,
+        "current_streak": 3, "longest_streak": 5,
+    })
+    assert backdated.total_amount == 8
+
+    raised = WaterService.apply_live_update(updated, {"type": "goal", "goal_amount": 10})
+    assert (raised.goal_amount, raised.goal_achieved) == (10, False)
+
+
+def test_live_stream_pushes_progress(session: Session, test_user: User):
+    """Test that the live stream pushes new totals, streaks and goals."""
+    user_id = test_user.id
+    headers = get_auth_headers(test_user)
+
+    def log_and_set_goal():
+        WaterService.create_log(session, user_id, WaterLogCreate(amount=3))
+        WaterService.update_goal(session, user_id, 12)
+
+    events = asyncio.run(read_events(
+        headers, log_and_set_goal, until=lambda event: event["goal_amount"] == 12
+    ))
+
+    assert events[0] == {
+        "date": date.today().isoformat(),
+        "total_amount": 0,
+        "goal_amount": 8,
+        "goal_achieved": False,
+        "current_streak": 0,
+        "longest_streak": 0,
+    }
+    # The two updates may arrive as one event or two; the last one has both
+    assert events[-1]["total_amount"] == 3
+    assert events[-1]["current_streak"] == 1
+    assert events[-1]["goal_amount"] == 12
+
+    # Disconnecting ends the subscription
+    assert broker.subscriber_count() == 0
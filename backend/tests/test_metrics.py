@@ -0,0 +1,88 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.core.metrics import Registry, registry
+from app.models import User
+from tests.test_live import read_events
+from tests.test_water import get_auth_headers
+
+
+def sample(text: str, series: str) -> float:
+    """Value of one series in a metrics scrape, 0 if absent."""
+    for line in text.splitlines():
+        if line.startswith(series + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_metrics_endpoint(client: TestClient, test_user: User):
+    """Test that requests, taps and pool usage show up in /metrics."""
+    headers = get_auth_headers(test_user)
+    before = client.get("/metrics").text
+
+    client.post("/api/v1/water/log", json={"amount": 1}, headers=headers)
+    client.post("/api/v1/water/log", json={"amount": 2}, headers=headers)
+    client.get("/api/v1/water/no-such-route", headers=headers)
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    after = response.text
+
+    route = 'method="POST",route="/api/v1/water/log"'
+    requests = f'http_requests_total{{{route},status="200"}}'
+    assert sample(after, requests) - sample(before, requests) == 2
+    assert sample(after, "water_taps_total") - sample(before, "water_taps_total") == 2
+    assert sample(after, "streak_updates_total") - sample(before, "streak_updates_total") == 2
+    assert sample(after, f'http_request_duration_seconds_count{{{route}}}') >= 2
+    assert f'http_request_duration_seconds_bucket{{{route},le="+Inf"}}' in after
+    # Unknown paths share one label value
+    assert 'route="unmatched",status="404"' in after
+    assert "# TYPE http_requests_in_progress gauge" in after
+    assert "db_pool_checkedout " in after
+
+
+def test_metrics_labels_for_unusual_requests(client: TestClient, test_user: User):
+    """Test that unknown methods share a label and event streams skip the latency histogram."""
+    headers = get_auth_headers(test_user)
+    client.request("BREW", "/api/v1/water/log", headers=headers)
+    assert 'http_requests_total{method="other",route="/api/v1/water/log",status="405"}' in (
+        registry.render()
+    )
+
+    live = 'route="/api/v1/water/live"'
+    in_progress = 'http_requests_in_progress{method="GET"}'
+    before = registry.render()
+    during = []
+    asyncio.run(read_events(
+        headers, lambda: during.append(registry.render()), until=lambda event: True
+    ))
+    after = registry.render()
+
+    assert sample(during[0], f"http_streams_open{{{live}}}") == 1
+    assert sample(during[0], in_progress) == sample(before, in_progress)
+    assert sample(after, f"http_streams_open{{{live}}}") == 0
+    assert sample(after, in_progress) == sample(before, in_progress)
+    assert sample(after, f'http_requests_total{{method="GET",{live},status="200"}}') >= 1
+    assert f"http_request_duration_seconds_count{{method=\"GET\",{live}}}" not in after
+
+
+def test_histogram_rendering():
+    """Test the text format of a labelled histogram."""
+    metrics = Registry()
+    latency = metrics.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1))
+    latency.labels("/a").observe(0.05)
+    latency.labels("/a").observe(0.5)
+    latency.labels("/a").observe(5)
+
+    assert metrics.render().splitlines() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/a",le="0.1"} 1',
+        'latency_seconds_bucket{route="/a",le="1"} 2',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 3',
+        'latency_seconds_sum{route="/a"} 5.55',
+        'latency_seconds_count{route="/a"} 3',
+    ]
+    assert isinstance(registry.render(), str)
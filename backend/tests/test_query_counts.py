@@ -0,0 +1,107 @@
+import logging
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.db.instrumentation import QueryStatsMiddleware
+from app.models import User, WaterLog
+from app.schemas.water import WaterLogCreate
+from app.services.water import WaterService
+from tests.test_water import get_auth_headers
+
+WEEK_AGO = (date.today() - timedelta(days=6)).isoformat()
+TODAY = date.today().isoformat()
+
+# Most statements each endpoint may run on a cold request, including the
+# principal lookup in get_current_user. Raise a budget only together with
+# the change that needs the extra query.
+QUERY_BUDGETS = [
+    ("post", "/api/v1/water/log", {"json": {"amount": 1}}, 7),
+    ("post", "/api/v1/water/goal", {"json": {"goal_amount": 10}}, 5),
+    ("get", "/api/v1/water/goal", {}, 2),
+    ("get", "/api/v1/water/streak", {}, 2),
+    ("get", "/api/v1/water/today", {}, 3),
+    ("get", "/api/v1/water/history", {"params": {"start_date": WEEK_AGO, "end_date": TODAY}}, 4),
+    ("get", "/api/v1/water/history/logs", {}, 2),
+    ("get", "/api/v1/water/stats", {"params": {"period": "weekly"}}, 3),
+]
+
+
+@pytest.mark.parametrize(
+    "method,path,kwargs,budget",
+    QUERY_BUDGETS,
+    ids=[f"{method} {path}" for method, path, _, _ in QUERY_BUDGETS],
+)
+def test_endpoint_query_budget(
+    client: TestClient, test_user: User, assert_max_queries, method, path, kwargs, budget
+):
+    """Test that endpoints stay within their query budget."""
+    headers = get_auth_headers(test_user)
+    with assert_max_queries(budget):
+        response = client.request(method, path, headers=headers, **kwargs)
+    assert response.status_code == 200
+
+
+def test_server_timing_header(client: TestClient, test_user: User):
+    """Test that responses report the request's query count and DB time."""
+    response = client.get("/api/v1/water/today", headers=get_auth_headers(test_user))
+
+    assert response.status_code == 200
+    timing = response.headers["server-timing"]
+    assert timing.startswith("db;dur=")
+    assert timing.endswith(' queries"')
+    assert int(timing.split('desc="')[1].split()[0]) >= 1
+
+
+def sql_warnings(caplog) -> list:
+    """Messages logged by the SQL instrumentation."""
+    return [record.getMessage() for record in caplog.records if record.name == "app.sql"]
+
+
+def test_slow_query_logging(client: TestClient, test_user: User, caplog, monkeypatch):
+    """Test that slow statements are logged."""
+    monkeypatch.setattr(settings, "SLOW_QUERY_MS", 0)
+
+    with caplog.at_level(logging.WARNING, logger="app.sql"):
+        response = client.get("/api/v1/water/goal", headers=get_auth_headers(test_user))
+
+    assert response.status_code == 200
+    assert any(message.startswith("Slow query") for message in sql_warnings(caplog))
+
+
+def test_n_plus_one_logging(client: TestClient, session: Session, test_user: User, caplog):
+    """Test that a per-row query loop is logged and a normal request is not."""
+    for hour in range(settings.N_PLUS_ONE_THRESHOLD):
+        WaterService.create_log(
+            session, test_user.id, WaterLogCreate(amount=1, timestamp=datetime(2024, 1, 1, hour))
+        )
+
+    # A deliberate N+1: list the ids, then load each log on its own
+    per_row = FastAPI()
+    per_row.add_middleware(QueryStatsMiddleware)
+
+    @per_row.get("/logs")
+    def list_logs():
+        ids = session.exec(select(WaterLog.id).where(WaterLog.user_id == test_user.id)).all()
+        return [
+            session.exec(select(WaterLog).where(WaterLog.id == log_id)).one().amount
+            for log_id in ids
+        ]
+
+    with caplog.at_level(logging.WARNING, logger="app.sql"):
+        response = client.get("/api/v1/water/today", headers=get_auth_headers(test_user))
+        assert response.status_code == 200
+        assert sql_warnings(caplog) == []
+
+        response = TestClient(per_row).get("/logs")
+        assert response.json() == [1] * settings.N_PLUS_ONE_THRESHOLD
+
+    messages = sql_warnings(caplog)
+    assert len(messages) == 1
+    assert messages[0].startswith(
+        f"Possible N+1 on GET /logs: statement ran {settings.N_PLUS_ONE_THRESHOLD} times"
+    )
@@ -0,0 +1,118 @@
+import os
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.models import User
+from app.schemas.water import DateRange
+from app.services.water import WaterService
+
+# Index each hot table must be read through, per dialect. Aggregate reads are
+# served from the dailytotal rollup, whose primary key is (user_id, day), and
+# conditional requests only look up the user's dataversion row.
+EXPECTED_INDEXES = {
+    "waterlog": {
+        "sqlite": "ix_waterlog_user_id_timestamp",
+        "postgresql": "ix_waterlog_user_id_timestamp",
+    },
+    "dailytotal": {
+        "sqlite": "sqlite_autoindex_dailytotal_1",
+        "postgresql": "dailytotal_pkey",
+    },
+    "dataversion": {
+        "sqlite": "sqlite_autoindex_dataversion_1",
+        "postgresql": "dataversion_pkey",
+    },
+}
+
+# Each entry reproduces one of the hot read paths that filter by owner and
+# time window.
+HOT_QUERIES = {
+    "get_logs_for_day": lambda db, user_id: WaterService.get_logs_for_day(db, user_id),
+    "get_logs_for_range": lambda db, user_id: WaterService.get_logs_for_range(
+        db,
+        user_id,
+        DateRange(start_date=date.today() - timedelta(days=30), end_date=date.today()),
+    ),
+    "get_stats": lambda db, user_id: WaterService.get_stats(db, user_id, "monthly"),
+    "check_goal_achieved": lambda db, user_id: WaterService.check_goal_achieved(db, user_id),
+    "get_data_version": lambda db, user_id: WaterService.get_data_version(db, user_id),
+}
+
+
+@contextmanager
+def capture_hot_selects(engine):
+    """Collect every SELECT against a hot table issued on ``engine``."""
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith("SELECT"):
+            return
+        for table in EXPECTED_INDEXES:
+            if f"FROM {table}" in statement:
+                captured.append((table, statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield captured
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def explain(engine, statement, parameters) -> str:
+    """Return the query plan for a captured statement as a single string."""
+    with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            # Tiny test tables would always favour a sequential scan, so ask
+            # the planner whether the index is usable at all.
+            conn.exec_driver_sql("SET enable_seqscan = off")
+            rows = conn.exec_driver_sql(f"EXPLAIN {statement}", parameters).all()
+            return "\n".join(row[0] for row in rows)
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+        return "\n".join(row[-1] for row in rows)
+
+
+def assert_queries_use_index(engine, db: Session, user: User, name: str):
+    with capture_hot_selects(engine) as captured:
+        HOT_QUERIES[name](db, user.id)
+
+    assert captured, f"{name} issued no query against a hot table"
+    for table, statement, parameters in captured:
+        index_name = EXPECTED_INDEXES[table][engine.dialect.name]
+        plan = explain(engine, statement, parameters)
+        assert index_name in plan, f"{name} no longer uses {index_name}:\n{plan}"
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_sqlite_hot_queries_use_composite_index(session: Session, test_user: User, name: str):
+    """Hot reads must be answered through an index on SQLite."""
+    assert_queries_use_index(session.get_bind(), session, test_user, name)
+
+
+@pytest.fixture(name="pg_session")
+def pg_session_fixture():
+    """Session on the Postgres database named by TEST_POSTGRES_URL, if any."""
+    url = os.environ.get("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+
+    engine = create_engine(url)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+    SQLModel.metadata.drop_all(engine)
+    engine.dispose()
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_postgres_hot_queries_use_composite_index(pg_session: Session, name: str):
+    """Hot reads must be able to use an index on Postgres."""
+    user = User(email="plan@example.com", hashed_password="x")
+    pg_session.add(user)
+    pg_session.commit()
+    pg_session.refresh(user)
+
+    assert_queries_use_index(pg_session.get_bind(), pg_session, user, name)
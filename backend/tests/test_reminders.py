@@ -0,0 +1,197 @@
+import json
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+from app.core.metrics import REMINDER_DISPATCH_LAG
+from app.core.reminders import (
+    FileSink, MemorySink, Reminder, ReminderSettings, next_reminder_time,
+)
+from app.models import User
+from app.schemas.user import UserUpdate
+from app.services.reminders import ReminderService
+from app.services.user import UserService
+from tests.test_query_plans import explain
+from tests.test_water import get_auth_headers
+
+DAYTIME = ReminderSettings(frequency=60, active_hours_start=8, active_hours_end=22)
+NIGHT_SHIFT = ReminderSettings(frequency=90, active_hours_start=22, active_hours_end=6)
+
+NOON = datetime(2024, 1, 1, 12, 0)
+
+
+def add_users(session: Session, count: int, due_at: datetime, **fields) -> list:
+    """Add users whose next reminder is due at ``due_at``."""
+    users = [
+        User(
+            email=f"reminder{uuid4().hex[:8]}@example.com",
+            hashed_password="x",
+            next_reminder_at=due_at,
+            **fields,
+        )
+        for _ in range(count)
+    ]
+    session.add_all(users)
+    session.commit()
+    return [user.id for user in users]
+
+
+def test_next_reminder_time():
+    """Test that reminders fall in active hours."""
+    morning = datetime(2024, 1, 1, 9, 30)
+    assert next_reminder_time(morning, DAYTIME) == datetime(2024, 1, 1, 10, 30)
+
+    # Past the end of the day, the reminder moves to the next morning
+    evening = datetime(2024, 1, 1, 21, 30)
+    assert next_reminder_time(evening, DAYTIME) == datetime(2024, 1, 2, 8, 0)
+
+    # Early morning waits for the same day's start
+    assert next_reminder_time(datetime(2024, 1, 1, 2, 0), DAYTIME) == datetime(2024, 1, 1, 8, 0)
+
+    # Active hours wrapping past midnight
+    assert next_reminder_time(datetime(2024, 1, 1, 23, 0), NIGHT_SHIFT) == datetime(2024, 1, 2, 0, 30)
+    assert next_reminder_time(datetime(2024, 1, 2, 5, 0), NIGHT_SHIFT) == datetime(2024, 1, 2, 22, 0)
+
+
+def test_dispatch_sends_due_reminders_in_batches(session: Session):
+    """Test that due reminders are claimed in batches, sent and rescheduled."""
+    due = add_users(session, 5, NOON - timedelta(minutes=5))
+    not_due = add_users(session, 1, NOON + timedelta(minutes=5))
+    add_users(session, 1, None)  # Reminders off
+    sink = MemorySink()
+    lag = REMINDER_DISPATCH_LAG.labels()
+    observed = lag.count
+
+    assert ReminderService.dispatch(session, sink, now=NOON, batch_size=2) == 5
+
+    assert sink.batches == 3
+    assert {reminder.user_id for reminder in sink.reminders} == set(due)
+    session.expire_all()
+    for user_id in due:
+        user = session.get(User, user_id)
+        assert user.next_reminder_at == NOON + timedelta(minutes=60)
+        assert user.reminder_lease_until is None
+    assert session.get(User, not_due[0]).next_reminder_at == NOON + timedelta(minutes=5)
+    assert lag.count == observed + 5
+
+    # Nothing is due any more
+    assert ReminderService.dispatch(session, sink, now=NOON) == 0
+
+
+def test_dispatch_defers_reminders_outside_active_hours(session: Session):
+    """Test that reminders due outside active hours move to the next active period."""
+    late = datetime(2024, 1, 1, 23, 0)
+    (user_id,) = add_users(session, 1, late - timedelta(minutes=1))
+    sink = MemorySink()
+
+    assert ReminderService.dispatch(session, sink, now=late) == 1
+
+    assert sink.reminders == []
+    session.expire_all()
+    assert session.get(User, user_id).next_reminder_at == datetime(2024, 1, 2, 8, 0)
+
+
+def test_active_hours_use_the_server_clock(session: Session, monkeypatch):
+    """Test that active hours are read on the server's local clock, not UTC."""
+    monkeypatch.setenv("TZ", "EST5")  # UTC-5, no daylight saving
+    time.tzset()
+    try:
+        # 12:00 UTC is 07:00 local, before the 08:00 start
+        (user_id,) = add_users(session, 1, NOON - timedelta(minutes=1))
+        sink = MemorySink()
+        assert ReminderService.dispatch(session, sink, now=NOON) == 1
+        assert sink.reminders == []
+        session.expire_all()
+        assert session.get(User, user_id).next_reminder_at == datetime(2024, 1, 1, 13, 0)
+
+        # 13:00 UTC is 08:00 local; the next one is an hour on, stored in UTC
+        assert ReminderService.dispatch(session, sink, now=datetime(2024, 1, 1, 13, 0)) == 1
+        assert [reminder.user_id for reminder in sink.reminders] == [user_id]
+        session.expire_all()
+        assert session.get(User, user_id).next_reminder_at == datetime(2024, 1, 1, 14, 0)
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+
+def test_claimed_rows_are_skipped_until_lease_expires(session: Session):
+    """Test that a second dispatcher does not send reminders another one claimed."""
+    due = add_users(session, 3, NOON - timedelta(minutes=1))
+    lease_until = NOON + timedelta(seconds=60)
+
+    # Another dispatcher claims two rows and has not finished sending
+    claimed = ReminderService.claim_due(session, NOON, 2, lease_until)
+    assert len(claimed) == 2
+
+    sink = MemorySink()
+    assert ReminderService.dispatch(session, sink, now=NOON) == 1
+    assert [reminder.user_id for reminder in sink.reminders] == [
+        user_id for user_id in due if user_id not in {row.id for row in claimed}
+    ]
+
+    # The other dispatcher died; its rows are reclaimed once the lease runs out
+    assert ReminderService.dispatch(session, sink, now=lease_until + timedelta(seconds=1)) == 2
+    assert {reminder.user_id for reminder in sink.reminders} == set(due)
+
+
+def test_claim_uses_next_reminder_index(session: Session):
+    """Test that claiming due rows is an index range read, not a scan of users."""
+    add_users(session, 3, NOON)
+    engine = session.get_bind()
+    captured = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("UPDATE"):
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        ReminderService.claim_due(session, NOON, 10, NOON + timedelta(minutes=1))
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    statement, parameters = captured[0]
+    assert "ix_user_next_reminder_at" in explain(engine, statement, parameters)
+
+
+def test_file_sink(tmp_path):
+    """Test that the file sink appends reminders as JSON lines."""
+    path = tmp_path / "reminders.ndjson"
+    user_id = uuid4()
+    FileSink(str(path)).send([Reminder(user_id, datetime(2024, 1, 1, 10, 0))])
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert lines == [{"user_id": str(user_id), "due_at": "2024-01-01T10:00:00"}]
+
+
+def test_log_water_pushes_reminder_back(client: TestClient, session: Session, test_user: User):
+    """Test that logging water moves the user's next reminder to a frequency later."""
+    test_user.next_reminder_at = datetime.utcnow() + timedelta(minutes=1)
+    session.add(test_user)
+    session.commit()
+    user_id = test_user.id
+    headers = get_auth_headers(test_user)
+
+    before = datetime.utcnow()
+    response = client.post("/api/v1/water/log", json={"amount": 1}, headers=headers)
+    assert response.status_code == 200
+
+    session.expire_all()
+    next_reminder_at = session.exec(select(User.next_reminder_at).where(User.id == user_id)).one()
+    assert next_reminder_at >= before + timedelta(minutes=test_user.reminder_frequency - 1)
+
+
+def test_user_update_reschedules_reminders(session: Session, test_user: User):
+    """Test that reminder settings changes reschedule or stop reminders."""
+    user = UserService.update(
+        session, test_user, UserUpdate(reminder_frequency=30, active_hours_start=0, active_hours_end=0),
+    )
+    assert user.next_reminder_at is not None
+    assert user.next_reminder_at <= datetime.utcnow() + timedelta(minutes=30)
+
+    user = UserService.update(session, user, UserUpdate(reminder_frequency=0))
+    assert user.next_reminder_at is None
@@ -0,0 +1,50 @@
+import os
+
+from app.startup_profile import import_time_ms, parse_importtime, profile_imports
+
+# Ceiling for the app's own import time, as a fraction of the time to import
+# the frameworks it is built on. Both are measured in the same interpreter, so
+# machine speed and load cancel out; the app adds a little over a fifth today.
+IMPORT_TIME_BUDGET_RATIO = float(os.environ.get("IMPORT_TIME_BUDGET_RATIO", 0.35))
+BASELINE_MODULES = ("fastapi", "sqlmodel", "sqlalchemy.ext.asyncio", "pydantic_settings")
+
+# Loaded on first use, never by importing the app
+LAZY_PACKAGES = {"passlib", "bcrypt", "jose", "loguru", "alembic"}
+
+
+def test_parse_importtime():
+    """Test parsing -X importtime output."""
+    output = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |     app.core.config\n"
+        "import time:       300 |        420 |   app.db\n"
+        "import time:      1000 |       1420 | app.main\n"
+    )
+    records = parse_importtime(output)
+    assert [(record.module, record.depth) for record in records] == [
+        ("app.core.config", 2), ("app.db", 1), ("app.main", 0),
+    ]
+    assert import_time_ms(records, "app.main") == 1.42
+
+
+def test_app_import_time_budget():
+    """Test that importing app.main stays within budget and loads no lazy packages."""
+    # Import the frameworks first, so app.main's cumulative time is the app's
+    # own share; best of five runs to smooth over load and a cold file cache
+    runs = [profile_imports(", ".join(BASELINE_MODULES + ("app.main",))) for _ in range(5)]
+    ratios = []
+    for records in runs:
+        baseline_ms = sum(
+            record.cumulative_us for record in records
+            if record.depth == 0 and record.module in BASELINE_MODULES
+        ) / 1000
+        ratios.append((import_time_ms(records, "app.main") / baseline_ms, baseline_ms))
+    ratio, baseline_ms = min(ratios)
+    assert ratio < IMPORT_TIME_BUDGET_RATIO, (
+        f"import app.main took {ratio * baseline_ms:.0f} ms on top of the {baseline_ms:.0f} ms "
+        f"to import its frameworks, budget {IMPORT_TIME_BUDGET_RATIO:.0%} of that; "
+        "run `python -m app.startup_profile` to see why"
+    )
+
+    imported = {record.module.split(".")[0] for record in runs[0]}
+    assert not imported & LAZY_PACKAGES
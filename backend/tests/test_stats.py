@@ -0,0 +1,160 @@
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.models import User
+from app.schemas.water import WaterLogCreate
+from app.services.stats import StatsService
+from app.services.water import WaterService
+from tests.test_water import get_auth_headers
+
+# Spread across year, month and ISO week boundaries, at various hours
+TIMESTAMPS = [
+    datetime(2023, 12, 30, 7, 15),
+    datetime(2023, 12, 31, 23, 59),
+    datetime(2024, 1, 1, 0, 5),
+    datetime(2024, 1, 7, 12, 0),
+    datetime(2024, 1, 8, 12, 30),
+    datetime(2024, 2, 29, 18, 45),
+    datetime(2024, 3, 1, 7, 0),
+]
+
+
+def expected_buckets(granularity: str) -> Counter:
+    """Compute the expected per-bucket totals in Python (amount = hour + 1)."""
+    totals = Counter()
+    for ts in TIMESTAMPS:
+        if granularity == "hour":
+            key = ts.hour
+        elif granularity == "weekday":
+            key = ts.weekday()
+        else:
+            key = StatsService.bucket_start(granularity, ts.date()).isoformat()
+        totals[key] += ts.hour + 1
+    return totals
+
+
+@pytest.mark.parametrize("granularity", ["hour", "weekday", "day", "week", "month", "year"])
+def test_aggregate_matches_python_buckets(session: Session, test_user: User, granularity: str):
+    """Test that SQL-side bucketing agrees with Python's calendar arithmetic."""
+    for ts in TIMESTAMPS:
+        WaterService.create_log(
+            session, test_user.id, WaterLogCreate(amount=ts.hour + 1, timestamp=ts)
+        )
+
+    stats = StatsService.aggregate(
+        session, test_user.id, granularity, date(2023, 12, 1), date(2024, 3, 31)
+    )
+
+    label = {"hour": "hour", "weekday": "weekday"}.get(granularity, "date")
+    actual = {point[label]: point["amount"] for point in stats.data}
+    expected = expected_buckets(granularity)
+
+    assert {key: amount for key, amount in actual.items() if amount} == dict(expected)
+    # Gaps are filled with zero-amount buckets
+    if granularity == "day":
+        assert len(stats.data) == (date(2024, 3, 31) - date(2023, 12, 1)).days + 1
+    elif granularity == "month":
+        assert [point["date"] for point in stats.data] == [
+            "2023-12-01", "2024-01-01", "2024-02-01", "2024-03-01",
+        ]
+
+
+def test_get_stats_custom_range(client: TestClient, test_user: User):
+    """Test the stats endpoint with an explicit range and granularity."""
+    headers = get_auth_headers(test_user)
+    today = date.today()
+    client.post("/api/v1/water/log", json={"amount": 4}, headers=headers)
+
+    response = client.get(
+        "/api/v1/water/stats",
+        params={
+            "granularity": "week",
+            "start_date": (today - timedelta(days=20)).isoformat(),
+            "end_date": today.isoformat(),
+        },
+        headers=headers,
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["period"] == "custom"
+    assert data["granularity"] == "week"
+    assert data["data"][-1]["amount"] == 4
+    assert sum(point["amount"] for point in data["data"]) == 4
+
+    # Invalid granularity
+    response = client.get(
+        "/api/v1/water/stats",
+        params={"period": "weekly", "granularity": "fortnight"},
+        headers=headers,
+    )
+    assert response.status_code == 400
+
+    # Ranges with too many buckets are refused before querying
+    huge = {"start_date": "0001-01-01", "end_date": "9000-01-01"}
+    response = client.get("/api/v1/water/stats", params=huge, headers=headers)
+    assert response.status_code == 400
+    response = client.get(
+        "/api/v1/water/stats", params={**huge, "granularity": "year"}, headers=headers
+    )
+    assert response.status_code == 400
+
+
+def test_calendar_buckets_stop_at_date_max():
+    """Test that bucket counts match the buckets and never step past date.max."""
+    end = date.max
+    for granularity in ("day", "week", "month", "year"):
+        start = end - timedelta(days=800)
+        buckets = StatsService.calendar_buckets(granularity, start, end)
+        assert len(buckets) == StatsService.bucket_count(granularity, start, end)
+        assert buckets[-1] <= end
+
+    assert StatsService.bucket_count("day", date(2024, 1, 1), date(2024, 12, 31)) == 366
+
+
+def test_stats_response_cache(client: TestClient, test_user: User, monkeypatch):
+    """Test that stats are served from the response cache until a write."""
+    from app.core.response_cache import response_cache
+
+    headers = get_auth_headers(test_user)
+    params = {"period": "weekly"}
+    client.post("/api/v1/water/log", json={"amount": 2}, headers=headers)
+
+    first = client.get("/api/v1/water/stats", params=params, headers=headers).json()
+    hits = response_cache.hits
+    second = client.get("/api/v1/water/stats", params=params, headers=headers).json()
+    assert second == first
+    assert response_cache.hits == hits + 1
+
+    # Logging water drops the user's cached responses
+    client.post("/api/v1/water/log", json={"amount": 3}, headers=headers)
+    third = client.get("/api/v1/water/stats", params=params, headers=headers).json()
+    assert response_cache.hits == hits + 1
+    assert sum(point["amount"] for point in third["data"]) == 5
+
+    # Finished periods never expire; the current one does
+    past = {"start_date": "2024-01-01", "end_date": "2024-01-31"}
+    client.get("/api/v1/water/stats", params=past, headers=headers)
+    entries = response_cache.backend._entries
+    expiry = {key[1][2:]: expires_at for key, (expires_at, _) in entries.items()}
+    assert expiry[("custom", "day", date(2024, 1, 1), date(2024, 1, 31))] is None
+    assert [value for key, value in expiry.items() if key[0] == "weekly"][0] is not None
+
+    # A write handled by another worker invalidates nothing here, but bumps
+    # the data version the entries are keyed by
+    monkeypatch.setattr(response_cache, "invalidate", lambda user_id: None)
+    client.post(
+        "/api/v1/water/log",
+        json={"amount": 4, "timestamp": "2024-01-10T08:00:00"},
+        headers=headers,
+    )
+    fresh = client.get("/api/v1/water/stats", params=past, headers=headers).json()
+    assert sum(point["amount"] for point in fresh["data"]) == 4
+
+    stats = client.get("/health").json()["response_cache"]
+    assert stats["backend"] == "MemoryCacheBackend"
+    assert stats["hits"] >= 1 and stats["misses"] >= 1
@@ -1,9 +1,9 @@
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from fastapi.testclient import TestClient
 from sqlmodel import Session, select
 
 from app.core.security import create_access_token
-from app.models import User, WaterLog
+from app.models import DailyTotal, User, WaterLog
 
 
 def get_auth_headers(user: User):
@@ -44,6 +44,17 @@ def test_log_water(client: TestClient, session: Session, test_user: User):
     assert water_log.notes == log_data["notes"]
 
 
+def test_log_water_rejects_negative_amount(client: TestClient, session: Session, test_user: User):
+    """Test that a single log shares the batch's non-negative amount rule."""
+    response = client.post(
+        "/api/v1/water/log",
+        json={"amount": -1},
+        headers=get_auth_headers(test_user),
+    )
+    assert response.status_code == 422
+    assert session.exec(select(WaterLog).where(WaterLog.user_id == test_user.id)).first() is None
+
+
 def test_get_today_logs(client: TestClient, session: Session, test_user: User):
     """Test getting today's water logs."""
     # Create test logs
@@ -109,3 +120,210 @@ def test_update_goal(client: TestClient, session: Session, test_user: User):
     data = response.json()
     assert data["goal_amount"] == goal_data["goal_amount"]
     assert data["user_id"] == str(test_user.id)
+
+
+def test_log_water_updates_daily_total(client: TestClient, session: Session, test_user: User):
+    """Test that logging water maintains the per-day rollup read by stats."""
+    headers = get_auth_headers(test_user)
+    client.post("/api/v1/water/log", json={"amount": 2}, headers=headers)
+    client.post("/api/v1/water/log", json={"amount": 3}, headers=headers)
+
+    # Check rollup
+    total = session.get(DailyTotal, (test_user.id, date.today()))
+    assert total is not None
+    assert total.total_amount == 5
+    assert total.log_count == 2
+
+    # Check stats are answered from the rollup
+    response = client.get("/api/v1/water/stats?period=weekly", headers=headers)
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert {"date": date.today().isoformat(), "amount": 5} in data
+
+
+def test_log_water_batch(client: TestClient, session: Session, test_user: User):
+    """Test replaying a batch of offline taps in one request."""
+    batch = {
+        "items": [
+            {"amount": 1, "timestamp": "2024-01-01T08:00:00"},
+            {"amount": -2, "timestamp": "2024-01-01T09:00:00"},
+            {"amount": 3, "notes": "Lunch", "timestamp": "2024-01-01T12:00:00"},
+            {"amount": 2, "timestamp": "2024-01-02T08:00:00"},
+        ]
+    }
+
+    # Make request
+    response = client.post(
+        "/api/v1/water/log/batch",
+        json=batch,
+        headers=get_auth_headers(test_user),
+    )
+
+    # Check response
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 3
+    assert data["rejected"] == 1
+    assert [result["status"] for result in data["results"]] == [
+        "created", "rejected", "created", "created",
+    ]
+    assert data["results"][1]["error"].startswith("amount:")
+    assert data["results"][2]["log"]["notes"] == "Lunch"
+
+    # Check database
+    logs = session.exec(select(WaterLog).where(WaterLog.user_id == test_user.id)).all()
+    assert len(logs) == 3
+    total = session.get(DailyTotal, (test_user.id, date(2024, 1, 1)))
+    assert total.total_amount == 4
+    assert total.log_count == 2
+
+
+def test_create_log_write_path(session: Session, test_user: User):
+    """Test that logging water is one transaction with no reads or refreshes."""
+    from datetime import timedelta
+
+    from sqlalchemy import event
+
+    from app.models import Streak
+    from app.schemas.water import WaterLogCreate
+    from app.services.water import WaterService
+
+    # Logged yesterday, so today's log extends the streak
+    streak = session.exec(select(Streak).where(Streak.user_id == test_user.id)).one()
+    streak.current_streak = 3
+    streak.longest_streak = 3
+    streak.last_logged_date = date.today() - timedelta(days=1)
+    session.add(streak)
+    session.commit()
+    user_id = test_user.id
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split()[0].upper())
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        water_log = WaterService.create_log(session, user_id, WaterLogCreate(amount=2))
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert statements == ["INSERT", "INSERT", "INSERT", "INSERT", "UPDATE", "UPDATE"]
+    assert water_log.amount == 2
+
+    session.expire_all()
+    streak = session.exec(select(Streak).where(Streak.user_id == user_id)).one()
+    assert streak.current_streak == 4
+    assert streak.longest_streak == 4
+    assert streak.last_logged_date == date.today()
+
+    # A second log on the same day leaves the streak alone
+    returned = WaterService.update_streak(session, user_id)
+    assert returned.current_streak == 4
+
+
+def test_first_log_starts_streak(client: TestClient, test_user: User):
+    """Test that a new user's first log starts their streak."""
+    headers = get_auth_headers(test_user)
+    client.post("/api/v1/water/log", json={"amount": 1}, headers=headers)
+
+    response = client.get("/api/v1/water/streak", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["current_streak"] == 1
+    assert response.json()["longest_streak"] == 1
+
+
+def test_history_logs_pagination(client: TestClient, session: Session, test_user: User):
+    """Test paging through individual logs with keyset cursors."""
+    # Two logs share a timestamp so the id tiebreaker is exercised
+    timestamps = [datetime(2024, 1, 1, hour) for hour in (8, 9, 9, 10, 11, 12, 13)]
+    for i, timestamp in enumerate(timestamps):
+        session.add(WaterLog(user_id=test_user.id, amount=i + 1, timestamp=timestamp))
+    session.commit()
+    headers = get_auth_headers(test_user)
+
+    # Walk every page
+    seen = []
+    params = {"limit": 3}
+    while True:
+        response = client.get("/api/v1/water/history/logs", params=params, headers=headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["limit"] == 3
+        assert len(data["items"]) <= 3
+        seen.extend(data["items"])
+        if data["next_cursor"] is None:
+            break
+        params = {"limit": 3, "cursor": data["next_cursor"]}
+
+    assert len(seen) == len(timestamps)
+    assert len({item["id"] for item in seen}) == len(timestamps)
+    assert [item["timestamp"] for item in seen] == sorted(item["timestamp"] for item in seen)
+
+    # Date bounds and bad cursors
+    response = client.get(
+        "/api/v1/water/history/logs",
+        params={"start_date": "2024-01-02"},
+        headers=headers,
+    )
+    assert response.json()["items"] == []
+    response = client.get(
+        "/api/v1/water/history/logs", params={"cursor": "not-a-cursor"}, headers=headers,
+    )
+    assert response.status_code == 400
+
+    # The per-day history endpoint refuses unbounded ranges
+    response = client.get(
+        "/api/v1/water/history",
+        params={"start_date": "2020-01-01", "end_date": "2024-01-01"},
+        headers=headers,
+    )
+    assert response.status_code == 400
+
+
+def test_conditional_get(client: TestClient, session: Session, test_user: User):
+    """Test that read endpoints answer 304 until the user's data changes."""
+    from sqlalchemy import event
+
+    headers = get_auth_headers(test_user)
+    urls = [
+        "/api/v1/water/today",
+        "/api/v1/water/stats?period=weekly",
+        f"/api/v1/water/history?start_date={date.today()}&end_date={date.today()}",
+    ]
+    etags = {}
+    for url in urls:
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200
+        etags[url] = response.headers["etag"]
+
+    # Matching polls are answered from the version row alone
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        for url in urls:
+            response = client.get(url, headers={**headers, "If-None-Match": etags[url]})
+            assert response.status_code == 304
+            assert response.headers["etag"] == etags[url]
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert statements
+    assert not [s for s in statements if "waterlog" in s or "dailytotal" in s]
+
+    # Logging water or changing the goal invalidates every tag
+    client.post("/api/v1/water/log", json={"amount": 1}, headers=headers)
+    for url in urls:
+        response = client.get(url, headers={**headers, "If-None-Match": etags[url]})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etags[url]
+        etags[url] = response.headers["etag"]
+
+    client.post("/api/v1/water/goal", json={"goal_amount": 10}, headers=headers)
+    response = client.get(urls[0], headers={**headers, "If-None-Match": etags[urls[0]]})
+    assert response.status_code == 200
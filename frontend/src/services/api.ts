@@ -46,6 +46,12 @@ export const apiEndpoints: ApiEndpoint[] = [
     description: 'OAuth2 compatible token login endpoint',
     tag: 'auth',
   },
+  {
+    path: '/api/v1/auth/refresh',
+    method: 'POST',
+    description: 'Exchange a refresh token for a new access and refresh token',
+    tag: 'auth',
+  },
   {
     path: '/api/v1/water/log',
     method: 'POST',
@@ -99,3 +99,60 @@ export const getAuthHeader = (): { Authorization: string } | {} => {
   const token = getToken();
   return token ? { Authorization: `${token.token_type} ${token.access_token}` } : {};
 };
+
+// Refresh in flight, shared so concurrent 401s spend the refresh token once
+let pendingRefresh: Promise<boolean> | null = null;
+
+// Trade the stored refresh token for a new token pair; false if the session is over
+export const refreshAccessToken = (): Promise<boolean> => {
+  if (pendingRefresh) return pendingRefresh;
+
+  pendingRefresh = (async () => {
+    const token = getToken();
+    if (!token?.refresh_token) return false;
+
+    try {
+      const response = await fetch(`${API_BASE_URL}/api/v1/auth/refresh`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ refresh_token: token.refresh_token }),
+      });
+
+      if (!response.ok) {
+        // Refresh tokens are single-use and expire; sign in again
+        removeToken();
+        return false;
+      }
+
+      setToken(await response.json());
+      return true;
+    } catch (error) {
+      console.error('Token refresh error:', error);
+      return false;
+    }
+  })().finally(() => {
+    pendingRefresh = null;
+  });
+
+  return pendingRefresh;
+};
+
+// fetch with the auth header, refreshing the access token once on a 401
+export const authFetch = async (url: string, init: RequestInit = {}): Promise<Response> => {
+  const send = () =>
+    fetch(url, {
+      ...init,
+      headers: {
+        ...(init.headers as Record<string, string> | undefined),
+        ...getAuthHeader(),
+      },
+    });
+
+  const response = await send();
+  if (response.status === 401 && (await refreshAccessToken())) {
+    return send();
+  }
+  return response;
+};
@@ -1,5 +1,5 @@
 import { DailyWaterLog, Goal, Streak, WaterLog, WaterStats } from '../types';
-import { getAuthHeader } from './auth';
+import { authFetch } from './auth';
 import { fetchWithCache, clearCache } from '../utils/apiUtils';
 
 const API_BASE_URL = 'http://localhost:8000';
@@ -16,11 +16,10 @@ const CACHE_KEYS = {
 // Log water intake
 export const logWater = async (amount: number = 1, notes?: string): Promise<WaterLog> => {
   try {
-    const response = await fetch(`${API_BASE_URL}/api/v1/water/log`, {
+    const response = await authFetch(`${API_BASE_URL}/api/v1/water/log`, {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
-        ...getAuthHeader(),
       },
       body: JSON.stringify({
         amount,
@@ -61,9 +60,7 @@ export const getTodayLogs = async (forceRefresh = false): Promise<DailyWaterLog>
     CACHE_KEYS.TODAY_LOGS,
     async () => {
       try {
-        const response = await fetch(`${API_BASE_URL}/api/v1/water/today`, {
-          headers: getAuthHeader(),
-        });
+        const response = await authFetch(`${API_BASE_URL}/api/v1/water/today`);
 
         if (!response.ok) {
           const errorData = await response.json().catch(() => ({}));
@@ -97,9 +94,7 @@ export const getStreak = async (forceRefresh = false): Promise<Streak> => {
     CACHE_KEYS.STREAK,
     async () => {
       try {
-        const response = await fetch(`${API_BASE_URL}/api/v1/water/streak`, {
-          headers: getAuthHeader(),
-        });
+        const response = await authFetch(`${API_BASE_URL}/api/v1/water/streak`);
 
         if (!response.ok) {
           const errorData = await response.json().catch(() => ({}));
@@ -136,9 +131,7 @@ export const getGoal = async (forceRefresh = false): Promise<Goal> => {
     CACHE_KEYS.GOAL,
     async () => {
       try {
-        const response = await fetch(`${API_BASE_URL}/api/v1/water/goal`, {
-          headers: getAuthHeader(),
-        });
+        const response = await authFetch(`${API_BASE_URL}/api/v1/water/goal`);
 
         if (!response.ok) {
           const errorData = await response.json().catch(() => ({}));
@@ -170,11 +163,10 @@ export const getGoal = async (forceRefresh = false): Promise<Goal> => {
 // Update water intake goal
 export const updateGoal = async (goalAmount: number): Promise<Goal> => {
   try {
-    const response = await fetch(`${API_BASE_URL}/api/v1/water/goal`, {
+    const response = await authFetch(`${API_BASE_URL}/api/v1/water/goal`, {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
-        ...getAuthHeader(),
       },
       body: JSON.stringify({
         goal_amount: goalAmount,
@@ -207,11 +199,8 @@ export const getWaterHistory = async (startDate: string, endDate: string, forceR
     CACHE_KEYS.HISTORY(startDate, endDate),
     async () => {
       try {
-        const response = await fetch(
+        const response = await authFetch(
           `${API_BASE_URL}/api/v1/water/history?start_date=${startDate}&end_date=${endDate}`,
-          {
-            headers: getAuthHeader(),
-          }
         );
 
         if (!response.ok) {
@@ -274,11 +263,8 @@ export const getWaterStats = async (period: 'weekly' | 'monthly', forceRefresh =
     CACHE_KEYS.STATS(period),
     async () => {
       try {
-        const response = await fetch(
+        const response = await authFetch(
           `${API_BASE_URL}/api/v1/water/stats?period=${period}`,
-          {
-            headers: getAuthHeader(),
-          }
         );
 
         if (!response.ok) {
@@ -64,6 +64,7 @@ export interface LoginCredentials {
 
 export interface AuthToken {
   access_token: string;
+  refresh_token?: string;
   token_type: string;
 }
 